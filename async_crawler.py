@@ -0,0 +1,290 @@
+import asyncio
+import gzip
+import json
+import ssl
+import time
+import zlib
+from urllib.parse import quote, urlsplit
+
+from http_fetcher import DEFAULT_BASE_URL, RECORD_PATH_TEMPLATE, HTTPStatusError, parse_record
+from log_setup import get_logger, progress
+from metrics import metrics
+from retry_policy import retry_policy, classify_failure, failed_result, PermanentError
+
+log = get_logger('async')
+
+# --- CONFIGURATION ---
+DEFAULT_RATE = 10.0          # requests per second, across the whole crawl
+DEFAULT_BURST = 20           # tokens the bucket can hold
+DEFAULT_CONCURRENCY = 200    # fetches in flight on the event loop
+DEFAULT_TASK_TIMEOUT = 30    # seconds per fetch attempt
+QUEUE_FACTOR = 2             # queued IDs per worker waiting behind the in-flight ones
+
+
+class TokenBucket:
+    """Global token-bucket limiter: ``rate`` tokens/s refill, at most ``burst`` banked"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        if not rate > 0 or burst < 1:
+            raise ValueError(f"Need rate > 0 and burst >= 1, got {rate} and {burst}")
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                # Holding the lock while sleeping keeps waiters in FIFO order
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncHTTPClient:
+    """Minimal HTTP/1.1 keep-alive client on asyncio streams (GET + JSON only)"""
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, max_connections=DEFAULT_CONCURRENCY):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.scheme == "https" else 80)
+        self.base_path = parts.path.rstrip('/')
+        self._ssl = ssl.create_default_context() if self.scheme == "https" else None
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.stats = {'requests': 0, 'connections_opened': 0, 'reused': 0}
+
+    async def _connect(self):
+        if self._idle:
+            self.stats['reused'] += 1
+            return self._idle.pop()
+        self.stats['connections_opened'] += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+    async def get_json(self, path):
+        return json.loads(await self.get_body(path))
+
+    async def get_body(self, path):
+        """GET a document's decompressed body, retrying once on a stale keep-alive socket"""
+        async with self._slots:
+            for attempt in range(2):
+                reader, writer = await self._connect()
+                try:
+                    status, headers, body = await self._request(reader, writer, path)
+                except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                    writer.close()
+                    if attempt == 0:
+                        continue  # stale keep-alive socket
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if headers.get('connection', '').lower() == 'close':
+                    writer.close()
+                else:
+                    self._idle.append((reader, writer))
+                self.stats['requests'] += 1
+                break
+
+        if status != 200:
+            raise HTTPStatusError(status, path)
+        encoding = headers.get('content-encoding', '').lower()
+        if encoding == 'gzip':
+            body = gzip.decompress(body)
+        elif encoding == 'deflate':
+            body = zlib.decompress(body)
+        return body
+
+    async def _request(self, reader, writer, path):
+        writer.write((
+            f"GET {self.base_path}{path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            "Accept: application/json\r\n"
+            "Accept-Encoding: gzip, deflate\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        ).encode('ascii'))
+        await writer.drain()
+
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b';')[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            headers['connection'] = 'close'
+        return status, headers, body
+
+
+async def fetch_reaction_async(client, bucket, reaction_id, task_timeout=DEFAULT_TASK_TIMEOUT, max_retries=None,
+                               policy=retry_policy, dataset_id=None):
+    """Async counterpart of scrape_reaction_data: same result dict and retry policy"""
+    path = RECORD_PATH_TEMPLATE.format(reaction_id=quote(reaction_id))
+    attempts = 0
+    while True:
+        metrics.count('attempts', dataset_id=dataset_id)
+        if attempts:
+            metrics.count('retries', dataset_id=dataset_id)
+        # The breaker is shared with the threaded backends; poll it without blocking the loop
+        delay = policy.breaker.admit()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = policy.breaker.admit()
+        await bucket.acquire()
+        try:
+            with metrics.stage('http_fetch', dataset_id):
+                body = await asyncio.wait_for(client.get_body(path), timeout=task_timeout)
+            with metrics.stage('http_parse', dataset_id):
+                reaction_data = parse_record(body, reaction_id)
+            if reaction_data.get('reactionId') != reaction_id:
+                raise PermanentError(f"Reaction ID mismatch: expected {reaction_id}, got {reaction_data.get('reactionId')}")
+            policy.breaker.record_success()
+            return {'reaction_id': reaction_id, 'data': reaction_data, 'success': True}
+        except Exception as e:
+            attempts += 1
+            last_error, kind = e, classify_failure(e)
+            metrics.count('errors', dataset_id=dataset_id)
+            metrics.count(f'{kind}_errors', dataset_id=dataset_id)
+            policy.breaker.record_failure(kind)
+            log.warning("⚠ Async %s error for %s (attempt %d): %.100s", kind, reaction_id, attempts,
+                        str(e) or type(e).__name__)
+            if not policy.should_retry(kind, attempts, max_retries):
+                metrics.count('failures', dataset_id=dataset_id)
+                return failed_result(reaction_id, last_error, kind, attempts)
+        await asyncio.sleep(policy.backoff(attempts))
+
+
+async def crawl_reactions_async(dataset_reactions, format_fn, base_url=DEFAULT_BASE_URL,
+                                rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                                concurrency=DEFAULT_CONCURRENCY, task_timeout=DEFAULT_TASK_TIMEOUT,
+                                store=None, sink=None, keep_results=True, cache=None):
+    """Fetch and format every reaction in ``{dataset_id: [reaction_id, ...]}`` on one event loop.
+
+    Returns the per-dataset result list in the same shape as scrape_all_datasets_parallel.
+    Reactions already completed in the checkpoint ``store`` are not fetched again.
+    ``sink`` and ``keep_results`` behave as in scheduler.ReactionScheduler.
+    A RawRecordCache ``cache`` is consulted before any request is made.
+
+    ``concurrency`` workers pull IDs from a bounded queue, so only a window of
+    reactions is in flight at once. Checkpoint, cache, formatting and sink calls
+    block, so they run in worker threads rather than on the loop.
+    """
+    client = AsyncHTTPClient(base_url, max_connections=concurrency)
+    bucket = TokenBucket(rate, burst)
+    queue = asyncio.Queue(maxsize=concurrency * QUEUE_FACTOR)
+    output = [{'dataset_id': dataset_id, 'reactions': [None] * len(reaction_ids)}
+              for dataset_id, reaction_ids in dataset_reactions.items()]
+    remaining = [len(entry['reactions']) for entry in output]
+
+    def load(reaction_id):
+        if store is not None:
+            stored = store.load_reaction(reaction_id)
+            if stored is not None:
+                return stored if keep_results else {'reaction_id': reaction_id, 'success': True}, True
+        entry = cache.get(reaction_id) if cache is not None else None
+        if entry is not None:
+            return {'reaction_id': reaction_id, 'data': entry['data'], 'success': True, 'cached': True}, False
+        return None, False
+
+    def finish(dataset_id, reaction_id, result, fetched):
+        if fetched and cache is not None and result['success']:
+            cache.put(reaction_id, result['data'], dataset_id)
+        if result.get('cached'):
+            metrics.count('cache_hits', dataset_id=dataset_id)
+        if result['success']:
+            try:
+                with metrics.stage('format', dataset_id):
+                    result['formatted_data'] = format_fn(result)
+                result['data'] = None
+            except Exception as e:
+                metrics.count('format_errors', dataset_id=dataset_id)
+                log.warning("    ⚠ Error formatting %s: %s", reaction_id, e)
+        if store is not None:
+            store.save_reaction(dataset_id, result)
+        if sink is not None:
+            sink(dataset_id, result)
+        if not keep_results:
+            result = {'reaction_id': reaction_id, 'success': result['success']}
+        return result
+
+    async def one(dataset_id, reaction_id):
+        result, done = await asyncio.to_thread(load, reaction_id)
+        if not done:
+            fetched = result is None
+            if fetched:
+                result = await fetch_reaction_async(client, bucket, reaction_id, task_timeout, dataset_id=dataset_id)
+            result = await asyncio.to_thread(finish, dataset_id, reaction_id, result, fetched)
+        progress.advance(result['success'])
+        return result
+
+    def dataset_done(d):
+        entry = output[d]
+        successful = sum(1 for r in entry['reactions'] if r['success'])
+        entry['total_reactions'] = len(entry['reactions'])
+        entry['successful_scrapes'] = successful
+        log.info("✓ Completed dataset %d/%d: %s (%d/%d)", d + 1, len(output), entry['dataset_id'],
+                 successful, entry['total_reactions'])
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            d, i, reaction_id = item
+            output[d]['reactions'][i] = await one(output[d]['dataset_id'], reaction_id)
+            remaining[d] -= 1
+            if remaining[d] == 0:
+                dataset_done(d)
+
+    async def produce():
+        for d, (dataset_id, reaction_ids) in enumerate(dataset_reactions.items()):
+            progress.add_total(len(reaction_ids))
+            if not reaction_ids:
+                dataset_done(d)
+            for i, reaction_id in enumerate(reaction_ids):
+                await queue.put((d, i, reaction_id))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+        log.info("Async HTTP stats: %s", client.stats)
+        return output
+    finally:
+        for task in tasks:
+            task.cancel()
+        await client.close()
+
+
+def run_async_crawl(dataset_reactions, format_fn, **kwargs):
+    """Blocking entry point for main()"""
+    return asyncio.run(crawl_reactions_async(dataset_reactions, format_fn, **kwargs))
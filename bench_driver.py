@@ -0,0 +1,98 @@
+"""Compare Chrome driver profiles: reaction pages read per second and browser memory.
+
+    python bench_driver.py                         # default vs lean, 20 reactions each
+    python bench_driver.py --pages 50 --profiles lean
+    python bench_driver.py --mock --report driver_bench.json   # in-process mock_ord_site
+    ORD_BASE_URL=http://localhost:8000 python bench_driver.py
+
+Each profile gets a fresh driver that reads the same reaction records with
+web_scrpaer_2.scrape_reaction_data (page load, modal, JSON). RSS covers
+chromedriver and every Chrome process under it, so psutil is required for
+the memory columns.
+"""
+import argparse
+import json
+import time
+
+import scraper_setup
+import web_scrpaer_2
+from driver_pool import process_tree_rss_mb
+from mock_ord_site import MockORDSite, build_site_data
+from ord_fixtures import load_fixture_datasets
+
+
+def bench_profile(profile, reaction_ids):
+    started = time.perf_counter()
+    driver = scraper_setup.get_driver(profile)
+    launch_time = time.perf_counter() - started
+    rss_samples = []
+    ok = 0
+    try:
+        started = time.perf_counter()
+        for reaction_id in reaction_ids:
+            if web_scrpaer_2.scrape_reaction_data(driver, reaction_id, max_retries=1)['success']:
+                ok += 1
+            rss = process_tree_rss_mb(driver)
+            if rss is not None:
+                rss_samples.append(rss)
+        elapsed = time.perf_counter() - started
+    finally:
+        driver.quit()
+    return {
+        'profile': profile,
+        'launch_s': launch_time,
+        'pages_per_s': len(reaction_ids) / elapsed if elapsed else 0.0,
+        'ok': ok,
+        'rss_avg_mb': sum(rss_samples) / len(rss_samples) if rss_samples else None,
+        'rss_peak_mb': max(rss_samples) if rss_samples else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Driver profile benchmark")
+    parser.add_argument('--profiles', nargs='+', choices=scraper_setup.DRIVER_PROFILES,
+                        default=list(scraper_setup.DRIVER_PROFILES))
+    parser.add_argument('--pages', type=int, default=20, help="Reaction pages read per profile")
+    parser.add_argument('--fixture', default='ord_formatted_data.json',
+                        help="Reaction IDs are taken from this formatted output file")
+    parser.add_argument('--mock', action='store_true', help="Serve the fixtures from an in-process mock ORD site")
+    parser.add_argument('--latency', type=float, default=0.0, help="--mock: seconds injected into every response")
+    parser.add_argument('--report', default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    reaction_ids = [r['reactionId'] for rs in load_fixture_datasets([args.fixture]).values() for r in rs]
+    reaction_ids = reaction_ids[:args.pages]
+    site = None
+    if args.mock:
+        site = MockORDSite(build_site_data([args.fixture]), latency=args.latency).start()
+        web_scrpaer_2.BASE_URL = site.url
+    print(f"{len(reaction_ids)} reaction pages from {web_scrpaer_2.BASE_URL} per profile\n")
+
+    try:
+        results = [bench_profile(profile, reaction_ids) for profile in args.profiles]
+    finally:
+        if site is not None:
+            site.stop()
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'base_url': web_scrpaer_2.BASE_URL, 'pages': len(reaction_ids), 'results': results}, f, indent=2)
+
+    def mb(value):
+        return f"{value:,.0f}" if value is not None else "n/a"
+
+    print(f"\n{'profile':<8} {'launch s':>9} {'pages/s':>8} {'ok':>5} {'avg RSS MB':>11} {'peak RSS MB':>12}")
+    for r in results:
+        print(f"{r['profile']:<8} {r['launch_s']:>9.2f} {r['pages_per_s']:>8.2f} {r['ok']:>5} "
+              f"{mb(r['rss_avg_mb']):>11} {mb(r['rss_peak_mb']):>12}")
+    if len(results) == 2 and results[0]['pages_per_s']:
+        base, other = results
+        print(f"\n{other['profile']} vs {base['profile']}: "
+              f"{other['pages_per_s'] / base['pages_per_s']:.2f}x pages/s", end='')
+        if base['rss_peak_mb'] and other['rss_peak_mb']:
+            print(f", {other['rss_peak_mb'] / base['rss_peak_mb']:.2f}x peak RSS")
+        else:
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""End-to-end throughput benchmark against the local mock ORD site.
+
+    python bench_e2e.py                                        # fetch-only modes, 1/4/16 workers
+    python bench_e2e.py --modes browser http async --workers 1 3 --driver-profile lean
+    python bench_e2e.py --latency 0.05 --jitter 0.02 --scale 20 --report bench.json
+
+Modes:
+  browser      scrape_all_datasets_parallel, records read from the page (Chrome)
+  http         scrape_all_datasets_parallel with the HTTP backend (Chrome enumerates), one
+               connection per worker
+  async        scrape_all_datasets_async (Chrome enumerates, asyncio fetches)
+  http-fetch   HTTPRecordFetcher.scrape_many over every reaction ID, no browser
+  async-fetch  run_async_crawl over every reaction ID, no browser
+For every mode and worker count this reports reactions/s, p50/p95 per-reaction
+latency and peak RSS of this process plus its children (Chrome included; needs psutil).
+Only the browser modes import web_scrpaer_2, so the fetch-only modes run without
+selenium or Chrome installed.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+import async_crawler
+from http_fetcher import HTTPRecordFetcher
+from mock_ord_site import MockORDSite, build_site_data
+from reaction_formatter import formatter_for
+
+MODES = ('browser', 'http', 'async', 'http-fetch', 'async-fetch')
+BROWSER_MODES = ('browser', 'http', 'async')
+UNLIMITED_RATE = 1e9
+
+
+class PeakRSS:
+    """Sample RSS of this process and all its children until stopped"""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _sample(self):
+        me = psutil.Process(os.getpid())
+        total = 0
+        for proc in [me] + me.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        mb = total / (1024 * 1024)
+        self.peak_mb = mb if self.peak_mb is None else max(self.peak_mb, mb)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if psutil is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if psutil is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def _timed(fn, latencies, lock):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with lock:
+                latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def _timed_async(fn, latencies, lock):
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            with lock:
+                latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def load_scraper(site, driver_profile):
+    """Import web_scrpaer_2 (and with it selenium) and point it at the mock site"""
+    import web_scrpaer_2
+    web_scrpaer_2.BASE_URL = site.url
+    web_scrpaer_2.DRIVER_PROFILE = driver_profile
+    return web_scrpaer_2
+
+
+def run_mode(mode, workers, site, driver_profile='lean'):
+    """One benchmark run -> (successful reactions, per-reaction latencies)"""
+    latencies, lock = [], threading.Lock()
+    reaction_ids = {d: [r['reactionId'] for r in records] for d, records in site.datasets.items()}
+    format_fn = formatter_for('full')
+    web_scrpaer_2 = load_scraper(site, driver_profile) if mode in BROWSER_MODES else None
+
+    if mode in ('browser', 'http'):
+        original = web_scrpaer_2.scrape_and_format_reaction
+        web_scrpaer_2.scrape_and_format_reaction = _timed(original, latencies, lock)
+        try:
+            # One HTTP connection per worker, or the fetcher's pool size would set the worker count
+            results = web_scrpaer_2.scrape_all_datasets_parallel(max_workers=workers, backend=mode,
+                                                                 http_pool_size=workers)
+        finally:
+            web_scrpaer_2.scrape_and_format_reaction = original
+        ok = sum(d.get('successful_scrapes', 0) for d in results)
+
+    elif mode in ('async', 'async-fetch'):
+        original = async_crawler.fetch_reaction_async
+        async_crawler.fetch_reaction_async = _timed_async(original, latencies, lock)
+        try:
+            if mode == 'async':
+                results = web_scrpaer_2.scrape_all_datasets_async(max_workers=workers, rate=UNLIMITED_RATE,
+                                                                  burst=int(UNLIMITED_RATE))
+            else:
+                results = async_crawler.run_async_crawl(reaction_ids, format_fn, base_url=site.url,
+                                                        rate=UNLIMITED_RATE, burst=int(UNLIMITED_RATE),
+                                                        concurrency=workers)
+        finally:
+            async_crawler.fetch_reaction_async = original
+        ok = sum(d.get('successful_scrapes', 0) for d in results)
+
+    elif mode == 'http-fetch':
+        fetcher = HTTPRecordFetcher(site.url, pool_size=workers)
+        fetcher.scrape_reaction_data = _timed(fetcher.scrape_reaction_data, latencies, lock)
+        try:
+            all_ids = [rid for ids in reaction_ids.values() for rid in ids]
+            results = fetcher.scrape_many(all_ids, max_workers=workers)
+        finally:
+            fetcher.close()
+        for result in results:
+            if result['success']:
+                format_fn(result)
+        ok = sum(1 for r in results if r['success'])
+
+    else:
+        raise ValueError(f"Unknown mode {mode!r}")
+    return ok, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against a mock ORD site")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=['http-fetch', 'async-fetch'])
+    parser.add_argument('--workers', nargs='+', type=int, default=[1, 4, 16])
+    parser.add_argument('--scale', type=int, default=10, help="Repeat the fixture datasets this many times")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds injected into every mock response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument('--page-state', action='store_true', help="Let browser modes read records from page state")
+    parser.add_argument('--driver-profile', default='lean', help="Browser modes: default or lean")
+    parser.add_argument('--report', default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    site = MockORDSite(build_site_data(scale=args.scale), latency=args.latency,
+                       jitter=args.jitter, page_state=args.page_state).start()
+    print(f"Mock site {site.url}: {len(site.datasets)} datasets, {len(site.records)} reactions, "
+          f"latency {args.latency:g}s + jitter {args.jitter:g}s")
+
+    rows = []
+    try:
+        for mode in args.modes:
+            for workers in args.workers:
+                print(f"\n--- {mode}, {workers} workers ---")
+                started = time.perf_counter()
+                try:
+                    with PeakRSS() as rss:
+                        ok, latencies = run_mode(mode, workers, site, args.driver_profile)
+                except Exception as e:
+                    print(f"✗ {mode} with {workers} workers failed: {e}")
+                    if mode in BROWSER_MODES:
+                        print("  (browser modes need selenium, Chrome and chromedriver)")
+                    continue
+                elapsed = time.perf_counter() - started
+                rows.append({
+                    'mode': mode, 'workers': workers, 'reactions': ok, 'seconds': round(elapsed, 3),
+                    'reactions_per_s': round(ok / elapsed, 2) if elapsed else 0.0,
+                    'p50_s': round(percentile(latencies, 0.50), 4),
+                    'p95_s': round(percentile(latencies, 0.95), 4),
+                    'peak_rss_mb': round(rss.peak_mb, 1) if rss.peak_mb is not None else None,
+                })
+    finally:
+        site.stop()
+
+    print(f"\n{'mode':<12} {'workers':>7} {'ok':>6} {'react/s':>9} {'p50 s':>8} {'p95 s':>8} {'peak RSS MB':>12}")
+    for r in rows:
+        rss = f"{r['peak_rss_mb']:,.0f}" if r['peak_rss_mb'] is not None else "n/a"
+        print(f"{r['mode']:<12} {r['workers']:>7} {r['reactions']:>6} {r['reactions_per_s']:>9.1f} "
+              f"{r['p50_s']:>8.4f} {r['p95_s']:>8.4f} {rss:>12}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'site': {'datasets': len(site.datasets), 'reactions': len(site.records),
+                                'latency': args.latency, 'jitter': args.jitter}, 'runs': rows}, f, indent=2)
+        print(f"\n✓ Report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""Benchmark the spec-driven formatter against the hand-written format_reaction_data copies.
+
+    python bench_formatter.py                      # ord_formatted_data_one.json-sized input
+    python bench_formatter.py --repeat 20 --fixture ord_formatted_data.json
+
+The two legacy functions below are frozen copies of the implementations that
+web_scrpaer_2.py ("full") and web_scraper.py ("smiles") used before the
+extraction spec, kept here as the reference for output equality and speed.
+"""
+import argparse
+import time
+
+from ord_fixtures import load_fixture_datasets
+from reaction_formatter import formatter_for, REACTION_ROLE_MAPPING, IDENTIFIER_TYPE_MAPPING
+
+
+# --- REFERENCE IMPLEMENTATIONS ---
+
+def legacy_format_full(reaction_data):
+    """Extract all identifiers types, amount, and reaction_role with CORRECT mappings."""
+    if not reaction_data or 'data' not in reaction_data:
+        return None
+    
+    data = reaction_data['data']
+    formatted = {
+        'reaction_id': data.get('reactionId'),
+        'success': reaction_data.get('success', True), # specific handle if success missing
+        'inputsMap': []
+    }
+
+    # --- MAPPINGS BASED ON ORD PROTOBUF DEFINITIONS ---
+    # Mass: 1=KG, 2=G, 3=MG, 4=UG
+    MASS_UNIT_MAPPING = { 0: "UNSPECIFIED", 1: "KILOGRAM", 2: "GRAM", 3: "MILLIGRAM", 4: "MICROGRAM" }
+    
+    # Volume: 1=L, 2=ML, 3=UL, 4=NL
+    VOLUME_UNIT_MAPPING = { 0: "UNSPECIFIED", 1: "LITER", 2: "MILLILITER", 3: "MICROLITER", 4: "NANOLITER" }
+    
+    # Moles: 1=MOL, 2=MMOL, 3=UMOL, 4=NMOL
+    MOLE_UNIT_MAPPING = { 0: "UNSPECIFIED", 1: "MOLE", 2: "MILLIMOLE", 3: "MICROMOLE", 4: "NANOMOLE" }
+
+    def extract_identifiers(item):
+        extracted_ids = []
+        for identifier in item.get("identifiersList", []):
+            type_int = identifier.get("type", 0)
+            type_str = IDENTIFIER_TYPE_MAPPING.get(type_int, "UNKNOWN")
+            extracted_ids.append({
+                "type": type_str,
+                "value": identifier.get("value")
+            })
+        return extracted_ids
+    if 'inputsMap' in data:
+        for input_entry in data["inputsMap"]:
+            tab_name = input_entry[0]
+            input_data = input_entry[1]
+            
+            formatted_components = []
+            for component in input_data.get("componentsList", []):
+                
+                identifiers = extract_identifiers(component)
+                
+                amount_data = {}
+                if 'amount' in component:
+                    amt = component['amount']
+                    
+                    if 'moles' in amt:
+                        val = amt['moles'].get('value')
+                        unit_id = amt['moles'].get('units', 0)
+                        amount_data = {
+                            "moles": { "value": val, "units": MOLE_UNIT_MAPPING.get(unit_id, "UNKNOWN") }
+                        }
+                    elif 'volume' in amt:
+                        val = amt['volume'].get('value')
+                        unit_id = amt['volume'].get('units', 0)
+                        amount_data = {
+                            "volume": { "value": val, "units": VOLUME_UNIT_MAPPING.get(unit_id, "UNKNOWN") }
+                        }
+                    elif 'mass' in amt:
+                        val = amt['mass'].get('value')
+                        unit_id = amt['mass'].get('units', 0)
+                        amount_data = {
+                            "mass": { "value": val, "units": MASS_UNIT_MAPPING.get(unit_id, "UNKNOWN") }
+                        }
+                
+                reaction_role_value = component.get("reactionRole")
+                reaction_role = REACTION_ROLE_MAPPING.get(reaction_role_value, "UNKNOWN")
+                
+                component_info = {
+                    "identifiers": identifiers,
+                    "amount": amount_data,
+                    "reaction_role": reaction_role
+                }
+                formatted_components.append(component_info)
+            
+            formatted_input = [ tab_name, { "components": formatted_components } ]
+            formatted['inputsMap'].append(formatted_input)
+    
+    formatted['outcomes'] = []
+    if 'outcomesList' in data:
+        for outcome in data['outcomesList']:
+            for product in outcome.get('productsList', []):
+                
+                identifiers = extract_identifiers(product)
+                
+                # --- FIXED MEASUREMENT LOGIC ---
+                # We need to map the measurements (Yield/Mass) similar to how we mapped inputs
+                formatted_measurements = []
+                for meas in product.get('measurementsList', []):
+                    # Check if it's a MASS measurement (Type 9 usually, but we check structure)
+                    meas_data = {"type": meas.get("type"), "details": meas.get("details")}
+                    
+                    # Extract amount if present in measurement
+                    if 'amount' in meas and 'mass' in meas['amount']:
+                         val = meas['amount']['mass'].get('value')
+                         unit_id = meas['amount']['mass'].get('units', 0)
+                         meas_data['mass'] = {
+                             "value": val,
+                             "units": MASS_UNIT_MAPPING.get(unit_id, "UNKNOWN")
+                         }
+                    formatted_measurements.append(meas_data)
+
+                product_info = {
+                    "identifiers": identifiers,
+                    "reaction_role": "PRODUCT",
+                    "is_desired_product": product.get('isDesiredProduct', False),
+                    "measurements": formatted_measurements
+                }
+                formatted['outcomes'].append(product_info)
+    
+    return formatted
+
+
+def legacy_format_smiles(reaction_data):
+    """Extract identifiers, amount, and reaction_role while preserving input map structure"""
+    if not reaction_data or 'data' not in reaction_data:
+        return None
+    
+    data = reaction_data['data']
+    formatted = {
+        'reaction_id': data.get('reactionId'),
+        'success': reaction_data['success'],
+        'inputsMap': []
+    }
+    
+    # Extract inputs while preserving the map structure
+    if 'inputsMap' in data:
+        for input_entry in data["inputsMap"]:
+            tab_name = input_entry[0]
+            input_data = input_entry[1]
+            
+            formatted_components = []
+            for component in input_data.get("componentsList", []):
+                # Get identifiers (SMILES)
+                identifiers = []
+                for identifier in component.get("identifiersList", []):
+                    if identifier.get("type") == 2:  # SMILES
+                        identifiers.append({
+                            "type": "SMILES",
+                            "value": identifier.get("value")
+                        })
+                
+                # Get amount (moles OR volume)
+                amount_data = {}
+                if 'amount' in component:
+                    if 'moles' in component['amount']:
+                        moles = component['amount']['moles']
+                        amount_data = {
+                            "moles": {
+                                "value": moles.get('value'),
+                                "units": "MOLE"
+                            }
+                        }
+                    elif 'volume' in component['amount']:
+                        volume = component['amount']['volume']
+                        amount_data = {
+                            "volume": {
+                                "value": volume.get('value'),
+                                "units": "LITER"
+                            }
+                        }
+                
+                # Get reaction role
+                reaction_role_value = component.get("reactionRole")
+                reaction_role = REACTION_ROLE_MAPPING.get(reaction_role_value, "UNKNOWN")
+                
+                component_info = {
+                    "identifiers": identifiers,
+                    "amount": amount_data,
+                    "reaction_role": reaction_role
+                }
+                formatted_components.append(component_info)
+            
+            # Preserve the tab name and its components
+            formatted_input = [
+                tab_name,
+                {
+                    "components": formatted_components
+                }
+            ]
+            formatted['inputsMap'].append(formatted_input)
+    
+    # Extract products from outcomes separately
+    formatted['outcomes'] = []
+    if 'outcomesList' in data:
+        for outcome in data['outcomesList']:
+            for product in outcome.get('productsList', []):
+                # Get identifiers (SMILES)
+                identifiers = []
+                for identifier in product.get('identifiersList', []):
+                    if identifier.get("type") == 2:  # SMILES
+                        identifiers.append({
+                            "type": "SMILES",
+                            "value": identifier.get("value")
+                        })
+                
+                # Products typically don't have amounts in the same way
+                amount_data = {}
+                
+                product_info = {
+                    "identifiers": identifiers,
+                    "amount": amount_data,
+                    "reaction_role": "PRODUCT",
+                    "is_desired_product": product.get('isDesiredProduct', False)
+                }
+                formatted['outcomes'].append(product_info)
+    
+    return formatted
+
+
+LEGACY = {'full': legacy_format_full, 'smiles': legacy_format_smiles}
+
+
+def time_formatters(fns, inputs, repeat):
+    """Best-pass rate of each function; passes alternate so machine noise hits all of them alike"""
+    best = [float('inf')] * len(fns)
+    for _ in range(repeat):
+        for i, fn in enumerate(fns):
+            started = time.perf_counter()
+            for reaction_data in inputs:
+                fn(reaction_data)
+            best[i] = min(best[i], time.perf_counter() - started)
+    return [len(inputs) / b for b in best]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Formatter throughput benchmark")
+    parser.add_argument('--fixture', default='ord_formatted_data_one.json')
+    parser.add_argument('--repeat', type=int, default=50, help="Timed passes; the best one is reported")
+    args = parser.parse_args()
+
+    records = [r for rs in load_fixture_datasets([args.fixture]).values() for r in rs]
+    inputs = [{'reaction_id': r['reactionId'], 'data': r, 'success': True} for r in records]
+    print(f"{len(inputs)} reactions from {args.fixture}, best of {args.repeat} passes\n")
+
+    print(f"{'flavour':<8} {'legacy r/s':>12} {'spec r/s':>14} {'speedup':>8}  output")
+    for flavour, legacy in LEGACY.items():
+        formatter = formatter_for(flavour)
+        same = all(formatter(x) == legacy(x) for x in inputs)
+        legacy_rate, spec_rate = time_formatters([legacy, formatter], inputs, args.repeat)
+        print(f"{flavour:<8} {legacy_rate:>12,.0f} {spec_rate:>14,.0f} {spec_rate / legacy_rate:>7.2f}x  "
+              f"{'identical' if same else 'DIFFERS'}")
+
+
+if __name__ == "__main__":
+    main()
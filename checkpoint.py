@@ -0,0 +1,192 @@
+import json
+import sqlite3
+import threading
+import time
+
+# --- CONFIGURATION ---
+DEFAULT_CHECKPOINT_PATH = 'ord_progress.sqlite'
+ITER_BATCH_SIZE = 500  # checkpoint rows read at a time when re-emitting results
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_id TEXT NOT NULL,
+    range_key TEXT NOT NULL,
+    reaction_ids TEXT NOT NULL,
+    enumerated_at REAL NOT NULL,
+    PRIMARY KEY (dataset_id, range_key)
+);
+CREATE TABLE IF NOT EXISTS reactions (
+    reaction_id TEXT PRIMARY KEY,
+    dataset_id TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    formatted TEXT,
+    error TEXT,
+    failure TEXT,
+    attempts INTEGER,
+    scraped_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reactions_dataset ON reactions (dataset_id);
+"""
+
+
+def _range_key(start, end):
+    return f"{start or ''}:{end or ''}"
+
+
+class ProgressStore:
+    """Crash-safe crawl progress in SQLite (WAL mode).
+
+    Every enumerated dataset and every scraped reaction is committed as soon as
+    it completes, so a crash or Ctrl-C loses at most the reactions in flight.
+    One connection is shared by all worker threads behind a lock.
+    """
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        # Checkpoints written before failures were classified lack these columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(reactions)")}
+        for column, kind in (('failure', 'TEXT'), ('attempts', 'INTEGER')):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE reactions ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def is_empty(self):
+        """True when no earlier run has left anything in the checkpoint"""
+        with self._lock:
+            return not any(self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()
+                           for table in ('meta', 'datasets', 'reactions'))
+
+    def reset(self):
+        """Forget all progress (start of a fresh, non-resumed run)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM meta")
+            self._conn.execute("DELETE FROM datasets")
+            self._conn.execute("DELETE FROM reactions")
+
+    # --- RUN METADATA ---
+
+    def save_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def load_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_dataset_list(self, key, dataset_ids):
+        self.save_meta(f"dataset_list:{key}", dataset_ids)
+
+    def load_dataset_list(self, key):
+        return self.load_meta(f"dataset_list:{key}")
+
+    # --- ENUMERATION ---
+
+    def save_enumeration(self, dataset_id, start, end, reaction_ids):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO datasets (dataset_id, range_key, reaction_ids, enumerated_at) VALUES (?, ?, ?, ?)",
+                (dataset_id, _range_key(start, end), json.dumps(list(reaction_ids)), time.time()))
+
+    def load_enumeration(self, dataset_id, start, end):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT reaction_ids FROM datasets WHERE dataset_id = ? AND range_key = ?",
+                (dataset_id, _range_key(start, end))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def enumeration_order(self):
+        """[(dataset_id, reaction_id)] in listing order: datasets as first listed, reactions as enumerated"""
+        with self._lock:
+            lists = self._conn.execute(
+                "SELECT value FROM meta WHERE key LIKE 'dataset_list:%' ORDER BY rowid").fetchall()
+            rows = self._conn.execute(
+                "SELECT dataset_id, reaction_ids FROM datasets ORDER BY enumerated_at").fetchall()
+        position = {}
+        for (value,) in lists:
+            for dataset_id in json.loads(value):
+                position.setdefault(dataset_id, len(position))
+        rows.sort(key=lambda row: position.get(row[0], len(position)))
+        return [(dataset_id, reaction_id) for dataset_id, reaction_ids in rows
+                for reaction_id in json.loads(reaction_ids)]
+
+    # --- REACTIONS ---
+
+    def save_reaction(self, dataset_id, result):
+        formatted = result.get('formatted_data')
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reactions (reaction_id, dataset_id, success, formatted, error, failure, "
+                "attempts, scraped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (result['reaction_id'], dataset_id, int(bool(result.get('success'))),
+                 json.dumps(formatted, ensure_ascii=False) if formatted is not None else None,
+                 result.get('error'), result.get('failure'), result.get('attempts'), time.time()))
+
+    def load_reaction(self, reaction_id):
+        """Stored result for a successfully scraped reaction, or None if it still needs work"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT formatted FROM reactions WHERE reaction_id = ? AND success = 1", (reaction_id,)).fetchone()
+        if not row:
+            return None
+        result = {'reaction_id': reaction_id, 'data': None, 'success': True, 'resumed': True}
+        if row[0] is not None:
+            result['formatted_data'] = json.loads(row[0])
+        return result
+
+    def iter_formatted(self, batch_size=ITER_BATCH_SIZE):
+        """Yield (dataset_id, formatted_data) for every successfully scraped reaction.
+
+        Rows are streamed ``batch_size`` at a time from a read connection of
+        their own, so neither the whole checkpoint nor the store lock is held.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                "SELECT dataset_id, formatted FROM reactions WHERE success = 1 AND formatted IS NOT NULL "
+                "ORDER BY dataset_id, scraped_at")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                for dataset_id, formatted in rows:
+                    yield dataset_id, json.loads(formatted)
+        finally:
+            conn.close()
+
+    def dead_letters(self, kinds=None):
+        """[(dataset_id, reaction_id, failure kind)] for reactions that ran out of attempts.
+
+        Failed reactions stay in the table until a later attempt succeeds, so
+        this is the persisted dead-letter queue. ``kinds`` limits it to some
+        failure kinds; unclassified failures from older checkpoints count as transient.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dataset_id, reaction_id, COALESCE(failure, 'transient') FROM reactions "
+                "WHERE success = 0 ORDER BY dataset_id, scraped_at").fetchall()
+        return [row for row in rows if kinds is None or row[2] in kinds]
+
+    def done_reaction_ids(self):
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT reaction_id FROM reactions WHERE success = 1")}
+
+    def counts(self):
+        with self._lock:
+            datasets = self._conn.execute("SELECT COUNT(*) FROM datasets").fetchone()[0]
+            done, failed = self._conn.execute(
+                "SELECT COALESCE(SUM(success), 0), COALESCE(SUM(1 - success), 0) FROM reactions").fetchone()
+        return {'datasets_enumerated': datasets, 'reactions_done': done, 'reactions_failed': failed}
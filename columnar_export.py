@@ -0,0 +1,252 @@
+"""Columnar (Parquet / Arrow IPC) export of formatted reactions.
+
+    python columnar_export.py ord_formatted_data.json                 # -> ord_columnar_components.parquet
+    python columnar_export.py ord_formatted_data.jsonl --format arrow --prefix out/ord   # -> .arrows
+
+Two tables, one row per input component and one row per outcome product.
+Repeated strings (dataset, reaction, tab, role, identifier type, unit, SMILES)
+are dictionary encoded. During a crawl, ColumnarWriter is used as an output
+sink and writes one row group / record batch every ``batch_rows`` rows.
+Arrow output is the IPC *stream* format (read it with pyarrow.ipc.open_stream),
+because the IPC file format can't hold a new dictionary per batch.
+"""
+import argparse
+import queue
+import threading
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from delta_sync import load_existing_output
+
+# --- CONFIGURATION ---
+DEFAULT_COLUMNAR_PREFIX = 'ord_columnar'   # -> ord_columnar_components.parquet + ord_columnar_outcomes.parquet
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+BATCH_ROWS = 10000                         # component rows buffered before a batch is written
+PREFERRED_IDENTIFIER = 'SMILES'            # the identifier put in identifier_type/identifier_value
+
+_CLOSE = object()
+
+# (column, kind) per table; 'dict' columns are dictionary-encoded strings
+COMPONENT_COLUMNS = (
+    ('dataset_id', 'dict'), ('reaction_id', 'dict'), ('input_name', 'dict'), ('component_index', 'int16'),
+    ('reaction_role', 'dict'), ('identifier_type', 'dict'), ('identifier_value', 'dict'),
+    ('amount_kind', 'dict'), ('amount_value', 'float64'), ('amount_unit', 'dict'), ('identifiers', 'identifiers'),
+)
+OUTCOME_COLUMNS = (
+    ('dataset_id', 'dict'), ('reaction_id', 'dict'), ('product_index', 'int16'), ('reaction_role', 'dict'),
+    ('is_desired_product', 'bool'), ('identifier_type', 'dict'), ('identifier_value', 'dict'),
+    ('amount_kind', 'dict'), ('amount_value', 'float64'), ('amount_unit', 'dict'), ('identifiers', 'identifiers'),
+)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar export needs pyarrow: pip install pyarrow")
+
+
+def _arrow_type(kind):
+    if kind == 'dict':
+        return pa.dictionary(pa.int32(), pa.string())
+    if kind == 'identifiers':
+        return pa.list_(pa.struct([('type', pa.string()), ('value', pa.string())]))
+    return {'int16': pa.int16(), 'float64': pa.float64(), 'bool': pa.bool_()}[kind]
+
+
+def _schema(columns):
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in columns])
+
+
+# --- FLATTENING ---
+
+def _primary_identifier(identifiers):
+    for identifier in identifiers:
+        if identifier.get('type') == PREFERRED_IDENTIFIER:
+            return identifier
+    return identifiers[0] if identifiers else {}
+
+
+def _amount(amount):
+    """(kind, value, unit) of the first quantity in a formatted amount"""
+    for kind, quantity in (amount or {}).items():
+        return kind, quantity.get('value'), quantity.get('units')
+    return None, None, None
+
+
+def flatten_reaction(dataset_id, formatted, components, outcomes):
+    """Append one formatted reaction's rows to the ``components`` / ``outcomes`` column dicts"""
+    reaction_id = formatted.get('reaction_id')
+    for input_name, tab in formatted.get('inputsMap', ()):
+        for index, component in enumerate(tab.get('components', ())):
+            identifiers = component.get('identifiers', [])
+            primary = _primary_identifier(identifiers)
+            kind, value, unit = _amount(component.get('amount'))
+            for column, item in (('dataset_id', dataset_id), ('reaction_id', reaction_id), ('input_name', input_name),
+                                 ('component_index', index), ('reaction_role', component.get('reaction_role')),
+                                 ('identifier_type', primary.get('type')), ('identifier_value', primary.get('value')),
+                                 ('amount_kind', kind), ('amount_value', value), ('amount_unit', unit),
+                                 ('identifiers', identifiers)):
+                components[column].append(item)
+    for index, product in enumerate(formatted.get('outcomes', ())):
+        identifiers = product.get('identifiers', [])
+        primary = _primary_identifier(identifiers)
+        kind, value, unit = _amount(product.get('amount'))
+        if kind is None:
+            # The full flavour has no product amount; the first weighed measurement stands in
+            for measurement in product.get('measurements', ()):
+                if 'mass' in measurement:
+                    kind, value, unit = _amount({'mass': measurement['mass']})
+                    break
+        for column, item in (('dataset_id', dataset_id), ('reaction_id', reaction_id), ('product_index', index),
+                             ('reaction_role', product.get('reaction_role')),
+                             ('is_desired_product', product.get('is_desired_product')),
+                             ('identifier_type', primary.get('type')), ('identifier_value', primary.get('value')),
+                             ('amount_kind', kind), ('amount_value', value), ('amount_unit', unit),
+                             ('identifiers', identifiers)):
+            outcomes[column].append(item)
+
+
+def _empty_columns(columns):
+    return {name: [] for name, _ in columns}
+
+
+def _record_batch(columns, schema, data):
+    arrays = []
+    for (name, kind), field in zip(columns, schema):
+        if kind == 'dict':
+            arrays.append(pa.array(data[name], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(data[name], type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# --- WRITER ---
+
+class _TableFile:
+    """One output table (Parquet file or Arrow IPC stream) fed record batches"""
+
+    def __init__(self, path, columns, fmt):
+        self.path = path
+        self.columns = columns
+        self.schema = _schema(columns)
+        self.rows = 0
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, self.schema, compression='zstd', use_dictionary=True)
+            self._write = self._writer.write_batch
+        else:
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_stream(self._sink, self.schema)
+            self._write = self._writer.write_batch
+
+    def write(self, data):
+        batch = _record_batch(self.columns, self.schema, data)
+        if batch.num_rows:
+            self._write(batch)
+            self.rows += batch.num_rows
+
+    def close(self):
+        self._writer.close()
+        if hasattr(self, '_sink'):
+            self._sink.close()
+
+
+class ColumnarWriter:
+    """Flatten formatted reactions into component/outcome tables from one background thread.
+
+    Same calling convention as output_writer.JSONLWriter: workers call
+    write(dataset_id, formatted) and return immediately. Rows are buffered as
+    Python column lists and written as one batch every ``batch_rows``
+    component rows (and once more on close()).
+    """
+
+    def __init__(self, prefix=DEFAULT_COLUMNAR_PREFIX, fmt='parquet', batch_rows=BATCH_ROWS):
+        _require_pyarrow()
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format {fmt!r}, expected one of {COLUMNAR_FORMATS}")
+        ext = 'parquet' if fmt == 'parquet' else 'arrows'
+        self.batch_rows = batch_rows
+        self.reactions_written = 0
+        self.error = None
+        self.components = _TableFile(f"{prefix}_components.{ext}", COMPONENT_COLUMNS, fmt)
+        self.outcomes = _TableFile(f"{prefix}_outcomes.{ext}", OUTCOME_COLUMNS, fmt)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="columnar-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def paths(self):
+        return self.components.path, self.outcomes.path
+
+    def write(self, dataset_id, formatted):
+        self._queue.put((dataset_id, formatted))
+
+    def _run(self):
+        components, outcomes = _empty_columns(COMPONENT_COLUMNS), _empty_columns(OUTCOME_COLUMNS)
+        while True:
+            item = self._queue.get()
+            if self.error is not None:
+                # Keep draining so writers never block; close() re-raises
+                if item is _CLOSE:
+                    return
+                continue
+            try:
+                components, outcomes = self._handle(item, components, outcomes)
+            except Exception as e:
+                self.error = e
+            if item is _CLOSE:
+                return
+
+    def _handle(self, item, components, outcomes):
+        if item is not _CLOSE:
+            flatten_reaction(*item, components, outcomes)
+            self.reactions_written += 1
+        if item is _CLOSE or len(components['dataset_id']) >= self.batch_rows:
+            self.components.write(components)
+            self.outcomes.write(outcomes)
+            components, outcomes = _empty_columns(COMPONENT_COLUMNS), _empty_columns(OUTCOME_COLUMNS)
+        return components, outcomes
+
+    def close(self):
+        """Write the last batch and close both files"""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self.components.close()
+        self.outcomes.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_formatted_output(formatted_output, prefix=DEFAULT_COLUMNAR_PREFIX, fmt='parquet', batch_rows=BATCH_ROWS):
+    """Write an ord_formatted_data.json-shaped dict to columnar files; returns the writer (closed)"""
+    with ColumnarWriter(prefix, fmt, batch_rows) as writer:
+        for dataset_id, dataset in formatted_output.items():
+            for reaction in dataset.get('reactions', []):
+                writer.write(dataset_id, reaction)
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert formatted ORD output (JSON or JSONL) to Parquet/Arrow tables")
+    parser.add_argument('input', help="ord_formatted_data.json or a .jsonl output")
+    parser.add_argument('--format', choices=COLUMNAR_FORMATS, default='parquet')
+    parser.add_argument('--prefix', default=DEFAULT_COLUMNAR_PREFIX,
+                        help="Output path prefix (default: %(default)s -> <prefix>_components / <prefix>_outcomes)")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    writer = export_formatted_output(load_existing_output(args.input), args.prefix, args.format, args.batch_rows)
+    print(f"✓ {writer.reactions_written} reactions -> {writer.components.path} ({writer.components.rows} rows), "
+          f"{writer.outcomes.path} ({writer.outcomes.rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
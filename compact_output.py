@@ -0,0 +1,158 @@
+"""Compact formatted output: one compound table per file, reactions reference it by ID.
+
+    python compact_output.py ord_formatted_data.json                     # -> ord_formatted_data.compact.json
+    python compact_output.py ord_formatted_data.compact.json --expand --output ord_formatted_data.json
+
+The same reagents and solvents appear in thousands of reactions, each time
+with the full identifier list. In the compact form every distinct identifier
+list is stored once in ``compounds`` and components/products carry its index:
+
+    {"format": "ord-compact", "version": 1,
+     "datasets": {dataset_id: {"dataset_id": ..., "total_reactions_scraped": ..., "reactions": [
+         {..., "inputsMap": [["Solvent", {"components": [{"compound": 0, "amount": ..., ...}]}]],
+          "outcomes": [{"compound": 7, ...}]}]}},
+     "compounds": [[{"type": "SMILES", "value": "CCO"}, ...], ...]}
+
+expand_compact() (and delta_sync.load_existing_output) give back exactly the
+ord_formatted_data.json shape. Compact files are written without indentation,
+which accounts for most of the saving over the indented ord_formatted_data.json;
+against minified JSON the compound table itself saves about 10% on
+ord_formatted_data_one.json (229,455 -> 207,483 bytes), since amounts differ
+from reaction to reaction and stay inline.
+"""
+import argparse
+import json
+import os
+
+COMPACT_FORMAT = 'ord-compact'
+COMPACT_VERSION = 1
+DEFAULT_COMPACT_PATH = 'ord_formatted_data.compact.json'
+
+
+class CompoundTable:
+    """Distinct identifier lists, numbered in order of first appearance"""
+
+    def __init__(self):
+        self.compounds = []
+        self._ids = {}
+
+    def add(self, identifiers):
+        """ID of ``identifiers``, adding it to the table if it is new"""
+        key = tuple((i.get('type'), i.get('value')) for i in identifiers)
+        compound_id = self._ids.get(key)
+        if compound_id is None:
+            compound_id = self._ids[key] = len(self.compounds)
+            self.compounds.append(identifiers)
+        return compound_id
+
+    def __len__(self):
+        return len(self.compounds)
+
+
+def _swap(item, old, new, convert):
+    """Copy of ``item`` with key ``old`` renamed to ``new`` and its value converted, keeping key order"""
+    return {(new if key == old else key): (convert(value) if key == old else value) for key, value in item.items()}
+
+
+def _map_compounds(reaction, old, new, convert):
+    """Copy of ``reaction`` with _swap applied to every component and product"""
+    mapped = dict(reaction)
+    if 'inputsMap' in reaction:
+        mapped['inputsMap'] = [[name, {**tab, 'components': [_swap(c, old, new, convert)
+                                                             for c in tab.get('components', ())]}]
+                               for name, tab in reaction['inputsMap']]
+    if 'outcomes' in reaction:
+        mapped['outcomes'] = [_swap(p, old, new, convert) for p in reaction['outcomes']]
+    return mapped
+
+
+def compact_reaction(formatted, table):
+    """Compact copy of one formatted reaction; identifier lists go into ``table``"""
+    return _map_compounds(formatted, 'identifiers', 'compound', table.add)
+
+
+def expand_reaction(compact, compounds):
+    """Formatted reaction in today's schema from its compact form"""
+    return _map_compounds(compact, 'compound', 'identifiers', compounds.__getitem__)
+
+
+def is_compact(doc):
+    return isinstance(doc, dict) and doc.get('format') == COMPACT_FORMAT
+
+
+def compact_formatted_output(formatted_output):
+    """Compact document for an ord_formatted_data.json-shaped dict"""
+    table = CompoundTable()
+    datasets = {}
+    for dataset_id, dataset in formatted_output.items():
+        datasets[dataset_id] = {**dataset, 'reactions': [compact_reaction(r, table)
+                                                         for r in dataset.get('reactions', [])]}
+    return {'format': COMPACT_FORMAT, 'version': COMPACT_VERSION, 'compounds': table.compounds, 'datasets': datasets}
+
+
+def expand_compact(doc):
+    """ord_formatted_data.json-shaped dict from a compact document.
+
+    Components of the same compound share one identifiers list, so the
+    expanded dict stays about as small in memory as the compact one.
+    """
+    if doc.get('version', COMPACT_VERSION) > COMPACT_VERSION:
+        raise ValueError(f"Compact output version {doc['version']} is newer than this reader ({COMPACT_VERSION})")
+    compounds = doc['compounds']
+    return {dataset_id: {**dataset, 'reactions': [expand_reaction(r, compounds) for r in dataset.get('reactions', [])]}
+            for dataset_id, dataset in doc['datasets'].items()}
+
+
+def save_compact(formatted_output, path):
+    """Write ``formatted_output`` to ``path`` in the compact form; returns the compound count.
+
+    Datasets are compacted and written one at a time, so only the compound
+    table and one compact dataset are in memory besides the input. The table
+    is complete only at the end, so it is written after "datasets".
+    """
+    table = CompoundTable()
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{{"format":{dumps(COMPACT_FORMAT)},"version":{COMPACT_VERSION},"datasets":{{')
+        for i, (dataset_id, dataset) in enumerate(formatted_output.items()):
+            compact = {**dataset, 'reactions': [compact_reaction(r, table) for r in dataset.get('reactions', [])]}
+            # Non-string keys are written the way json.dump writes them
+            key = dataset_id if isinstance(dataset_id, str) else dumps(dataset_id)
+            f.write(f'{"," if i else ""}{dumps(key)}:{dumps(compact)}')
+        f.write('},"compounds":')
+        f.write(dumps(table.compounds))
+        f.write('}')
+    return len(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert formatted ORD output to or from the compact compound-table form")
+    parser.add_argument('input', help="ord_formatted_data.json, a .jsonl output, or a compact file with --expand")
+    parser.add_argument('--expand', action='store_true', help="Expand a compact file back to ord_formatted_data.json form")
+    parser.add_argument('--output', default=None,
+                        help="Where to write (default: <input>.compact.json, or <input>.expanded.json with --expand)")
+    args = parser.parse_args()
+
+    # Imported here: delta_sync imports this module to read compact files
+    from delta_sync import load_existing_output
+
+    stem = os.path.splitext(args.input)[0]
+    if args.expand:
+        output_file = args.output or stem.replace('.compact', '') + '.expanded.json'
+        formatted_output = load_existing_output(args.input)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(formatted_output, f, indent=2, ensure_ascii=False)
+        print(f"✓ Expanded {args.input} -> {output_file}")
+        return
+    output_file = args.output or stem + '.compact.json'
+    formatted_output = load_existing_output(args.input)
+    compounds = save_compact(formatted_output, output_file)
+    # Compare with the same data minified, so indentation doesn't count as the table's saving
+    before = len(json.dumps(formatted_output, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    after = os.path.getsize(output_file)
+    print(f"✓ {compounds} distinct compounds, {before:,} bytes minified -> {after:,} bytes "
+          f"({1 - after / max(before, 1):.0%} smaller) -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import threading
+import time
+
+from log_setup import get_logger
+
+log = get_logger('concurrency')
+
+# --- CONFIGURATION ---
+DEFAULT_MIN_WORKERS = 1
+DEFAULT_MAX_WORKERS = 8
+WINDOW = 20                 # completed reactions per adjustment decision
+ERROR_THRESHOLD = 0.10      # failure share in a window that counts as overload
+LATENCY_TOLERANCE = 2.0     # window p50 above this many times the best p50 seen counts as overload
+DECREASE_FACTOR = 0.5       # multiplicative decrease on overload
+COOLDOWN_WINDOWS = 1        # windows to sit out after a decrease before growing again
+
+
+def _median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+class AIMDController:
+    """Resizable limit on how many reactions are scraped at once (additive increase, multiplicative decrease).
+
+    Workers wrap each scrape in ``acquire()`` / ``release(seconds, success)``,
+    and each listing read in ``acquire()`` / ``release()``.
+    Every ``window`` completions the controller looks at the window's median
+    latency and failure share: a healthy window raises the limit by one, while a
+    window whose failures exceed ``error_threshold``, or whose p50 exceeds
+    ``latency_tolerance`` times the best p50 seen so far (or ``target_latency``
+    when given), cuts it by ``decrease_factor``. The limit always stays within
+    [min_workers, max_workers]. Every change is logged and kept in ``decisions``.
+    """
+
+    def __init__(self, min_workers=DEFAULT_MIN_WORKERS, max_workers=DEFAULT_MAX_WORKERS, initial=None,
+                 window=WINDOW, error_threshold=ERROR_THRESHOLD, latency_tolerance=LATENCY_TOLERANCE,
+                 target_latency=None, decrease_factor=DECREASE_FACTOR):
+        if not 1 <= min_workers <= max_workers:
+            raise ValueError(f"Need 1 <= min_workers <= max_workers, got {min_workers} and {max_workers}")
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.limit = min(max(initial or min_workers, min_workers), max_workers)
+        self.window = window
+        self.error_threshold = error_threshold
+        self.latency_tolerance = latency_tolerance
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._latencies = []
+        self._failures = 0
+        self._stale = 0         # completions still owed by scrapes started before the last decrease
+        self._cooldown = 0
+        self.best_p50 = None
+        self.decisions = []
+        self.started = time.monotonic()
+
+    # --- SLOTS ---
+
+    def acquire(self):
+        """Block until fewer than ``limit`` scrapes are running, then take a slot"""
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+
+    def try_acquire(self):
+        """Take a slot if one is free right now; True on success"""
+        with self._cond:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, seconds=None, success=True):
+        """Give the slot back and record how the scrape went.
+
+        ``seconds=None`` frees the slot without recording anything, for work
+        (listing pages) whose latency says nothing about a reaction's.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if self._stale:
+                # Started under the old, higher limit; says nothing about the new one
+                self._stale -= 1
+                self._cond.notify_all()
+                return
+            if seconds is None:
+                self._cond.notify_all()
+                return
+            self._latencies.append(seconds)
+            if not success:
+                self._failures += 1
+            if len(self._latencies) >= self.window:
+                self._adjust()
+            self._cond.notify_all()
+
+    # --- AIMD ---
+
+    def _adjust(self):
+        p50 = _median(self._latencies)
+        error_rate = self._failures / len(self._latencies)
+        self._latencies = []
+        self._failures = 0
+
+        threshold = self.target_latency
+        if threshold is None and self.best_p50 is not None:
+            threshold = self.best_p50 * self.latency_tolerance
+        if error_rate > self.error_threshold:
+            reason = f"errors {error_rate:.0%} > {self.error_threshold:.0%}"
+        elif threshold is not None and p50 > threshold:
+            reason = f"p50 {p50:.2f}s > {threshold:.2f}s"
+        else:
+            reason = None
+        # Only healthy windows define the baseline, so a slow start can't raise it
+        if reason is None and (self.best_p50 is None or p50 < self.best_p50):
+            self.best_p50 = p50
+
+        old = self.limit
+        if reason is not None:
+            self.limit = max(self.min_workers, int(self.limit * self.decrease_factor))
+            self._cooldown = COOLDOWN_WINDOWS
+            self._stale = self._in_flight
+            action = 'decrease'
+        elif self._cooldown:
+            self._cooldown -= 1
+            action, reason = 'hold', 'cooling down after a decrease'
+        else:
+            self.limit = min(self.max_workers, self.limit + 1)
+            action, reason = 'increase', 'healthy window'
+
+        self.decisions.append({
+            't': round(time.monotonic() - self.started, 3), 'action': action, 'from': old,
+            'to': self.limit, 'p50_s': round(p50, 4), 'error_rate': round(error_rate, 4), 'reason': reason,
+        })
+        if self.limit != old:
+            log.info("  Concurrency %d -> %d (%s; p50 %.2fs, errors %.0f%%)",
+                     old, self.limit, reason, p50, error_rate * 100)
+        else:
+            log.debug("  Concurrency stays at %d (%s; p50 %.2fs, errors %.0f%%)",
+                      self.limit, reason, p50, error_rate * 100)
+
+    def get_stats(self):
+        with self._cond:
+            changes = [d for d in self.decisions if d['from'] != d['to']]
+            return {
+                'limit': self.limit,
+                'bounds': (self.min_workers, self.max_workers),
+                'decisions': len(self.decisions),
+                'increases': sum(1 for d in changes if d['action'] == 'increase'),
+                'decreases': sum(1 for d in changes if d['action'] == 'decrease'),
+                'best_p50_s': round(self.best_p50, 4) if self.best_p50 is not None else None,
+            }
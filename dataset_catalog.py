@@ -0,0 +1,249 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import Select, WebDriverWait
+
+from link_harvest import DATASET_LINK_CSS
+from log_setup import get_logger
+from waits import timed_wait, document_ready, select_and_wait_for_rows, click_and_wait_for_page_turn
+
+log = get_logger('catalog')
+
+# --- CONFIGURATION ---
+DEFAULT_CATALOG_PATH = 'ord_catalog.sqlite'
+PAGE_SIZE = 100
+DEFAULT_MAX_AGE_HOURS = 24.0  # refresh from /browse when the last refresh is older than this
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    dataset_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    reaction_count INTEGER,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_catalog_position ON catalog (position);
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Every dataset row on the current browse page in one round trip: [[href, reaction_count|null], ...].
+# The reaction count is the last purely numeric cell of the row, when the table has one.
+HARVEST_ROWS_JS = """
+const rows = [];
+document.querySelectorAll(arguments[0]).forEach(a => {
+    const row = a.closest('tr') || a.parentElement;
+    let count = null;
+    if (row) {
+        const cells = Array.from(row.children).map(c => (c.innerText || '').trim()).reverse();
+        for (const text of cells) {
+            if (/^\\d[\\d,]*$/.test(text)) { count = parseInt(text.replace(/,/g, ''), 10); break; }
+        }
+    }
+    rows.push([a.href, count]);
+});
+return rows;
+"""
+
+
+def _signature(dataset_rows):
+    return hashlib.sha1("\n".join(f"{d}:{c}" for d, c in dataset_rows).encode('utf-8')).hexdigest()
+
+
+class DatasetCatalog:
+    """Local catalog of ORD datasets: ID, 1-based browse position, reaction count, last-seen time.
+
+    Lookups by position are plain indexed SQL, so dataset_start/dataset_end
+    slicing needs no browser at all once the catalog is populated.
+    """
+
+    def __init__(self, path=DEFAULT_CATALOG_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- LOOKUPS ---
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+
+    def slice(self, start_index=None, end_index=None):
+        """Dataset IDs at 1-based positions start_index..end_index (inclusive), in browse order"""
+        start = max(start_index or 1, 1)
+        end = end_index if end_index is not None else 2 ** 62
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dataset_id FROM catalog WHERE position BETWEEN ? AND ? ORDER BY position",
+                (start, end)).fetchall()
+        return [row[0] for row in rows]
+
+    def reaction_counts(self):
+        """{dataset_id: reaction_count} for every cataloged dataset"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT dataset_id, reaction_count FROM catalog"))
+
+    def get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def age(self):
+        """Seconds since the last completed refresh, None if the catalog was never refreshed"""
+        refreshed_at = self.get_meta('refreshed_at')
+        return time.time() - float(refreshed_at) if refreshed_at is not None else None
+
+    # --- UPDATES ---
+
+    def _set_meta(self, key, value):
+        self._conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def page_signature(self, page):
+        with self._lock:
+            row = self._conn.execute("SELECT signature FROM pages WHERE page = ?", (page,)).fetchone()
+        return row[0] if row else None
+
+    def update_page(self, page, dataset_rows):
+        """Store one browse page of (dataset_id, reaction_count) rows"""
+        now = time.time()
+        first_position = (page - 1) * PAGE_SIZE + 1
+        with self._lock, self._conn:
+            # Another dataset may have shifted into one of these positions
+            self._conn.execute("DELETE FROM catalog WHERE position BETWEEN ? AND ? AND dataset_id NOT IN (%s)"
+                               % ",".join("?" * len(dataset_rows)),
+                               (first_position, first_position + PAGE_SIZE - 1, *[d for d, _ in dataset_rows]))
+            for offset, (dataset_id, count) in enumerate(dataset_rows):
+                self._conn.execute(
+                    "INSERT INTO catalog (dataset_id, position, reaction_count, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(dataset_id) DO UPDATE SET "
+                    "position = excluded.position, reaction_count = COALESCE(excluded.reaction_count, reaction_count), "
+                    "last_seen = excluded.last_seen",
+                    (dataset_id, first_position + offset, count, now, now))
+            self._conn.execute("INSERT OR REPLACE INTO pages (page, signature) VALUES (?, ?)",
+                               (page, _signature(dataset_rows)))
+
+    def finish_refresh(self, total_entries):
+        """Drop datasets that fell off the end of the listing and record the new total"""
+        with self._lock, self._conn:
+            if total_entries is not None:
+                self._conn.execute("DELETE FROM catalog WHERE position > ?", (total_entries,))
+                self._conn.execute("DELETE FROM pages WHERE page > ?", ((total_entries + PAGE_SIZE - 1) // PAGE_SIZE,))
+                self._set_meta('total_entries', total_entries)
+            self._set_meta('refreshed_at', time.time())
+
+
+# --- BROWSER REFRESH ---
+
+def _read_page(driver):
+    rows = driver.execute_script(HARVEST_ROWS_JS, DATASET_LINK_CSS) or []
+    seen = {}
+    for href, count in rows:
+        dataset_id = href.rstrip('/').split('/')[-1]
+        if dataset_id not in seen:
+            seen[dataset_id] = count
+    return list(seen.items())
+
+
+def _next_page(driver):
+    """Click to the next browse page; False when there is none"""
+    try:
+        next_button = driver.find_element(By.CSS_SELECTOR, "div.next.paginav")
+    except Exception:
+        return False
+    if "no-click" in (next_button.get_attribute("class") or ""):
+        return False
+    click_and_wait_for_page_turn(driver, next_button, (By.CSS_SELECTOR, DATASET_LINK_CSS), name="catalog_page_turn")
+    return True
+
+
+def _open_browse(driver, base_url, timeout):
+    """Load /browse at PAGE_SIZE rows per page; returns the listed total of entries (None if unreadable)"""
+    driver.get(f"{base_url}/browse")
+    timed_wait(driver, "document_ready", document_ready, timeout)
+    wait = WebDriverWait(driver, timeout)
+
+    try:
+        select = Select(wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "select#pagination"))))
+        select_and_wait_for_rows(driver, select, str(PAGE_SIZE), (By.CSS_SELECTOR, DATASET_LINK_CSS))
+    except Exception as e:
+        log.warning("Warning: Could not select %d entries: %s", PAGE_SIZE, e)
+
+    total_entries = None
+    try:
+        text = wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "div.pagination div.select"))).text
+        match = re.search(r'of (\d+) entries', text)
+        if match:
+            total_entries = int(match.group(1))
+    except Exception as e:
+        log.warning("Warning: Could not read total entries: %s", e)
+
+    wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, DATASET_LINK_CSS)))
+    return total_entries
+
+
+def refresh_catalog(driver, catalog, base_url, timeout=45, force=False):
+    """Bring the catalog up to date with the live /browse listing, reading as few pages as possible.
+
+    - Page 1 and the total are unchanged: nothing else is read.
+    - Page 1 unchanged but the total grew: new datasets were appended, so the
+      pages before the old end are skipped over and only the tail is read.
+    - Anything else (or force=True): every page is read.
+    The shortcuts only look at page 1, so a reaction count that changed on a
+    later page is picked up only with force=True.
+    Returns the number of pages read.
+    """
+    total_entries = _open_browse(driver, base_url, timeout)
+    old_total = catalog.get_meta('total_entries')
+    old_total = int(old_total) if old_total is not None else None
+
+    first_page = _read_page(driver)
+    page_1_unchanged = not force and catalog.page_signature(1) == _signature(first_page)
+    catalog.update_page(1, first_page)
+    pages_read = 1
+
+    if page_1_unchanged and total_entries is not None and total_entries == old_total:
+        log.info("Catalog up to date (%d datasets), no pages re-read", len(catalog))
+        catalog.finish_refresh(total_entries)
+        return pages_read
+
+    page = 1
+    if page_1_unchanged and total_entries is not None and old_total is not None and total_entries > old_total:
+        # Appended datasets: skip straight to the page holding the old last entry
+        resume_page = max((old_total + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+        log.info("Catalog: %d new datasets, re-reading from page %d", total_entries - old_total, resume_page)
+        while page < resume_page and _next_page(driver):
+            page += 1
+    else:
+        log.info("Catalog: listing changed, re-reading all pages")
+
+    while True:
+        if page > 1:
+            catalog.update_page(page, _read_page(driver))
+            pages_read += 1
+        if total_entries is not None and page * PAGE_SIZE >= total_entries:
+            break
+        if not _next_page(driver):
+            break
+        page += 1
+
+    catalog.finish_refresh(total_entries)
+    log.info("✓ Catalog refreshed: %d datasets, %d pages read", len(catalog), pages_read)
+    return pages_read
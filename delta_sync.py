@@ -0,0 +1,74 @@
+import json
+import os
+
+from compact_output import is_compact, expand_compact
+from output_writer import read_jsonl
+
+
+def load_existing_output(path):
+    """Formatted output already on disk, in the ord_formatted_data.json shape ({} if missing).
+
+    ``.jsonl`` files are regrouped by their ``dataset_id`` field and compact
+    files (compact_output.py) are expanded.
+    """
+    if not os.path.exists(path):
+        return {}
+    if path.endswith('.jsonl'):
+        formatted_output = {}
+        for record in read_jsonl(path):
+            dataset_id = record.pop('dataset_id', None)
+            dataset = formatted_output.setdefault(dataset_id, {
+                'dataset_id': dataset_id,
+                'total_reactions_scraped': 0,
+                'reactions': []
+            })
+            dataset['reactions'].append(record)
+            dataset['total_reactions_scraped'] += 1
+        return formatted_output
+    with open(path, encoding='utf-8') as f:
+        doc = json.load(f)
+    return expand_compact(doc) if is_compact(doc) else doc
+
+
+def known_reactions(formatted_output):
+    """{dataset_id: set of reaction IDs} already present in the output"""
+    return {dataset_id: {r.get('reaction_id') for r in dataset.get('reactions', [])}
+            for dataset_id, dataset in formatted_output.items()}
+
+
+def datasets_to_sync(dataset_ids, known, reaction_counts):
+    """Datasets that may hold reactions we don't have.
+
+    A dataset is skipped only when the listing's reaction count matches the
+    number of reactions we already hold for it; new datasets and those with an
+    unknown count are always checked.
+    """
+    changed = []
+    for dataset_id in dataset_ids:
+        count = reaction_counts.get(dataset_id)
+        if dataset_id not in known or count is None or count != len(known[dataset_id]):
+            changed.append(dataset_id)
+    return changed
+
+
+def merge_results(formatted_output, results):
+    """Add newly scraped reactions (scheduler result shape) into formatted_output; returns how many were added"""
+    added = 0
+    for dataset in results:
+        dataset_id = dataset.get('dataset_id')
+        if not dataset_id:
+            continue
+        target = formatted_output.setdefault(dataset_id, {
+            'dataset_id': dataset_id,
+            'total_reactions_scraped': 0,
+            'reactions': []
+        })
+        have = {r.get('reaction_id') for r in target['reactions']}
+        for reaction in dataset.get('reactions', []):
+            formatted = reaction.get('formatted_data')
+            if reaction.get('success') and formatted is not None and formatted.get('reaction_id') not in have:
+                target['reactions'].append(formatted)
+                have.add(formatted.get('reaction_id'))
+                added += 1
+        target['total_reactions_scraped'] = len(target['reactions'])
+    return added
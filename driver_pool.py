@@ -0,0 +1,197 @@
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:  # RSS-based recycling is skipped without psutil
+    psutil = None
+
+from log_setup import get_logger
+
+log = get_logger('driver_pool')
+
+# --- CONFIGURATION ---
+DEFAULT_MAX_PAGES = 200       # recycle a driver after this many page loads
+DEFAULT_MAX_RSS_MB = 1500     # ... or once chromedriver + Chrome exceed this much memory
+
+
+def process_tree_rss_mb(driver):
+    """Resident memory of chromedriver and every browser process under it (None without psutil)"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class DriverPool:
+    """Bounded pool of WebDrivers that workers borrow and return.
+
+    At most ``max_size`` drivers exist at any time. Idle drivers are health
+    checked before they are handed out; dead ones are replaced transparently.
+    A driver is recycled (quit and relaunched on demand) after ``max_pages``
+    page loads or when its process tree passes ``max_rss_mb``.
+    """
+
+    def __init__(self, factory, max_size=3, max_pages=DEFAULT_MAX_PAGES, max_rss_mb=DEFAULT_MAX_RSS_MB):
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+
+        self._cond = threading.Condition()
+        self._idle = []
+        self._pages = {}      # id(driver) -> page loads since launch
+        self._live = 0
+        self._closed = False
+        self.stats = {
+            'hits': 0, 'launches': 0, 'launch_time_total': 0.0,
+            'recycles': 0, 'rebuilds': 0, 'wait_time_total': 0.0,
+        }
+
+    # --- LIFECYCLE ---
+
+    def _launch(self):
+        started = time.perf_counter()
+        driver = self.factory()
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._pages[id(driver)] = 0
+            self.stats['launches'] += 1
+            self.stats['launch_time_total'] += elapsed
+        return driver
+
+    def _quit(self, driver):
+        with self._cond:
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _discard(self, driver):
+        """Quit a driver and give its slot back to the pool"""
+        self._quit(driver)
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def _needs_recycle(self, driver):
+        if self._pages.get(id(driver), 0) >= self.max_pages:
+            return True
+        rss = process_tree_rss_mb(driver)
+        return rss is not None and rss > self.max_rss_mb
+
+    # --- BORROW / RETURN ---
+
+    def acquire(self):
+        """Borrow a healthy driver, launching one if the pool is not yet full"""
+        waited = time.perf_counter()
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("DriverPool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                    break
+                if self._live < self.max_size:
+                    self._live += 1
+                    driver = None
+                    break
+                self._cond.wait()
+            self.stats['wait_time_total'] += time.perf_counter() - waited
+        return self._checkout(driver)
+
+    def try_acquire(self):
+        """Borrow a driver only if one is idle or a slot is free; None instead of waiting"""
+        with self._cond:
+            if self._closed:
+                return None
+            if self._idle:
+                driver = self._idle.pop()
+            elif self._live < self.max_size:
+                self._live += 1
+                driver = None
+            else:
+                return None
+        return self._checkout(driver)
+
+    def _checkout(self, driver):
+        """Health check a driver taken from the idle list, or launch one into a reserved slot (driver=None)"""
+        if driver is not None:
+            if self._is_healthy(driver):
+                with self._cond:
+                    self.stats['hits'] += 1
+                return driver
+            log.warning("  Driver failed health check, rebuilding...")
+            with self._cond:
+                self.stats['rebuilds'] += 1
+            self._quit(driver)  # keep the slot for the replacement
+
+        try:
+            return self._launch()
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+    def release(self, driver, broken=False):
+        """Return a borrowed driver; broken or worn-out drivers are quit instead"""
+        if broken or self._closed:
+            if broken:
+                with self._cond:
+                    self.stats['rebuilds'] += 1
+            self._discard(driver)
+            return
+        if self._needs_recycle(driver):
+            with self._cond:
+                self.stats['recycles'] += 1
+            self._discard(driver)
+            return
+        with self._cond:
+            self._idle.append(driver)
+            self._cond.notify()
+
+    def record_page(self, driver, count=1):
+        """Count page loads against a driver's recycle budget"""
+        with self._cond:
+            if id(driver) in self._pages:
+                self._pages[id(driver)] += count
+
+    @contextmanager
+    def driver(self):
+        """``with pool.driver() as driver:`` borrow/return helper"""
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self):
+        """Quit every idle driver; drivers still on loan are quit when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def get_stats(self):
+        with self._cond:
+            stats = dict(self.stats)
+            stats['live'] = self._live
+            stats['idle'] = len(self._idle)
+        launches = stats['launches']
+        stats['avg_launch_time'] = stats['launch_time_total'] / launches if launches else 0.0
+        return stats
@@ -0,0 +1,213 @@
+import gzip
+import http.client
+import json
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+from log_setup import get_logger
+from metrics import metrics
+from retry_policy import retry_policy, classify_failure, failed_result, PermanentError
+
+log = get_logger('http')
+
+# --- CONFIGURATION ---
+DEFAULT_BASE_URL = "https://open-reaction-database.org"
+
+# Path of the JSON record endpoint, relative to the base URL. The browser path
+# decodes the same record client side; override this if the deployment you
+# scrape exposes it elsewhere.
+RECORD_PATH_TEMPLATE = "/api/reaction/{reaction_id}"
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_TIMEOUT = 45
+
+
+class HTTPStatusError(http.client.HTTPException):
+    """Non-200 response; ``status`` lets the retry policy tell 404 from 503"""
+
+    def __init__(self, status, path):
+        super().__init__(f"HTTP {status} for {path}")
+        self.status = status
+
+
+class HTTPRecordFetcher:
+    """Fetch raw reaction records over plain HTTP with a pooled keep-alive client.
+
+    Connections are kept in a LIFO queue so hot sockets get reused first; at most
+    ``pool_size`` connections are ever open at the same time, and any thread may
+    borrow one.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, pool_size=DEFAULT_POOL_SIZE,
+                 timeout=DEFAULT_TIMEOUT, path_template=RECORD_PATH_TEMPLATE):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.path_template = path_template
+        self.timeout = timeout
+        self.pool_size = pool_size
+
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._all = []
+        self.stats = {'requests': 0, 'connections_opened': 0, 'reused': 0, 'errors': 0}
+
+    # --- CONNECTION POOL ---
+
+    def _new_connection(self):
+        conn_cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(self.host, self.port, timeout=self.timeout)
+        with self._lock:
+            self._all.append(conn)
+            self.stats['connections_opened'] += 1
+        return conn
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.stats['reused'] += 1
+            return conn
+        except queue.Empty:
+            return self._new_connection()
+
+    def _release(self, conn, broken=False):
+        if broken:
+            conn.close()
+            with self._lock:
+                if conn in self._all:
+                    self._all.remove(conn)
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- REQUESTS ---
+
+    def record_path(self, reaction_id):
+        return self.base_path + self.path_template.format(reaction_id=quote(reaction_id))
+
+    def get_json(self, path):
+        """GET a JSON document"""
+        return json.loads(self.get_body(path))
+
+    def get_body(self, path):
+        """GET a document's decompressed body, retrying once on a stale keep-alive socket"""
+        headers = {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, ConnectionError, OSError):
+                self._release(conn, broken=True)
+                if attempt == 0:
+                    continue
+                raise
+            broken = response.will_close
+            self._release(conn, broken=broken)
+            with self._lock:
+                self.stats['requests'] += 1
+
+            if response.status != 200:
+                raise HTTPStatusError(response.status, path)
+
+            encoding = (response.getheader("Content-Encoding") or "").lower()
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            elif encoding == "deflate":
+                body = zlib.decompress(body)
+            return body
+
+    def fetch_record(self, reaction_id):
+        """Return the raw ORD record (the same object the modal <pre> shows)"""
+        return parse_record(self.get_body(self.record_path(reaction_id)), reaction_id)
+
+    def scrape_reaction_data(self, reaction_id, max_retries=None, policy=retry_policy):
+        """HTTP counterpart of scrape_reaction_data(driver, reaction_id), with the same retry policy"""
+        attempts = 0
+        while True:
+            metrics.count('attempts')
+            if attempts:
+                metrics.count('retries')
+            policy.breaker.wait()
+            try:
+                with metrics.stage('http_fetch'):
+                    body = self.get_body(self.record_path(reaction_id))
+                with metrics.stage('http_parse'):
+                    reaction_data = parse_record(body, reaction_id)
+                if reaction_data.get('reactionId') != reaction_id:
+                    raise PermanentError(f"Reaction ID mismatch: expected {reaction_id}, got {reaction_data.get('reactionId')}")
+                policy.breaker.record_success()
+                return {'reaction_id': reaction_id, 'data': reaction_data, 'success': True}
+            except Exception as e:
+                attempts += 1
+                last_error, kind = e, classify_failure(e)
+                metrics.count('errors')
+                metrics.count(f'{kind}_errors')
+                policy.breaker.record_failure(kind)
+                with self._lock:
+                    self.stats['errors'] += 1
+                log.warning("⚠ HTTP %s error for %s (attempt %d): %.100s", kind, reaction_id, attempts, e)
+                if not policy.should_retry(kind, attempts, max_retries):
+                    metrics.count('failures')
+                    return failed_result(reaction_id, last_error, kind, attempts)
+            time.sleep(policy.backoff(attempts))
+
+    def scrape_many(self, reaction_ids, max_workers=None, cache=None, dataset_id=None):
+        """Fetch many reactions concurrently; results keep the order of reaction_ids.
+        With a RawRecordCache, cached records are served without a request."""
+        max_workers = max_workers or self.pool_size
+        
+        def one(reaction_id):
+            if cache is None:
+                return self.scrape_reaction_data(reaction_id)
+            return cache.fetch(reaction_id, lambda: self.scrape_reaction_data(reaction_id), dataset_id)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(one, reaction_ids))
+
+
+def parse_record(body, reaction_id):
+    """Record for ``reaction_id`` from a record endpoint response body"""
+    payload = json.loads(body)
+    if isinstance(payload, list):
+        payload = next((p for p in payload if unwrap_record(p).get('reactionId') == reaction_id), {})
+    return unwrap_record(payload)
+
+
+def unwrap_record(payload):
+    """Accept either the bare record or a {'reaction': record} envelope"""
+    if isinstance(payload, dict) and 'reactionId' not in payload and isinstance(payload.get('reaction'), dict):
+        return payload['reaction']
+    return payload if isinstance(payload, dict) else {}
@@ -0,0 +1,19 @@
+# --- SELECTORS ---
+DATASET_LINK_CSS = "a[href*='/dataset/ord_dataset-']"
+REACTION_LINK_CSS = "a[href*='/id/ord-']"
+
+# All matching hrefs in document order, deduplicated in the page, in one round trip
+HARVEST_HREFS_JS = """
+return [...new Set(Array.from(document.querySelectorAll(arguments[0]), a => a.href).filter(Boolean))];
+"""
+
+
+def harvest_hrefs(driver, css_selector):
+    """Every href matching ``css_selector`` on the current page, in order, without duplicates"""
+    return list(dict.fromkeys(driver.execute_script(HARVEST_HREFS_JS, css_selector) or []))
+
+
+def harvest_ids(driver, css_selector, prefix=None):
+    """Last path segment of every matching link (e.g. dataset or reaction IDs), in order, without duplicates"""
+    ids = (href.rstrip('/').split('/')[-1] for href in harvest_hrefs(driver, css_selector))
+    return list(dict.fromkeys(i for i in ids if prefix is None or i.startswith(prefix)))
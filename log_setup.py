@@ -0,0 +1,180 @@
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+# --- CONFIGURATION ---
+LOGGER_NAME = 'ord'
+LOG_FORMAT = '%(message)s'
+FILE_LOG_FORMAT = '%(asctime)s %(levelname)-7s %(threadName)-12s %(name)s: %(message)s'
+PROGRESS_INTERVAL = 0.5   # seconds between progress line redraws
+RATE_WINDOW = 10.0        # seconds of history behind the reactions/s figure
+PROGRESS_WIDTH = 200      # characters of the progress line shown on a terminal
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Serializes terminal writes between the log listener thread and the progress line
+_console_lock = threading.Lock()
+_listener = None
+
+
+def get_logger(name):
+    """Child of the 'ord' logger, e.g. get_logger('scheduler') -> 'ord.scheduler'"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class _ConsoleHandler(logging.StreamHandler):
+    """Stream handler that clears the live progress line before writing a record"""
+
+    def emit(self, record):
+        with _console_lock:
+            if progress.active and progress.tty and self.stream.isatty():
+                self.stream.write('\r\033[K')
+            super().emit(record)
+
+
+def setup_logging(level=logging.INFO, log_file=None):
+    """Route every 'ord.*' record through a queue to one listener thread.
+
+    Worker threads only pay for a queue put; formatting and terminal/file I/O
+    happen on the listener. Records below ``level`` are dropped at the call site.
+    """
+    global _listener
+    stop_logging()
+    records = queue.SimpleQueue()
+    handlers = []
+    console = _ConsoleHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers.append(console)
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(logging.Formatter(FILE_LOG_FORMAT))
+        handlers.append(file_handler)
+
+    log.handlers[:] = [logging.handlers.QueueHandler(records)]
+    log.setLevel(level)
+    log.propagate = False
+    _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=False)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread.
+
+    Later records still reach the console, written directly by the caller.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        console = _ConsoleHandler(sys.stdout)
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        log.handlers[:] = [console]
+
+
+class ProgressReporter:
+    """One self-updating status line: done/total, reactions/s, ETA and what each worker is doing.
+
+    The counters are plain integer updates under a lock, so callers can report
+    progress unconditionally; nothing is drawn until start() is called. On a
+    non-TTY stream the line is printed as a regular line every ``interval * 20`` seconds.
+    """
+
+    def __init__(self, stream=None, interval=PROGRESS_INTERVAL):
+        self.stream = stream or sys.stderr
+        self.interval = interval
+        self.tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.active = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.total = 0
+            self.done = 0
+            self.failed = 0
+            self.started = time.monotonic()
+            self._history = [(self.started, 0)]
+            self._states = {}
+
+    # --- COUNTERS ---
+
+    def add_total(self, n):
+        with self._lock:
+            self.total += n
+
+    def advance(self, success=True):
+        with self._lock:
+            self.done += 1
+            if not success:
+                self.failed += 1
+
+    def set_state(self, state):
+        """What the calling worker thread is doing ('scrape ord-...', 'idle', ...)"""
+        self._states[threading.current_thread().name] = state
+
+    # --- RENDERING ---
+
+    def _rate(self, now):
+        with self._lock:
+            self._history.append((now, self.done))
+            while len(self._history) > 2 and now - self._history[1][0] > RATE_WINDOW:
+                self._history.pop(0)
+            (t0, d0), (t1, d1) = self._history[0], self._history[-1]
+        return (d1 - d0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def line(self):
+        now = time.monotonic()
+        rate = self._rate(now)
+        done, total, failed = self.done, self.total, self.failed
+        if rate > 0 and total > done:
+            eta = int((total - done) / rate)
+            eta_text = f"{eta // 3600:d}:{eta % 3600 // 60:02d}:{eta % 60:02d}"
+        else:
+            eta_text = "--:--:--"
+        percent = f"{100 * done / total:5.1f}%" if total else "  -  %"
+        workers = " ".join(f"{name}={state}" for name, state in sorted(self._states.items()))
+        return (f"{percent} {done}/{total} reactions ({failed} failed) | {rate:.1f}/s | "
+                f"ETA {eta_text} | {workers}")
+
+    def _draw(self, final=False):
+        text = self.line()
+        with _console_lock:
+            if self.tty:
+                self.stream.write('\r\033[K' + text[:PROGRESS_WIDTH] + ('\n' if final else ''))
+            else:
+                self.stream.write(text + '\n')
+            self.stream.flush()
+
+    def _run(self):
+        ticks = 0
+        every = 1 if self.tty else 20
+        while not self._stop.wait(self.interval):
+            ticks += 1
+            if ticks % every == 0:
+                self._draw()
+
+    def start(self):
+        if self.active:
+            return
+        self.reset()
+        self._stop.clear()
+        self.active = True
+        self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self.active:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._draw(final=True)
+        self.active = False
+
+
+progress = ProgressReporter()
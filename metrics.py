@@ -0,0 +1,191 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# --- CONFIGURATION ---
+DEFAULT_METRICS_PREFIX = 'ord_metrics'   # -> ord_metrics.prom + ord_metrics.json
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)   # seconds; +Inf is implicit
+
+# Stages of one reaction, in the order they happen
+STAGES = ('navigate', 'ready', 'page_state', 'button', 'modal', 'json_read', 'http_fetch', 'http_parse', 'format')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def merge(self, other):
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS[i - 1] if i > 0 else 0.0
+                high = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'total_s': round(self.sum, 4),
+            'mean_s': round(self.sum / self.count, 4) if self.count else 0.0,
+            'p50_s': round(self.quantile(0.5), 4),
+            'p95_s': round(self.quantile(0.95), 4),
+            'max_s': round(self.max, 4),
+        }
+
+
+class StageMetrics:
+    """Per-stage timings and event counters, labelled by dataset and worker thread.
+
+    Code being measured wraps each stage in ``with metrics.stage('navigate'):``.
+    The dataset label comes from the innermost ``with metrics.labels(dataset_id=...)``
+    on the current thread; the worker label is the thread name. Coroutines share
+    one thread, so async code passes ``dataset_id`` to stage()/count() instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms = {}   # (stage, dataset_id, worker) -> Histogram
+        self._counters = {}     # (event, dataset_id, worker) -> int
+        self.started = time.time()
+
+    def _labels(self, dataset_id=None):
+        dataset_id = dataset_id or getattr(self._local, 'dataset_id', None)
+        return dataset_id or 'unknown', threading.current_thread().name
+
+    @contextmanager
+    def labels(self, dataset_id=None):
+        previous = getattr(self._local, 'dataset_id', None)
+        self._local.dataset_id = dataset_id
+        try:
+            yield
+        finally:
+            self._local.dataset_id = previous
+
+    def observe(self, stage, seconds, dataset_id=None):
+        key = (stage, *self._labels(dataset_id))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, stage, dataset_id=None):
+        """Time the block under ``stage``; failed attempts are timed too"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, dataset_id)
+
+    def count(self, event, n=1, dataset_id=None):
+        """Bump an event counter (attempts, retries, failures, ...)"""
+        key = (event, *self._labels(dataset_id))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+
+    # --- AGGREGATION / EXPORT ---
+
+    def _grouped(self, label_index):
+        """{label value: {stage: Histogram}} merged over the other label"""
+        grouped = {}
+        with self._lock:
+            items = list(self._histograms.items())
+        for key, histogram in items:
+            target = grouped.setdefault(key[label_index] if label_index else None, {})
+            merged = target.get(key[0])
+            if merged is None:
+                merged = target[key[0]] = Histogram()
+            merged.merge(histogram)
+        return grouped
+
+    def summary(self):
+        def stages(by_stage):
+            ordered = sorted(by_stage, key=lambda s: (STAGES.index(s) if s in STAGES else len(STAGES), s))
+            return {s: by_stage[s].summary() for s in ordered}
+
+        counters = {}
+        with self._lock:
+            for (event, _, _), n in self._counters.items():
+                counters[event] = counters.get(event, 0) + n
+        return {
+            'elapsed_s': round(time.time() - self.started, 3),
+            'stages': stages(self._grouped(None).get(None, {})),
+            'counters': counters,
+            'by_dataset': {d: stages(h) for d, h in sorted(self._grouped(1).items())},
+            'by_worker': {w: stages(h) for w, h in sorted(self._grouped(2).items())},
+        }
+
+    def prometheus_text(self):
+        def escape(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+        lines = ["# HELP ord_stage_seconds Time spent in each reaction scraping stage",
+                 "# TYPE ord_stage_seconds histogram"]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        for (stage, dataset_id, worker), h in histograms:
+            labels = f'stage="{escape(stage)}",dataset="{escape(dataset_id)}",worker="{escape(worker)}"'
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ('+Inf',), h.counts):
+                cumulative += n
+                lines.append(f'ord_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'ord_stage_seconds_sum{{{labels}}} {h.sum:.6f}')
+            lines.append(f'ord_stage_seconds_count{{{labels}}} {h.count}')
+        lines += ["# HELP ord_reaction_events_total Reaction attempts, retries, failures and other events",
+                  "# TYPE ord_reaction_events_total counter"]
+        for (event, dataset_id, worker), n in counters:
+            lines.append(f'ord_reaction_events_total{{event="{escape(event)}",dataset="{escape(dataset_id)}",'
+                         f'worker="{escape(worker)}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, prefix=DEFAULT_METRICS_PREFIX):
+        """Write <prefix>.prom (Prometheus text format) and <prefix>.json; returns both paths"""
+        prom_path, json_path = f"{prefix}.prom", f"{prefix}.json"
+        with open(prom_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+        return prom_path, json_path
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary['stages']:
+            return
+        print("\nStage timings (seconds):")
+        for stage, s in summary['stages'].items():
+            print(f"  {stage:<12} n={s['count']:<6} mean={s['mean_s']:.3f} p50={s['p50_s']:.3f} "
+                  f"p95={s['p95_s']:.3f} max={s['max_s']:.3f}")
+        if summary['counters']:
+            print("  events: " + ", ".join(f"{k}={v}" for k, v in sorted(summary['counters'].items())))
+
+
+metrics = StageMetrics()
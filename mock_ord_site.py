@@ -0,0 +1,225 @@
+"""Local imitation of open-reaction-database.org built from the bundled fixtures.
+
+    python mock_ord_site.py --port 8000 --latency 0.05 --scale 10
+    ORD_BASE_URL=http://127.0.0.1:8000 python web_scrpaer_2.py
+
+Serves what the scrapers touch:
+  /browse              dataset table (select#pagination, "of N entries", div.next.paginav)
+  /dataset/<id>        reaction table with the same pagination controls
+  /id/<reaction_id>    "View Full Record" button, modal with <pre> JSON, .close
+  /api/reaction/<id>   the raw record as JSON (HTTP and async backends)
+Pagination is client-side JavaScript, like the real site. --page-state also puts
+the record in Vue-style component state for page_state.py to find.
+"""
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from ord_fixtures import FIXTURE_FILES, load_fixture_datasets
+
+# --- SITE DATA ---
+
+def build_site_data(paths=FIXTURE_FILES, scale=1):
+    """{dataset_id: [raw_record, ...]} from the fixtures, repeated ``scale`` times under new IDs"""
+    base = load_fixture_datasets(paths)
+    datasets = OrderedDict()
+    for copy in range(scale):
+        for dataset_id, records in base.items():
+            if copy == 0:
+                datasets[dataset_id] = records
+                continue
+            copies = []
+            for record in records:
+                record = dict(record, reactionId=f"{record['reactionId']}-{copy}")
+                copies.append(record)
+            datasets[f"{dataset_id}-{copy}"] = copies
+    return datasets
+
+
+# --- PAGES ---
+
+LISTING_PAGE = """<!DOCTYPE html>
+<html><head><title>{title}</title></head>
+<body><div id="app">
+<h1>{title}</h1>
+<select id="pagination">
+  <option value="10" selected>10</option><option value="25">25</option>
+  <option value="50">50</option><option value="100">100</option>
+</select>
+<table><tbody id="rows"></tbody></table>
+<div class="pagination">
+  <div class="select">Showing <span id="range"></span> of {total} entries</div>
+  <div class="prev paginav">Previous</div>
+  <div class="next paginav">Next</div>
+</div>
+</div>
+<script>
+const ROWS = {rows};
+let perPage = 10, page = 1;
+function render() {{
+  const shown = ROWS.slice((page - 1) * perPage, page * perPage);
+  document.getElementById('rows').innerHTML = shown.map(r =>
+    '<tr><td><a href="' + r[0] + '">' + r[1] + '</a></td>' +
+    (r[2] === null ? '' : '<td>' + r[2] + '</td>') + '</tr>').join('');
+  const last = page * perPage >= ROWS.length;
+  document.querySelector('.next').className = 'next paginav' + (last ? ' no-click' : '');
+  document.getElementById('range').textContent =
+    ((page - 1) * perPage + 1) + '-' + Math.min(page * perPage, ROWS.length);
+}}
+document.getElementById('pagination').addEventListener('change', e => {{
+  perPage = parseInt(e.target.value, 10); page = 1; render();
+}});
+document.querySelector('.next').addEventListener('click', () => {{
+  if (page * perPage < ROWS.length) {{ page += 1; render(); }}
+}});
+render();
+</script>
+</body></html>
+"""
+
+REACTION_PAGE = """<!DOCTYPE html>
+<html><head><title>{reaction_id}</title></head>
+<body><div id="app">
+<h1>{reaction_id}</h1>
+<div class="full-record button">View Full Record</div>
+<div class="modal-container" style="display: none">
+  <div class="close">x</div>
+  <div class="data"><pre></pre></div>
+</div>
+</div>
+<script id="record" type="application/json">{record}</script>
+<script>
+const record = JSON.parse(document.getElementById('record').textContent);
+if ({page_state}) {{
+  document.getElementById('app').__vue__ = {{ $data: {{ reaction: record }}, _props: {{}} }};
+}}
+document.querySelector('.full-record').addEventListener('click', () => {{
+  document.querySelector('.data pre').textContent = JSON.stringify(record, null, 2);
+  document.querySelector('.modal-container').style.display = 'block';
+}});
+document.querySelector('.close').addEventListener('click', () => {{
+  document.querySelector('.modal-container').style.display = 'none';
+}});
+</script>
+</body></html>
+"""
+
+
+def _script_json(value):
+    """JSON safe to embed inside a <script> element"""
+    return json.dumps(value).replace('</', '<\\/')
+
+
+class MockORDHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real site
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        site = self.server
+        site.delay()
+        with site.lock:
+            site.requests += 1
+        path = unquote(self.path.split('?', 1)[0]).rstrip('/')
+
+        if path in ('', '/browse'):
+            rows = [[f"/dataset/{d}", d, len(records)] for d, records in site.datasets.items()]
+            return self._send(200, LISTING_PAGE.format(title="Browse", total=len(rows), rows=_script_json(rows)),
+                              'text/html; charset=utf-8')
+
+        match = re.fullmatch(r'/dataset/([^/]+)', path)
+        if match and match.group(1) in site.datasets:
+            rows = [[f"/id/{r['reactionId']}", r['reactionId'], None] for r in site.datasets[match.group(1)]]
+            return self._send(200, LISTING_PAGE.format(title=html.escape(match.group(1)), total=len(rows),
+                                                       rows=_script_json(rows)), 'text/html; charset=utf-8')
+
+        match = re.fullmatch(r'/id/([^/]+)', path)
+        if match and match.group(1) in site.records:
+            page = REACTION_PAGE.format(reaction_id=html.escape(match.group(1)),
+                                        record=_script_json(site.records[match.group(1)]),
+                                        page_state='true' if site.page_state else 'false')
+            return self._send(200, page, 'text/html; charset=utf-8')
+
+        match = re.fullmatch(r'/api/reaction/([^/]+)', path)
+        if match and match.group(1) in site.records:
+            return self._send(200, json.dumps(site.records[match.group(1)]), 'application/json')
+
+        self._send(404, json.dumps({'error': 'not found'}), 'application/json')
+
+
+class MockORDSite(ThreadingHTTPServer):
+    """Threaded mock ORD server; ``latency`` (+ up to ``jitter``) seconds is added to every response"""
+
+    daemon_threads = True
+
+    def __init__(self, datasets, host='127.0.0.1', port=0, latency=0.0, jitter=0.0, page_state=False):
+        super().__init__((host, port), MockORDHandler)
+        self.datasets = datasets
+        self.records = {r['reactionId']: r for records in datasets.values() for r in records}
+        self.latency = latency
+        self.jitter = jitter
+        self.page_state = page_state
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+
+    def start(self):
+        """Serve from a background thread; returns self"""
+        self._thread = threading.Thread(target=self.serve_forever, name="mock-ord-site", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock ORD site from the bundled fixtures")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--scale', type=int, default=1, help="Repeat the fixture datasets this many times")
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Up to this many extra random seconds")
+    parser.add_argument('--page-state', action='store_true', help="Expose the record in Vue-style page state")
+    args = parser.parse_args()
+
+    site = MockORDSite(build_site_data(scale=args.scale), args.host, args.port,
+                       args.latency, args.jitter, args.page_state)
+    print(f"Mock ORD site with {len(site.datasets)} datasets / {len(site.records)} reactions at {site.url}")
+    try:
+        site.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import json
+
+from reaction_formatter import IDENTIFIER_TYPE_MAPPING, REACTION_ROLE_MAPPING, UNIT_MAPPINGS
+
+FIXTURE_FILES = [
+    'ord_formatted_data.json',
+    'ord_formatted_data_one.json',
+    'ord_formatted_data_two.json',
+    'ord_formatted_data_three.json',
+    'ord_formatted_data_single.json',
+]
+
+_ROLE_IDS = {name: num for num, name in REACTION_ROLE_MAPPING.items()}
+_IDENTIFIER_IDS = {name: num for num, name in IDENTIFIER_TYPE_MAPPING.items()}
+_UNIT_IDS = {kind: {name: num for num, name in mapping.items()} for kind, mapping in UNIT_MAPPINGS.items()}
+
+
+def _raw_identifiers(identifiers):
+    return [{'type': _IDENTIFIER_IDS.get(i['type'], 0), 'value': i['value']} for i in identifiers]
+
+
+def _raw_amount(amount):
+    raw = {}
+    for kind, quantity in amount.items():
+        raw[kind] = {'value': quantity['value'], 'units': _UNIT_IDS.get(kind, {}).get(quantity['units'], 0)}
+    return raw
+
+
+def raw_record_from_formatted(formatted):
+    """Rebuild an ORD-style raw record (the modal <pre> JSON) from a formatted reaction.
+
+    Only the fields format_reaction_data reads are restored, which is enough to
+    serve the bundled fixtures from a mock site or to feed benchmarks.
+    """
+    inputs = []
+    for tab_name, input_data in formatted.get('inputsMap', []):
+        components = []
+        for component in input_data.get('components', []):
+            raw = {
+                'identifiersList': _raw_identifiers(component.get('identifiers', [])),
+                'reactionRole': _ROLE_IDS.get(component.get('reaction_role'), 0),
+            }
+            if component.get('amount'):
+                raw['amount'] = _raw_amount(component['amount'])
+            components.append(raw)
+        inputs.append([tab_name, {'componentsList': components}])
+
+    products = []
+    for product in formatted.get('outcomes', []):
+        raw = {
+            'identifiersList': _raw_identifiers(product.get('identifiers', [])),
+            'isDesiredProduct': product.get('is_desired_product', False),
+        }
+        measurements = []
+        for meas in product.get('measurements', []):
+            raw_meas = {'type': meas.get('type'), 'details': meas.get('details')}
+            if 'mass' in meas:
+                raw_meas['amount'] = _raw_amount({'mass': meas['mass']})
+            measurements.append(raw_meas)
+        if measurements:
+            raw['measurementsList'] = measurements
+        products.append(raw)
+
+    return {
+        'reactionId': formatted['reaction_id'],
+        'inputsMap': inputs,
+        'outcomesList': [{'productsList': products}] if products else [],
+    }
+
+
+def load_fixture_datasets(paths=FIXTURE_FILES):
+    """{dataset_id: [raw_record, ...]} from the bundled ord_formatted_data*.json files"""
+    datasets = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            formatted_output = json.load(f)
+        for dataset_id, dataset in formatted_output.items():
+            records = datasets.setdefault(dataset_id, [])
+            seen = {r['reactionId'] for r in records}
+            for reaction in dataset.get('reactions', []):
+                if reaction.get('reaction_id') and reaction['reaction_id'] not in seen:
+                    records.append(raw_record_from_formatted(reaction))
+                    seen.add(reaction['reaction_id'])
+    return datasets
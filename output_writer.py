@@ -0,0 +1,95 @@
+import json
+import queue
+import threading
+import time
+
+# --- CONFIGURATION ---
+DEFAULT_JSONL_PATH = 'ord_formatted_data.jsonl'
+FLUSH_EVERY_LINES = 200      # flush after this many buffered lines...
+FLUSH_EVERY_SECONDS = 1.0    # ...or this long after the last flush, whichever comes first
+QUEUE_SIZE = 10000           # reactions waiting for the writer thread before write() blocks
+
+_CLOSE = object()
+
+
+class JSONLWriter:
+    """Append one formatted reaction per line from a single background writer thread.
+
+    Workers call write() and return immediately; the writer thread serializes
+    lines and flushes them to disk in batches. Each line is the formatted
+    reaction with its ``dataset_id`` added, so the file can be consumed while
+    the crawl is still running.
+    """
+
+    def __init__(self, path=DEFAULT_JSONL_PATH, append=False,
+                 flush_lines=FLUSH_EVERY_LINES, flush_seconds=FLUSH_EVERY_SECONDS, queue_size=QUEUE_SIZE):
+        self.path = path
+        self.flush_lines = flush_lines
+        self.flush_seconds = flush_seconds
+        self.lines_written = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="jsonl-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, dataset_id, formatted):
+        self._queue.put((dataset_id, formatted))
+
+    def _run(self):
+        pending = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_seconds - (time.monotonic() - last_flush)) if pending else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if self.error is not None:
+                # Keep draining so writers never block; close() re-raises
+                if item is _CLOSE:
+                    return
+                continue
+
+            try:
+                if item is _CLOSE:
+                    self._file.flush()
+                    return
+                if item is not None:
+                    dataset_id, formatted = item
+                    record = {'dataset_id': dataset_id, **formatted}
+                    self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    self.lines_written += 1
+                    pending += 1
+
+                if pending and (pending >= self.flush_lines or time.monotonic() - last_flush >= self.flush_seconds):
+                    self._file.flush()
+                    pending = 0
+                    last_flush = time.monotonic()
+            except Exception as e:
+                self.error = e
+                pending = 0
+                if item is _CLOSE:
+                    return
+
+    def close(self):
+        """Drain the queue, flush and close the file; re-raises the writer thread's error"""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jsonl(path):
+    """Yield formatted reactions back from a JSONL output file"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,144 @@
+import json
+import threading
+
+from waits import timed_wait
+from log_setup import get_logger
+
+log = get_logger('page_state')
+
+# Finds the loaded reaction in the page's Vue component state and returns it as a
+# JSON string (the same toObject() shape the "View Full Record" modal prints).
+# Vue 2 components hang off element.__vue__, Vue 3 ones off __vueParentComponent
+# and the root app's __vue_app__._instance tree.
+READ_RECORD_JS = """
+const reactionId = arguments[0];
+const seen = new Set();
+
+function asRecord(value) {
+    if (typeof value.toObject === 'function' && typeof value.getReactionId === 'function') {
+        if (!reactionId || value.getReactionId() === reactionId) return value.toObject();
+        return null;
+    }
+    if (value.reactionId !== undefined && (value.inputsMap || value.outcomesList)) {
+        if (!reactionId || value.reactionId === reactionId) return value;
+    }
+    return null;
+}
+
+function search(value, depth) {
+    if (!value || typeof value !== 'object' || depth > 3 || seen.has(value)) return null;
+    if (value instanceof Node || value === window) return null;
+    seen.add(value);
+    const record = asRecord(value);
+    if (record) return record;
+    for (const key of Object.keys(value)) {
+        if (key === '$parent' || key === '$root' || key === '$el' || key === 'parent' || key === 'root') continue;
+        let child;
+        try { child = value[key]; } catch (e) { continue; }
+        const found = search(child, depth + 1);
+        if (found) return found;
+    }
+    return null;
+}
+
+const states = [];
+function addVue3(instance, depth) {
+    if (!instance || depth > 50) return;
+    states.push(instance.setupState, instance.data, instance.props);
+    const walk = (vnode) => {
+        if (!vnode) return;
+        if (vnode.component) { addVue3(vnode.component, depth + 1); return; }
+        if (Array.isArray(vnode.children)) vnode.children.forEach(walk);
+    };
+    walk(instance.subTree);
+}
+document.querySelectorAll('*').forEach(el => {
+    if (el.__vue_app__) addVue3(el.__vue_app__._instance, 0);
+    if (el.__vue__) states.push(el.__vue__.$data, el.__vue__._props);
+    if (el.__vueParentComponent) states.push(el.__vueParentComponent.setupState,
+                                             el.__vueParentComponent.data, el.__vueParentComponent.props);
+});
+
+for (const state of states) {
+    const record = search(state, 0);
+    if (record) return JSON.stringify(record);
+}
+return null;
+"""
+
+# Presence check for an XPath or CSS locator. find_elements would block for the
+# driver's whole implicit wait on every poll while the button is still missing.
+ELEMENT_PRESENT_JS = """
+const [by, value] = arguments;
+if (by === 'xpath') {
+    return document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue !== null;
+}
+return document.querySelector(value) !== null;
+"""
+
+MODAL_FALLBACK = 'modal'
+MAX_MISSES_BEFORE_DISABLE = 5
+PAGE_STATE_TIMEOUT = 5  # seconds to wait for the record or the button before going to the modal
+
+
+def read_record_from_page_state(driver, reaction_id):
+    """The loaded reaction as a dict straight from page state, or None"""
+    text = driver.execute_script(READ_RECORD_JS, reaction_id)
+    return json.loads(text) if text else None
+
+
+def record_or_button(reaction_id, button_locator):
+    """Condition: the record once it is in page state, or MODAL_FALLBACK once the
+    record button is on the page but the state holds nothing we can read"""
+    by, value = button_locator
+    if by not in ('xpath', 'css selector'):
+        raise ValueError(f"Record button locator must be an XPath or CSS selector, got {by!r}")
+
+    def condition(driver):
+        # Look for the button first: the state read below then happens after it
+        # appeared, so a record loaded alongside the button is not missed
+        button_present = driver.execute_script(ELEMENT_PRESENT_JS, by, value)
+        record = read_record_from_page_state(driver, reaction_id)
+        if record is not None:
+            return record
+        return MODAL_FALLBACK if button_present else False
+    return condition
+
+
+class PageStateReader:
+    """Read reactions from page state, switching itself off when the site doesn't expose it.
+
+    After MAX_MISSES_BEFORE_DISABLE misses in a row without a single hit, every
+    later call returns None straight away so scrapers go to the modal without
+    paying for the page-state probe.
+    """
+
+    def __init__(self, max_misses=MAX_MISSES_BEFORE_DISABLE):
+        self.max_misses = max_misses
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'consecutive_misses': 0}
+        self.enabled = True
+
+    def read(self, driver, reaction_id, button_locator, timeout=PAGE_STATE_TIMEOUT):
+        """Record dict from page state, or None when the caller should use the modal"""
+        if not self.enabled:
+            return None
+        condition = record_or_button(reaction_id, button_locator)
+        try:
+            result = timed_wait(driver, "page_state_record", condition, timeout, raise_on_timeout=False)
+        except Exception:
+            result = None
+        with self._lock:
+            if isinstance(result, dict):
+                self.stats['hits'] += 1
+                self.stats['consecutive_misses'] = 0
+                return result
+            self.stats['misses'] += 1
+            self.stats['consecutive_misses'] += 1
+            if not self.stats['hits'] and self.stats['consecutive_misses'] >= self.max_misses and self.enabled:
+                self.enabled = False
+                log.info("  Page state held no record %d times in a row, using the modal from now on", self.max_misses)
+        return None
+
+
+page_state_reader = PageStateReader()
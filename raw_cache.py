@@ -0,0 +1,161 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- CONFIGURATION ---
+DEFAULT_CACHE_DIR = 'ord_raw_cache'
+DEFAULT_MAX_MB = 2048
+ENTRY_SUFFIX = '.json.gz'
+
+
+def cache_key(reaction_id):
+    return hashlib.sha256(reaction_id.encode('utf-8')).hexdigest()
+
+
+class RawRecordCache:
+    """On-disk cache of raw ORD records, keyed by a hash of the reaction ID.
+
+    Entries are gzip-compressed JSON files sharded into 256 sub-directories.
+    Total size is bounded by ``max_bytes`` with least-recently-used eviction
+    (file mtimes carry recency across runs). With ``ttl`` set, entries older
+    than that many seconds count as misses so they get fetched again.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024, ttl=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = OrderedDict()   # key -> size, oldest first
+        self._total = 0
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def _load_index(self):
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name[:-len(ENTRY_SUFFIX)], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total += size
+
+    # --- READ / WRITE ---
+
+    def get(self, reaction_id):
+        """Cached entry dict ({'reaction_id', 'dataset_id', 'fetched_at', 'data'}) or None"""
+        key = cache_key(reaction_id)
+        path = self._path(key)
+        with self._lock:
+            known = key in self._index
+        if not known:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+        try:
+            with gzip.open(path, 'rb') as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            self._remove(key)
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        if self.ttl is not None and time.time() - entry.get('fetched_at', 0) > self.ttl:
+            self._remove(key)
+            with self._lock:
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+            return None
+
+        with self._lock:
+            self.stats['hits'] += 1
+            if key in self._index:
+                self._index.move_to_end(key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, reaction_id, data, dataset_id=None):
+        key = cache_key(reaction_id)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {'reaction_id': reaction_id, 'dataset_id': dataset_id, 'fetched_at': time.time(), 'data': data}
+        payload = gzip.compress(json.dumps(entry, ensure_ascii=False).encode('utf-8'), compresslevel=6)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._total -= self._index.pop(key, 0)
+            self._index[key] = len(payload)
+            self._total += len(payload)
+            self.stats['writes'] += 1
+            evict = []
+            while self._total > self.max_bytes and len(self._index) > 1:
+                old_key, size = self._index.popitem(last=False)
+                self._total -= size
+                evict.append(old_key)
+            self.stats['evictions'] += len(evict)
+        for old_key in evict:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _remove(self, key):
+        with self._lock:
+            self._total -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def entries(self):
+        """Paths of every cached entry (for offline processing)"""
+        with self._lock:
+            keys = list(self._index)
+        return [self._path(key) for key in keys]
+
+    # --- FETCH THROUGH ---
+
+    def fetch(self, reaction_id, fetch_fn, dataset_id=None):
+        """Serve reaction_id from the cache, or call fetch_fn() and store a successful result.
+
+        fetch_fn returns the usual {'reaction_id', 'data', 'success'} dict.
+        """
+        entry = self.get(reaction_id)
+        if entry is not None:
+            return {'reaction_id': reaction_id, 'data': entry['data'], 'success': True, 'cached': True}
+        result = fetch_fn()
+        if result.get('success') and result.get('data') is not None:
+            self.put(reaction_id, result['data'], dataset_id)
+        return result
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._index)
+            stats['size_mb'] = round(self._total / (1024 * 1024), 2)
+        return stats
+
+
+def load_entry(path):
+    """Read one cache entry file"""
+    with gzip.open(path, 'rb') as f:
+        return json.loads(f.read())
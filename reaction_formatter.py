@@ -0,0 +1,178 @@
+# --- MAPPINGS BASED ON ORD PROTOBUF DEFINITIONS ---
+REACTION_ROLE_MAPPING = {
+    0: "UNSPECIFIED", 1: "REACTANT", 2: "REAGENT", 3: "SOLVENT",
+    4: "CATALYST", 5: "WORKUP", 6: "INTERNAL_STANDARD",
+    7: "AUTHENTIC_STANDARD", 8: "PRODUCT", 9: "BYPRODUCT", 10: "SIDE_PRODUCT"
+}
+IDENTIFIER_TYPE_MAPPING = {
+    0: "UNSPECIFIED",
+    1: "CUSTOM",
+    2: "SMILES",
+    3: "INCHI",
+    4: "MOLBLOCK",
+    5: "FINGERPRINT",
+    6: "NAME",
+    7: "IUPAC_NAME",
+    8: "CAS_NUMBER"
+}
+# Mass: 1=KG, 2=G, 3=MG, 4=UG
+MASS_UNIT_MAPPING = {0: "UNSPECIFIED", 1: "KILOGRAM", 2: "GRAM", 3: "MILLIGRAM", 4: "MICROGRAM"}
+# Volume: 1=L, 2=ML, 3=UL, 4=NL
+VOLUME_UNIT_MAPPING = {0: "UNSPECIFIED", 1: "LITER", 2: "MILLILITER", 3: "MICROLITER", 4: "NANOLITER"}
+# Moles: 1=MOL, 2=MMOL, 3=UMOL, 4=NMOL
+MOLE_UNIT_MAPPING = {0: "UNSPECIFIED", 1: "MOLE", 2: "MILLIMOLE", 3: "MICROMOLE", 4: "NANOMOLE"}
+
+UNIT_MAPPINGS = {'moles': MOLE_UNIT_MAPPING, 'volume': VOLUME_UNIT_MAPPING, 'mass': MASS_UNIT_MAPPING}
+
+# --- EXTRACTION SPEC ---
+# One entry per output flavour, read by format_reaction_data().
+#   identifier_types  - identifier type ints to keep (None keeps all)
+#   amount_kinds      - amount fields checked in order; the first present wins
+#   fixed_units       - kind -> unit label emitted regardless of the units enum
+#                       (None maps the enum through UNIT_MAPPINGS)
+#   product_amount    - emit an empty "amount" on outcome products
+#   measurements      - emit product measurements (type, details, mass)
+#   require_success   - read reaction_data['success'] strictly instead of defaulting to True
+FULL = {
+    'identifier_types': None,
+    'amount_kinds': ('moles', 'volume', 'mass'),
+    'fixed_units': None,
+    'product_amount': False,
+    'measurements': True,
+    'require_success': False,
+}
+# The original web_scraper.py output: SMILES only, moles/volume with fixed labels
+SMILES_ONLY = {
+    'identifier_types': (2,),
+    'amount_kinds': ('moles', 'volume'),
+    'fixed_units': {'moles': "MOLE", 'volume': "LITER"},
+    'product_amount': True,
+    'measurements': False,
+    'require_success': True,
+}
+FLAVOURS = {'full': FULL, 'smiles': SMILES_ONLY}
+
+def _extract_measurements(product):
+    measurements = []
+    for meas in product.get('measurementsList', ()):
+        meas_data = {'type': meas.get('type'), 'details': meas.get('details')}
+        if 'amount' in meas and 'mass' in meas['amount']:
+            mass = meas['amount']['mass']
+            meas_data['mass'] = {'value': mass.get('value'), 'units': MASS_UNIT_MAPPING.get(mass.get('units', 0), "UNKNOWN")}
+        measurements.append(meas_data)
+    return measurements
+
+
+def format_reaction_data(reaction_data, spec=FULL, pool=None):
+    """Extract identifiers, amount and reaction_role while preserving the input map structure.
+
+    With a ``pool`` dict, identifier values and tab names are folded into one
+    string object per distinct value. The same reagent and solvent SMILES recur
+    thousands of times in a crawl and json.loads gives every occurrence its own
+    str; the pool only pays off while the results are held in memory, and it
+    lives as long as the caller keeps it.
+
+    This compiles the spec on every call; loops should use formatter_for().
+    """
+    return formatter_for(spec, pool)(reaction_data)
+
+
+def formatter_for(spec, pool=None):
+    """format_reaction_data(reaction_data) bound to an extraction spec (or flavour name) and string pool.
+
+    Everything the spec decides (identifier filter, amount kinds and their unit
+    labels, success handling, product fields) is resolved here once, so the
+    returned function does no spec lookups per reaction.
+    """
+    if isinstance(spec, str):
+        spec = FLAVOURS[spec]
+    types = spec['identifier_types']
+    keep_types = {t: IDENTIFIER_TYPE_MAPPING[t] for t in types} if types is not None else None
+    fixed_units = spec['fixed_units']
+    # (kind, units enum mapping, fixed label or None), checked in order
+    amount_kinds = tuple((kind, UNIT_MAPPINGS[kind], fixed_units[kind] if fixed_units is not None else None)
+                         for kind in spec['amount_kinds'])
+    require_success = spec['require_success']
+    product_amount = spec['product_amount']
+    measurements = spec['measurements']
+    intern_value = pool.setdefault if pool is not None else None
+    type_label = IDENTIFIER_TYPE_MAPPING.get
+    role_label = REACTION_ROLE_MAPPING.get
+
+    def identifiers_of(item):
+        identifiers = []
+        for identifier in item.get('identifiersList', ()):
+            type_int = identifier.get('type', 0)
+            if keep_types is None:
+                type_str = type_label(type_int, "UNKNOWN")
+            else:
+                type_str = keep_types.get(type_int)
+                if type_str is None:
+                    continue
+            value = identifier.get('value')
+            if intern_value is not None:
+                value = intern_value(value, value)
+            identifiers.append({'type': type_str, 'value': value})
+        return identifiers
+
+    def format_with_spec(reaction_data):
+        if not reaction_data or 'data' not in reaction_data:
+            return None
+        data = reaction_data['data']
+        inputs = []
+        formatted = {
+            'reaction_id': data.get('reactionId'),
+            'success': reaction_data['success'] if require_success else reaction_data.get('success', True),
+            'inputsMap': inputs,
+        }
+
+        for tab_name, input_data in data.get('inputsMap', ()):
+            components = []
+            # Components dominate the work, so identifiers and amount are unrolled here
+            for component in input_data.get('componentsList', ()):
+                identifiers = []
+                for identifier in component.get('identifiersList', ()):
+                    if keep_types is None:
+                        type_str = type_label(identifier.get('type', 0), "UNKNOWN")
+                    else:
+                        type_str = keep_types.get(identifier.get('type', 0))
+                        if type_str is None:
+                            continue
+                    value = identifier.get('value')
+                    if intern_value is not None:
+                        value = intern_value(value, value)
+                    identifiers.append({'type': type_str, 'value': value})
+                amount = {}
+                if 'amount' in component:
+                    amt = component['amount']
+                    for kind, unit_mapping, fixed_label in amount_kinds:
+                        if kind in amt:
+                            quantity = amt[kind]
+                            amount = {kind: {'value': quantity.get('value'),
+                                             'units': fixed_label if fixed_label is not None
+                                             else unit_mapping.get(quantity.get('units', 0), "UNKNOWN")}}
+                            break
+                components.append({
+                    'identifiers': identifiers,
+                    'amount': amount,
+                    'reaction_role': role_label(component.get('reactionRole'), "UNKNOWN"),
+                })
+            if intern_value is not None:
+                tab_name = intern_value(tab_name, tab_name)
+            inputs.append([tab_name, {'components': components}])
+
+        outcomes = formatted['outcomes'] = []
+        for outcome in data.get('outcomesList', ()):
+            for product in outcome.get('productsList', ()):
+                product_info = {'identifiers': identifiers_of(product)}
+                if product_amount:
+                    product_info['amount'] = {}
+                product_info['reaction_role'] = "PRODUCT"
+                product_info['is_desired_product'] = product.get('isDesiredProduct', False)
+                if measurements:
+                    product_info['measurements'] = _extract_measurements(product)
+                outcomes.append(product_info)
+        return formatted
+
+    format_with_spec.__doc__ = format_reaction_data.__doc__
+    return format_with_spec
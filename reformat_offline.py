@@ -0,0 +1,132 @@
+"""Re-run format_reaction_data over cached raw records without starting a browser.
+
+    python reformat_offline.py --cache-dir ord_raw_cache --output ord_formatted_data.json
+    python reformat_offline.py --format jsonl --workers 8
+    python reformat_offline.py --flavour smiles      # web_scraper.py output shape
+
+Records come out in the order the crawl listed them, taken from the checkpoint
+(--checkpoint); records the checkpoint does not know follow in cache order.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from checkpoint import ProgressStore, DEFAULT_CHECKPOINT_PATH
+from raw_cache import RawRecordCache, DEFAULT_CACHE_DIR, ENTRY_SUFFIX, cache_key, load_entry
+from output_writer import DEFAULT_JSONL_PATH
+from reaction_formatter import formatter_for, FLAVOURS
+
+DEFAULT_CHUNK_SIZE = 500
+UNASSIGNED_DATASET = 'unassigned'
+
+
+_formatters = {}
+
+
+def format_chunk(paths, flavour='full'):
+    """Worker: load and format one chunk of cache entries -> [(dataset_id, formatted), ...]"""
+    format_reaction_data = _formatters.get(flavour)
+    if format_reaction_data is None:
+        format_reaction_data = _formatters[flavour] = formatter_for(flavour)
+
+    out = []
+    for path in paths:
+        try:
+            entry = load_entry(path)
+            formatted = format_reaction_data({'reaction_id': entry['reaction_id'], 'data': entry['data'], 'success': True})
+        except Exception as e:
+            print(f"⚠ Could not reformat {os.path.basename(path)}: {e}")
+            continue
+        if formatted is not None:
+            out.append((entry.get('dataset_id') or UNASSIGNED_DATASET, formatted))
+    return out
+
+
+def iter_chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def listing_order(checkpoint_path):
+    """{cache key: position} from the checkpoint's enumeration, or {} without a checkpoint"""
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return {}
+    store = ProgressStore(checkpoint_path)
+    try:
+        order = {}
+        for _, reaction_id in store.enumeration_order():
+            order.setdefault(cache_key(reaction_id), len(order))
+        return order
+    finally:
+        store.close()
+
+
+def reformat_cache(cache_dir=DEFAULT_CACHE_DIR, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, flavour='full',
+                   checkpoint_path=DEFAULT_CHECKPOINT_PATH):
+    """Yield (dataset_id, formatted) for every cached record in listing order, formatted across all cores"""
+    order = listing_order(checkpoint_path)
+    if not order:
+        print("⚠ No checkpoint enumeration found, records will follow cache order")
+    unlisted = len(order)
+
+    def position(path):
+        key = os.path.basename(path)[:-len(ENTRY_SUFFIX)]
+        return order.get(key, unlisted), key
+
+    paths = sorted(RawRecordCache(cache_dir).entries(), key=position)
+    print(f"Reformatting {len(paths)} cached records with {workers or os.cpu_count()} processes...")
+    chunks = list(iter_chunks(paths, chunk_size))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk in executor.map(format_chunk, chunks, [flavour] * len(chunks)):
+            yield from chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reformat cached raw ORD records offline")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"Checkpoint whose enumeration sets the output order (default: {DEFAULT_CHECKPOINT_PATH})")
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json')
+    parser.add_argument('--flavour', choices=sorted(FLAVOURS), default='full',
+                        help="full: web_scrpaer_2.py output (default); smiles: web_scraper.py output")
+    parser.add_argument('--output', default=None,
+                        help="Output path (default: ord_formatted_data.json / ord_formatted_data.jsonl)")
+    parser.add_argument('--workers', type=int, default=None, help="Processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Records per work unit (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = 0
+    records = reformat_cache(args.cache_dir, args.workers, args.chunk_size, args.flavour, args.checkpoint)
+
+    if args.format == 'jsonl':
+        output_file = args.output or DEFAULT_JSONL_PATH
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for dataset_id, formatted in records:
+                f.write(json.dumps({'dataset_id': dataset_id, **formatted}, ensure_ascii=False) + '\n')
+                count += 1
+    else:
+        output_file = args.output or 'ord_formatted_data.json'
+        formatted_output = {}
+        for dataset_id, formatted in records:
+            dataset = formatted_output.setdefault(dataset_id, {
+                'dataset_id': dataset_id,
+                'total_reactions_scraped': 0,
+                'reactions': []
+            })
+            dataset['reactions'].append(formatted)
+            dataset['total_reactions_scraped'] += 1
+            count += 1
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(formatted_output, f, indent=2, ensure_ascii=False)
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed else 0.0
+    print(f"✓ Reformatted {count} reactions in {elapsed:.1f}s ({rate:.0f} reactions/s) -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()
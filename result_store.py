@@ -0,0 +1,340 @@
+"""Normalized, indexed SQLite store of formatted reactions.
+
+    python result_store.py --import ord_formatted_data.json ord_formatted_data.jsonl
+    python result_store.py --smiles "CC(=O)N(C)C" --role SOLVENT
+    python result_store.py --smiles "CC(=O)N(C)C" --product
+
+Tables: reactions -> components -> component_identifiers, and
+reactions -> outcomes -> outcome_identifiers / measurements. Identifier values
+(SMILES, names, ...), roles, dataset_id and reaction_id are indexed, so "every
+reaction that uses X as SOLVENT" is an index lookup instead of a walk over
+every JSON output. During a crawl ResultWriter is an output sink that inserts
+in batched transactions from one background thread.
+"""
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+
+from delta_sync import load_existing_output
+
+# --- CONFIGURATION ---
+DEFAULT_RESULT_STORE_PATH = 'ord_results.sqlite'
+BATCH_REACTIONS = 500        # reactions per insert transaction...
+BATCH_SECONDS = 2.0          # ...or this long after the first one queued, whichever comes first
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reactions (
+    reaction_pk INTEGER PRIMARY KEY,
+    reaction_id TEXT NOT NULL UNIQUE,
+    dataset_id TEXT,
+    success INTEGER,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS components (
+    component_pk INTEGER PRIMARY KEY,
+    reaction_pk INTEGER NOT NULL REFERENCES reactions (reaction_pk) ON DELETE CASCADE,
+    input_name TEXT,
+    component_index INTEGER NOT NULL,
+    reaction_role TEXT,
+    amount_kind TEXT,
+    amount_value REAL,
+    amount_unit TEXT
+);
+CREATE TABLE IF NOT EXISTS component_identifiers (
+    component_pk INTEGER NOT NULL REFERENCES components (component_pk) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    type TEXT,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    outcome_pk INTEGER PRIMARY KEY,
+    reaction_pk INTEGER NOT NULL REFERENCES reactions (reaction_pk) ON DELETE CASCADE,
+    product_index INTEGER NOT NULL,
+    reaction_role TEXT,
+    is_desired_product INTEGER,
+    amount_kind TEXT,
+    amount_value REAL,
+    amount_unit TEXT
+);
+CREATE TABLE IF NOT EXISTS outcome_identifiers (
+    outcome_pk INTEGER NOT NULL REFERENCES outcomes (outcome_pk) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    type TEXT,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    outcome_pk INTEGER NOT NULL REFERENCES outcomes (outcome_pk) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    type INTEGER,
+    details TEXT,
+    mass_value REAL,
+    mass_unit TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reactions_dataset ON reactions (dataset_id);
+CREATE INDEX IF NOT EXISTS idx_components_reaction ON components (reaction_pk);
+CREATE INDEX IF NOT EXISTS idx_components_role ON components (reaction_role);
+CREATE INDEX IF NOT EXISTS idx_component_identifiers_value ON component_identifiers (value, component_pk);
+CREATE INDEX IF NOT EXISTS idx_component_identifiers_component ON component_identifiers (component_pk);
+CREATE INDEX IF NOT EXISTS idx_outcomes_reaction ON outcomes (reaction_pk);
+CREATE INDEX IF NOT EXISTS idx_outcomes_role ON outcomes (reaction_role);
+CREATE INDEX IF NOT EXISTS idx_outcome_identifiers_value ON outcome_identifiers (value, outcome_pk);
+CREATE INDEX IF NOT EXISTS idx_outcome_identifiers_outcome ON outcome_identifiers (outcome_pk);
+CREATE INDEX IF NOT EXISTS idx_measurements_outcome ON measurements (outcome_pk);
+"""
+
+_CLOSE = object()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+def _amount(amount):
+    """(kind, value, unit) of the first quantity in a formatted amount"""
+    for kind, quantity in (amount or {}).items():
+        return kind, quantity.get('value'), quantity.get('units')
+    return None, None, None
+
+
+class ResultStore:
+    """Query side of the result store; also owns the schema.
+
+    Reads use their own connection, so queries work while a ResultWriter on
+    the same file is inserting (WAL mode).
+    """
+
+    def __init__(self, path=DEFAULT_RESULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = _connect(path)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- DEDUPE ---
+
+    def known_reactions(self):
+        """{dataset_id: set of reaction IDs} held in the store (delta_sync.known_reactions shape)"""
+        known = {}
+        for dataset_id, reaction_id in self._query("SELECT dataset_id, reaction_id FROM reactions WHERE success = 1"):
+            known.setdefault(dataset_id, set()).add(reaction_id)
+        return known
+
+    def has_reaction(self, reaction_id):
+        return bool(self._query("SELECT 1 FROM reactions WHERE reaction_id = ? AND success = 1", (reaction_id,)))
+
+    # --- QUERIES ---
+
+    def reactions_using(self, value, role=None, dataset_id=None):
+        """Reaction IDs with an input component identified by ``value`` (e.g. a SMILES), optionally in ``role``"""
+        sql = ("SELECT DISTINCT r.reaction_id FROM component_identifiers ci "
+               "JOIN components c ON c.component_pk = ci.component_pk "
+               "JOIN reactions r ON r.reaction_pk = c.reaction_pk WHERE ci.value = ?")
+        params = [value]
+        if role is not None:
+            sql += " AND c.reaction_role = ?"
+            params.append(role)
+        if dataset_id is not None:
+            sql += " AND r.dataset_id = ?"
+            params.append(dataset_id)
+        return [row[0] for row in self._query(sql + " ORDER BY r.reaction_id", params)]
+
+    def reactions_producing(self, value, desired_only=False, dataset_id=None):
+        """Reaction IDs with an outcome product identified by ``value``"""
+        sql = ("SELECT DISTINCT r.reaction_id FROM outcome_identifiers oi "
+               "JOIN outcomes o ON o.outcome_pk = oi.outcome_pk "
+               "JOIN reactions r ON r.reaction_pk = o.reaction_pk WHERE oi.value = ?")
+        params = [value]
+        if desired_only:
+            sql += " AND o.is_desired_product = 1"
+        if dataset_id is not None:
+            sql += " AND r.dataset_id = ?"
+            params.append(dataset_id)
+        return [row[0] for row in self._query(sql + " ORDER BY r.reaction_id", params)]
+
+    def reactions_in_dataset(self, dataset_id):
+        return [row[0] for row in self._query(
+            "SELECT reaction_id FROM reactions WHERE dataset_id = ? ORDER BY reaction_id", (dataset_id,))]
+
+    def components_of(self, reaction_id):
+        """[(input_name, role, identifier type, identifier value, amount kind, value, unit)] for one reaction"""
+        return self._query(
+            "SELECT c.input_name, c.reaction_role, ci.type, ci.value, c.amount_kind, c.amount_value, c.amount_unit "
+            "FROM reactions r JOIN components c ON c.reaction_pk = r.reaction_pk "
+            "JOIN component_identifiers ci ON ci.component_pk = c.component_pk "
+            "WHERE r.reaction_id = ? ORDER BY c.component_pk, ci.position", (reaction_id,))
+
+    def counts(self):
+        return {table: self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+                for table in ('reactions', 'components', 'component_identifiers', 'outcomes',
+                              'outcome_identifiers', 'measurements')}
+
+
+class ResultWriter:
+    """Insert formatted reactions into the result store from one background thread.
+
+    Same calling convention as output_writer.JSONLWriter. Reactions are
+    inserted with executemany in one transaction per batch; a reaction already
+    in the store is replaced, so re-runs never duplicate rows. Primary keys are
+    assigned here (the writer is the only inserter), so a whole batch needs no
+    per-row round trips.
+    """
+
+    def __init__(self, path=DEFAULT_RESULT_STORE_PATH, batch_reactions=BATCH_REACTIONS, batch_seconds=BATCH_SECONDS):
+        ResultStore(path).close()   # create the schema
+        self.path = path
+        self.batch_reactions = batch_reactions
+        self.batch_seconds = batch_seconds
+        self.reactions_written = 0
+        self.error = None
+        self._conn = _connect(path)
+        self._next = {}
+        for table, pk in (('reactions', 'reaction_pk'), ('components', 'component_pk'), ('outcomes', 'outcome_pk')):
+            self._next[table] = (self._conn.execute(f"SELECT MAX({pk}) FROM {table}").fetchone()[0] or 0) + 1
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, dataset_id, formatted):
+        self._queue.put((dataset_id, formatted))
+
+    def _pk(self, table):
+        pk = self._next[table]
+        self._next[table] = pk + 1
+        return pk
+
+    def _run(self):
+        batch = []
+        first_at = None
+        while True:
+            timeout = max(0.0, self.batch_seconds - (time.monotonic() - first_at)) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _CLOSE:
+                if not batch:
+                    first_at = time.monotonic()
+                batch.append(item)
+            if batch and (item is _CLOSE or item is None or len(batch) >= self.batch_reactions):
+                if self.error is None:
+                    try:
+                        self._insert(batch)
+                    except Exception as e:
+                        self.error = e
+                batch = []
+            if item is _CLOSE:
+                return
+
+    def _insert(self, batch):
+        # Last write wins when a reaction shows up twice in one batch
+        latest = {}
+        for dataset_id, formatted in batch:
+            latest[formatted.get('reaction_id')] = (dataset_id, formatted)
+        reactions, components, component_ids, outcomes, outcome_ids, measurements = [], [], [], [], [], []
+        now = time.time()
+        for reaction_id, (dataset_id, formatted) in latest.items():
+            reaction_pk = self._pk('reactions')
+            reactions.append((reaction_pk, reaction_id, dataset_id, int(bool(formatted.get('success', True))), now))
+            for input_name, tab in formatted.get('inputsMap', ()):
+                for index, component in enumerate(tab.get('components', ())):
+                    component_pk = self._pk('components')
+                    components.append((component_pk, reaction_pk, input_name, index, component.get('reaction_role'),
+                                       *_amount(component.get('amount'))))
+                    for position, identifier in enumerate(component.get('identifiers', ())):
+                        component_ids.append((component_pk, position, identifier.get('type'), identifier.get('value')))
+            for index, product in enumerate(formatted.get('outcomes', ())):
+                outcome_pk = self._pk('outcomes')
+                outcomes.append((outcome_pk, reaction_pk, index, product.get('reaction_role'),
+                                 int(bool(product.get('is_desired_product'))), *_amount(product.get('amount'))))
+                for position, identifier in enumerate(product.get('identifiers', ())):
+                    outcome_ids.append((outcome_pk, position, identifier.get('type'), identifier.get('value')))
+                for position, measurement in enumerate(product.get('measurements', ())):
+                    mass = measurement.get('mass') or {}
+                    measurements.append((outcome_pk, position, measurement.get('type'), measurement.get('details'),
+                                         mass.get('value'), mass.get('units')))
+
+        with self._conn:
+            # Replace reactions stored by an earlier run; children go with them (ON DELETE CASCADE)
+            self._conn.executemany("DELETE FROM reactions WHERE reaction_id = ?", [(r,) for r in latest])
+            self._conn.executemany("INSERT INTO reactions VALUES (?, ?, ?, ?, ?)", reactions)
+            self._conn.executemany("INSERT INTO components VALUES (?, ?, ?, ?, ?, ?, ?, ?)", components)
+            self._conn.executemany("INSERT INTO component_identifiers VALUES (?, ?, ?, ?)", component_ids)
+            self._conn.executemany("INSERT INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", outcomes)
+            self._conn.executemany("INSERT INTO outcome_identifiers VALUES (?, ?, ?, ?)", outcome_ids)
+            self._conn.executemany("INSERT INTO measurements VALUES (?, ?, ?, ?, ?, ?)", measurements)
+        self.reactions_written += len(latest)
+
+    def close(self):
+        """Insert the last batch and close the connection"""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._conn.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def import_formatted_output(path, store_path=DEFAULT_RESULT_STORE_PATH):
+    """Load an existing ord_formatted_data .json/.jsonl into the store; returns reactions written"""
+    with ResultWriter(store_path) as writer:
+        for dataset_id, dataset in load_existing_output(path).items():
+            for reaction in dataset.get('reactions', []):
+                writer.write(dataset_id, reaction)
+    return writer.reactions_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load and query the indexed ORD result store")
+    parser.add_argument('--db', default=DEFAULT_RESULT_STORE_PATH, help="Store path (default: %(default)s)")
+    parser.add_argument('--import', dest='imports', nargs='+', default=[], metavar='OUTPUT',
+                        help="Formatted .json/.jsonl outputs to load into the store")
+    parser.add_argument('--smiles', default=None, help="Identifier value to look up (SMILES, name, ...)")
+    parser.add_argument('--role', default=None, help="Only components in this role (SOLVENT, REACTANT, ...)")
+    parser.add_argument('--dataset', default=None, help="Only reactions from this dataset")
+    parser.add_argument('--product', action='store_true', help="Look the identifier up among outcome products")
+    args = parser.parse_args()
+
+    for path in args.imports:
+        started = time.perf_counter()
+        n = import_formatted_output(path, args.db)
+        print(f"✓ Imported {n} reactions from {path} in {time.perf_counter() - started:.2f}s")
+
+    store = ResultStore(args.db)
+    try:
+        if args.smiles:
+            started = time.perf_counter()
+            if args.product:
+                reaction_ids = store.reactions_producing(args.smiles, dataset_id=args.dataset)
+            else:
+                reaction_ids = store.reactions_using(args.smiles, role=args.role, dataset_id=args.dataset)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for reaction_id in reaction_ids:
+                print(reaction_id)
+            print(f"{len(reaction_ids)} reactions ({elapsed_ms:.1f} ms)")
+        else:
+            print(f"{args.db}: {store.counts()}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
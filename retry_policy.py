@@ -0,0 +1,160 @@
+import json
+import random
+import threading
+import time
+
+from log_setup import get_logger
+
+log = get_logger('retry')
+
+# --- CONFIGURATION ---
+MAX_ATTEMPTS = 3            # transient failures (timeouts, resets, 5xx)
+STRUCTURE_ATTEMPTS = 2      # page-structure failures: one more try in case the page was half rendered
+BASE_DELAY = 1.0            # seconds; attempt n waits up to BASE_DELAY * 2**(n-1)
+MAX_DELAY = 30.0
+BREAKER_THRESHOLD = 5       # consecutive transient failures, across all workers, that open the breaker
+BREAKER_RESET = 30.0        # seconds the breaker stays open before one probe is let through
+BREAKER_POLL = 0.5          # seconds between checks while another worker probes
+
+# Failure kinds
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+STRUCTURE = 'page_structure'
+FAILURE_KINDS = (TRANSIENT, PERMANENT, STRUCTURE)
+
+
+class PermanentError(Exception):
+    """Retrying can't help: the reaction is gone or the site returned a different one"""
+
+
+class PageStructureError(Exception):
+    """The page no longer looks the way the scraper expects"""
+
+
+def classify_failure(error):
+    """TRANSIENT, PERMANENT or STRUCTURE for an exception raised while fetching a reaction.
+
+    Timeouts count as TRANSIENT; scrapers raise PageStructureError instead when
+    the page finished loading but an element they wait for never appeared.
+    """
+    if isinstance(error, PermanentError):
+        return PERMANENT
+    if isinstance(error, (PageStructureError, json.JSONDecodeError)):
+        return STRUCTURE
+    status = getattr(error, 'status', None)
+    if status is not None and 400 <= status < 500 and status not in (408, 425, 429):
+        return PERMANENT
+    return TRANSIENT
+
+
+class CircuitBreaker:
+    """Pause every worker while the site looks down.
+
+    After ``threshold`` transient failures in a row (from any worker) the
+    breaker opens and callers wait. ``reset_timeout`` seconds later one probe
+    is let through: its success closes the breaker, its failure re-opens it.
+    Permanent and page-structure failures mean the site answered, so they
+    count as successes here.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_at = None
+        self.stats = {'opened': 0, 'waits': 0}
+
+    def admit(self):
+        """0 if the caller may go ahead, otherwise seconds to wait before asking again"""
+        with self._lock:
+            if self.state == 'closed':
+                return 0
+            now = time.monotonic()
+            if self.state == 'open':
+                remaining = self._opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    return remaining
+                self.state = 'half_open'
+                self._probe_at = None
+            # Half open: one probe at a time; a probe that never reports back is replaced
+            if self._probe_at is None or now - self._probe_at > self.reset_timeout:
+                self._probe_at = now
+                log.info("  Circuit breaker half open, probing the site")
+                return 0
+            return BREAKER_POLL
+
+    def wait(self):
+        """Block until admitted"""
+        delay = self.admit()
+        if delay:
+            with self._lock:
+                self.stats['waits'] += 1
+        while delay:
+            time.sleep(delay)
+            delay = self.admit()
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self.state != 'closed':
+                self.state = 'closed'
+                log.info("  Circuit breaker closed, resuming")
+
+    def record_failure(self, kind):
+        if kind != TRANSIENT:
+            # The site answered, just not with what we wanted: it is up
+            self.record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half_open' or (self.state == 'closed' and self._failures >= self.threshold):
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self.stats['opened'] += 1
+                log.warning("  ⚠ Circuit breaker open after %d transient failures, pausing all workers for %gs",
+                            self._failures, self.reset_timeout)
+
+
+class RetryPolicy:
+    """How often and how long to retry a reaction, by failure kind.
+
+    Backoff is exponential with full jitter: before attempt n+1 the caller
+    sleeps a random time in [0, min(max_delay, base_delay * 2**(n-1))].
+    Permanent failures are never retried.
+    """
+
+    def __init__(self, max_attempts=MAX_ATTEMPTS, structure_attempts=STRUCTURE_ATTEMPTS,
+                 base_delay=BASE_DELAY, max_delay=MAX_DELAY, breaker=None):
+        self.max_attempts = max_attempts
+        self.structure_attempts = structure_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def attempts_for(self, kind, max_attempts=None):
+        limit = max_attempts or self.max_attempts
+        if kind == PERMANENT:
+            return 1
+        if kind == STRUCTURE:
+            return min(self.structure_attempts, limit)
+        return limit
+
+    def should_retry(self, kind, attempts, max_attempts=None):
+        """Whether a reaction that has failed ``attempts`` times, last with ``kind``, gets another try"""
+        return attempts < self.attempts_for(kind, max_attempts)
+
+    def backoff(self, attempts):
+        """Seconds to sleep after the ``attempts``-th failure"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+
+
+def failed_result(reaction_id, error, kind, attempts):
+    """Result dict for a reaction that ran out of attempts"""
+    return {'reaction_id': reaction_id, 'data': None, 'success': False,
+            'error': f"{kind}: {str(error)[:100]}", 'failure': kind, 'attempts': attempts}
+
+
+retry_policy = RetryPolicy()
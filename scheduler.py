@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+
+from log_setup import get_logger, progress
+
+log = get_logger('scheduler')
+
+# Work item kinds on the shared queue
+ENUMERATE = 'enumerate'
+REACTION = 'reaction'
+
+
+class ReactionScheduler:
+    """Crawl scheduler whose unit of work is one (dataset_id, reaction_id) pair.
+
+    Every dataset first becomes an ENUMERATE item; enumerating it pushes one
+    REACTION item per reaction onto the same queue. All workers pull from that
+    queue, so a dataset with thousands of reactions is spread over every worker
+    instead of pinning one of them.
+
+    ``enumerate_fn(dataset_id, start, end)`` returns the dataset's reaction IDs
+    and ``scrape_fn(dataset_id, reaction_id)`` returns the per-reaction result
+    dict (same shape as scrape_reaction_data, plus 'formatted_data').
+
+    With a checkpoint ``store`` (checkpoint.ProgressStore) every enumeration and
+    reaction is persisted as it completes, and work already in the store is
+    reused instead of being done again.
+
+    ``sink(dataset_id, result)`` is called for every newly scraped reaction.
+    With keep_results=False only a slim {'reaction_id', 'success'} record is
+    kept per reaction, so memory stays flat when a sink owns the output.
+
+    With a ``controller`` (concurrency.AIMDController) every scrape and every
+    enumeration takes one of its slots, so only ``controller.limit`` of the
+    ``max_workers`` threads hit the site at a time and the controller can grow
+    or shrink that number during the run. Only scrapes feed its latency window.
+    """
+
+    def __init__(self, enumerate_fn, scrape_fn, max_workers=3, store=None, sink=None, keep_results=True,
+                 controller=None):
+        self.enumerate_fn = enumerate_fn
+        self.scrape_fn = scrape_fn
+        self.max_workers = max_workers
+        self.store = store
+        self.sink = sink
+        self.keep_results = keep_results
+        self.controller = controller
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._reaction_ids = {}   # dataset_id -> ordered reaction IDs
+        self._results = {}        # dataset_id -> {reaction_id: result}
+        self._remaining = {}      # dataset_id -> reactions still in flight
+        self._errors = {}         # dataset_id -> enumeration error
+        self._completed = 0
+        self._total_datasets = 0
+
+    # --- WORKERS ---
+
+    def _worker(self):
+        while True:
+            progress.set_state('idle')
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, dataset_id, payload = item
+                if kind == ENUMERATE:
+                    self._enumerate(dataset_id, *payload)
+                else:
+                    self._scrape(dataset_id, payload)
+            finally:
+                self._queue.task_done()
+
+    def _enumerate(self, dataset_id, start, end):
+        progress.set_state(f'list {dataset_id}')
+        try:
+            reaction_ids = self.store.load_enumeration(dataset_id, start, end) if self.store else None
+            if reaction_ids is None:
+                # Listing pages hit the site too, so they take a controller slot as well
+                if self.controller is not None:
+                    progress.set_state('wait')
+                    self.controller.acquire()
+                    progress.set_state(f'list {dataset_id}')
+                try:
+                    reaction_ids = self.enumerate_fn(dataset_id, start, end)
+                finally:
+                    if self.controller is not None:
+                        self.controller.release()
+                if self.store and reaction_ids:
+                    self.store.save_enumeration(dataset_id, start, end, reaction_ids)
+        except Exception as e:
+            log.error("✗ Error enumerating dataset %s: %s", dataset_id, e)
+            with self._lock:
+                self._errors[dataset_id] = str(e)
+            reaction_ids = []
+
+        with self._lock:
+            self._reaction_ids[dataset_id] = list(reaction_ids)
+            self._results[dataset_id] = {}
+            self._remaining[dataset_id] = len(reaction_ids)
+        progress.add_total(len(reaction_ids))
+        log.info("  Queued %d reactions from %s", len(reaction_ids), dataset_id)
+
+        if not reaction_ids:
+            self._dataset_finished(dataset_id)
+        for reaction_id in reaction_ids:
+            self._queue.put((REACTION, dataset_id, reaction_id))
+
+    def _scrape(self, dataset_id, reaction_id):
+        progress.set_state(reaction_id)
+        result = self.store.load_reaction(reaction_id) if self.store else None
+        if result is None:
+            if self.controller is not None:
+                progress.set_state('wait')
+                self.controller.acquire()
+                progress.set_state(reaction_id)
+            started = time.perf_counter()
+            try:
+                result = self.scrape_fn(dataset_id, reaction_id)
+            except Exception as e:
+                log.error("✗ Error scraping %s: %s", reaction_id, e)
+                result = {'reaction_id': reaction_id, 'data': None, 'success': False, 'error': str(e)}
+            finally:
+                if self.controller is not None:
+                    self.controller.release(time.perf_counter() - started, bool(result and result['success']))
+            if self.store:
+                self.store.save_reaction(dataset_id, result)
+            if self.sink is not None:
+                self.sink(dataset_id, result)
+        progress.advance(result['success'])
+        if not self.keep_results:
+            result = {'reaction_id': reaction_id, 'success': result['success']}
+
+        with self._lock:
+            self._results[dataset_id][reaction_id] = result
+            self._remaining[dataset_id] -= 1
+            finished = self._remaining[dataset_id] == 0
+        if finished:
+            self._dataset_finished(dataset_id)
+
+    def _dataset_finished(self, dataset_id):
+        with self._lock:
+            self._completed += 1
+            completed = self._completed
+        log.info("✓ Completed dataset %d/%d: %s", completed, self._total_datasets, dataset_id)
+
+    # --- RUN ---
+
+    def run(self, jobs):
+        """Scrape every (dataset_id, start, end) job; returns per-dataset results in job order"""
+        jobs = list(jobs)
+        self._total_datasets = len(jobs)
+        for dataset_id, start, end in jobs:
+            self._queue.put((ENUMERATE, dataset_id, (start, end)))
+
+        workers = [threading.Thread(target=self._worker, name=f"worker-{n}", daemon=True)
+                   for n in range(1, self.max_workers + 1)]
+        for worker in workers:
+            worker.start()
+
+        # Reaction items are queued by workers while enumerating, so join() only
+        # returns once every enumeration and every reaction has been processed.
+        self._queue.join()
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
+
+        return [self._dataset_result(dataset_id) for dataset_id, _, _ in jobs]
+
+    def _dataset_result(self, dataset_id):
+        by_id = self._results.get(dataset_id, {})
+        reactions = [by_id[rid] for rid in self._reaction_ids.get(dataset_id, []) if rid in by_id]
+        result = {
+            'dataset_id': dataset_id,
+            'reactions': reactions,
+            'total_reactions': len(reactions),
+            'successful_scrapes': sum(1 for r in reactions if r['success']),
+        }
+        if dataset_id in self._errors:
+            result['error'] = self._errors[dataset_id]
+        return result
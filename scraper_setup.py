@@ -38,21 +38,50 @@
 #     driver.implicitly_wait(10)
     
 #     return driver
+import os
+
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 
-def get_driver():
-    """Create a stable Chrome driver with optimized options"""
+# --- DRIVER PROFILES ---
+# default: visible window, full page loads (the original setup)
+# lean:    headless, "eager" page loads (DOMContentLoaded), no images, fonts
+#          or analytics. ORD pages render their data from the API, so none of
+#          those are needed to read a reaction or a listing. Stylesheets still
+#          load: the visibility waits (e.g. on the modal <pre>) go through
+#          is_displayed(), which reads the computed style.
+DRIVER_PROFILES = ('default', 'lean')
+DEFAULT_PROFILE = os.environ.get("ORD_DRIVER_PROFILE", "default")
+
+# URL patterns blocked through CDP (Network.setBlockedURLs) in the lean profile
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*hotjar.com*", "*segment.io*", "*sentry.io*",
+]
+
+def get_driver(profile=None):
+    """Create a stable Chrome driver with optimized options.
+    profile: 'default' or 'lean' (see DRIVER_PROFILES); falls back to $ORD_DRIVER_PROFILE"""
+    profile = profile or DEFAULT_PROFILE
+    if profile not in DRIVER_PROFILES:
+        raise ValueError(f"Unknown driver profile {profile!r}, expected one of {DRIVER_PROFILES}")
+    lean = profile == 'lean'
     chrome_options = Options()
     
     # Optional: Run headless (no browser window)
-    # chrome_options.add_argument("--headless")
+    if lean:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,800")
+        # Return from driver.get() at DOMContentLoaded; our explicit waits cover the rest
+        chrome_options.page_load_strategy = 'eager'
     
     # Stability and privacy options
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
     
     # Disable cache for fresh data
@@ -63,18 +92,27 @@ def get_driver():
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-gpu")
+    if lean:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--disable-extensions")
+        chrome_options.add_argument("--disable-background-networking")
+        chrome_options.add_argument("--disable-renderer-backgrounding")
+        chrome_options.add_argument("--mute-audio")
     
     # Suppress logging
     chrome_options.add_argument("--log-level=3")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
     
     # Download settings
-    chrome_options.add_experimental_option("prefs", {
+    prefs = {
         "download.default_directory": "./downloads",
         "download.prompt_for_download": False,
         "download.directory_upgrade": True,
         "safebrowsing.enabled": True
-    })
+    }
+    if lean:
+        prefs["profile.managed_default_content_settings.images"] = 2
+    chrome_options.add_experimental_option("prefs", prefs)
     
     # Create driver with webdriver-manager (auto-downloads chromedriver)
     driver = webdriver.Chrome(
@@ -82,8 +120,12 @@ def get_driver():
         options=chrome_options
     )
     
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    
     # Set timeouts
     driver.set_page_load_timeout(30)
     driver.implicitly_wait(10)
     
-    return driver
\ No newline at end of file
+    return driver
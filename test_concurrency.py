@@ -0,0 +1,85 @@
+import threading
+import time
+
+from concurrency import AIMDController
+from scheduler import ReactionScheduler
+
+
+def complete(controller, n, seconds=0.1, success=True):
+    """Run ``n`` scrapes one after another through the controller"""
+    for _ in range(n):
+        controller.acquire()
+        controller.release(seconds, success)
+
+
+def test_healthy_windows_increase_up_to_max():
+    controller = AIMDController(1, 3, initial=2, window=4)
+    complete(controller, 4)
+    assert controller.limit == 3
+    complete(controller, 4)
+    assert controller.limit == 3
+    assert [d['action'] for d in controller.decisions] == ['increase', 'increase']
+
+
+def test_errors_decrease_then_cool_down():
+    controller = AIMDController(1, 8, initial=4, window=4)
+    complete(controller, 3)
+    complete(controller, 1, success=False)
+    assert controller.limit == 2
+    complete(controller, 4)
+    assert controller.limit == 2
+    assert controller.decisions[-1]['action'] == 'hold'
+    complete(controller, 4)
+    assert controller.limit == 3
+
+
+def test_decrease_stops_at_min_workers():
+    controller = AIMDController(2, 8, initial=2, window=4)
+    complete(controller, 4, success=False)
+    assert controller.limit == 2
+
+
+def test_latency_above_tolerance_decreases():
+    controller = AIMDController(1, 8, initial=4, window=4, latency_tolerance=2.0)
+    complete(controller, 4, seconds=0.1)
+    assert controller.limit == 5 and controller.best_p50 == 0.1
+    complete(controller, 4, seconds=0.5)
+    assert controller.limit == 2
+    assert controller.best_p50 == 0.1
+
+
+def test_release_without_seconds_records_nothing():
+    controller = AIMDController(1, 8, initial=2, window=2)
+    for _ in range(5):
+        controller.acquire()
+        controller.release()
+    assert controller.decisions == [] and controller.limit == 2
+
+
+def test_try_acquire_respects_limit():
+    controller = AIMDController(1, 8, initial=2)
+    assert controller.try_acquire() and controller.try_acquire()
+    assert not controller.try_acquire()
+    controller.release()
+    assert controller.try_acquire()
+
+
+def test_scheduler_enumeration_takes_controller_slots():
+    controller = AIMDController(1, 8, initial=1)
+    lock = threading.Lock()
+    running = {'now': 0, 'peak': 0}
+
+    def enumerate_fn(dataset_id, start, end):
+        with lock:
+            running['now'] += 1
+            running['peak'] = max(running['peak'], running['now'])
+        time.sleep(0.02)
+        with lock:
+            running['now'] -= 1
+        return [f"{dataset_id}-r1"]
+
+    scheduler = ReactionScheduler(enumerate_fn, lambda d, r: {'reaction_id': r, 'success': True},
+                                  max_workers=4, controller=controller)
+    results = scheduler.run([(f"ds{n}", None, None) for n in range(6)])
+    assert running['peak'] == 1
+    assert sum(r['successful_scrapes'] for r in results) == 6
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip('selenium')
+
+import dataset_catalog
+from dataset_catalog import DatasetCatalog, PAGE_SIZE, refresh_catalog
+
+
+class FakeListing:
+    """Stands in for the browser on /browse: ``rows`` split into PAGE_SIZE pages"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.page = 1
+        self.pages_read = []
+
+    def open(self, driver, base_url, timeout):
+        self.page = 1
+        return len(self.rows)
+
+    def read(self, driver):
+        self.pages_read.append(self.page)
+        start = (self.page - 1) * PAGE_SIZE
+        return self.rows[start:start + PAGE_SIZE]
+
+    def next(self, driver):
+        if self.page * PAGE_SIZE >= len(self.rows):
+            return False
+        self.page += 1
+        return True
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    fake = FakeListing([(f"ds{n:04d}", 10) for n in range(PAGE_SIZE * 2 + 5)])
+    monkeypatch.setattr(dataset_catalog, '_open_browse', fake.open)
+    monkeypatch.setattr(dataset_catalog, '_read_page', fake.read)
+    monkeypatch.setattr(dataset_catalog, '_next_page', fake.next)
+    return fake
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = DatasetCatalog(str(tmp_path / 'catalog.sqlite'))
+    yield catalog
+    catalog.close()
+
+
+def test_unchanged_listing_reads_only_page_1(listing, catalog):
+    assert refresh_catalog(None, catalog, 'http://ord') == 3
+    listing.pages_read.clear()
+    assert refresh_catalog(None, catalog, 'http://ord') == 1
+    assert listing.pages_read == [1]
+
+
+def test_forced_refresh_sees_count_change_on_page_2(listing, catalog):
+    refresh_catalog(None, catalog, 'http://ord')
+    changed = listing.rows[PAGE_SIZE + 3][0]
+    listing.rows[PAGE_SIZE + 3] = (changed, 12)
+
+    refresh_catalog(None, catalog, 'http://ord')
+    assert catalog.reaction_counts()[changed] == 10
+
+    assert refresh_catalog(None, catalog, 'http://ord', force=True) == 3
+    assert catalog.reaction_counts()[changed] == 12
@@ -0,0 +1,94 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from async_crawler import run_async_crawl
+from http_fetcher import HTTPRecordFetcher, RECORD_PATH_TEMPLATE
+from metrics import metrics
+from retry_policy import RetryPolicy, CircuitBreaker, PERMANENT
+
+RECORD = {'reactionId': 'ord-fixture1', 'inputsMap': [], 'outcomesList': []}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves RECORD at the record endpoint; the first ``fail_first`` requests get a 503"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failing = server.requests <= server.fail_first
+        if failing:
+            self._send(503, b'{}')
+        elif self.path == RECORD_PATH_TEMPLATE.format(reaction_id=RECORD['reactionId']):
+            self._send(200, json.dumps(RECORD).encode())
+        else:
+            self._send(404, b'{}')
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    httpd.lock = threading.Lock()
+    httpd.requests = 0
+    httpd.fail_first = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(server, reaction_id):
+    policy = RetryPolicy(base_delay=0, breaker=CircuitBreaker())
+    with HTTPRecordFetcher(f"http://127.0.0.1:{server.server_address[1]}", pool_size=2, timeout=5) as fetcher:
+        return fetcher.scrape_reaction_data(reaction_id, policy=policy)
+
+
+def test_fetches_fixture_record(server):
+    result = fetch(server, 'ord-fixture1')
+    assert result == {'reaction_id': 'ord-fixture1', 'data': RECORD, 'success': True}
+    assert server.requests == 1
+
+
+def test_retries_after_503(server):
+    server.fail_first = 1
+    before = metrics.summary()
+    result = fetch(server, 'ord-fixture1')
+    assert result['success'] and result['data'] == RECORD
+    assert server.requests == 2
+    after = metrics.summary()
+    for event, n in (('attempts', 2), ('retries', 1), ('transient_errors', 1)):
+        assert after['counters'][event] - before['counters'].get(event, 0) == n
+    fetches = before['stages'].get('http_fetch', {}).get('count', 0)
+    assert after['stages']['http_fetch']['count'] - fetches == 2
+
+
+def test_missing_record_is_permanent(server):
+    result = fetch(server, 'ord-missing')
+    assert not result['success']
+    assert result['failure'] == PERMANENT and result['attempts'] == 1
+    assert server.requests == 1
+
+
+def test_async_crawl_keeps_listing_order(server):
+    ids = {'ds1': ['ord-fixture1', 'ord-missing', 'ord-fixture1'], 'ds2': [], 'ds3': ['ord-fixture1']}
+    output = run_async_crawl(ids, lambda result: result['reaction_id'], concurrency=2,
+                             base_url=f"http://127.0.0.1:{server.server_address[1]}", rate=1000, burst=10)
+    assert [entry['dataset_id'] for entry in output] == ['ds1', 'ds2', 'ds3']
+    assert [r['reaction_id'] for r in output[0]['reactions']] == ids['ds1']
+    assert [entry['successful_scrapes'] for entry in output] == [2, 0, 1]
+    assert output[0]['reactions'][0]['formatted_data'] == 'ord-fixture1'
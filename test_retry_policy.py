@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+import retry_policy
+from http_fetcher import HTTPStatusError
+from retry_policy import (CircuitBreaker, RetryPolicy, classify_failure, PermanentError, PageStructureError,
+                          TRANSIENT, PERMANENT, STRUCTURE, BREAKER_POLL)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(retry_policy.time, 'monotonic', fake)
+    return fake
+
+
+@pytest.mark.parametrize('error, kind', [
+    (HTTPStatusError(404, '/x'), PERMANENT),
+    (HTTPStatusError(429, '/x'), TRANSIENT),
+    (HTTPStatusError(503, '/x'), TRANSIENT),
+    (json.JSONDecodeError("Expecting value", "<html>", 0), STRUCTURE),
+    (PageStructureError("no button"), STRUCTURE),
+    (PermanentError("gone"), PERMANENT),
+    (TimeoutError(), TRANSIENT),
+])
+def test_classify_failure(error, kind):
+    assert classify_failure(error) == kind
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure(TRANSIENT)
+    assert breaker.state == 'closed' and breaker.admit() == 0
+    breaker.record_failure(TRANSIENT)
+    assert breaker.state == 'open'
+    clock.now += 10
+    assert breaker.admit() == pytest.approx(20)
+
+
+def test_non_transient_failures_keep_breaker_closed(clock):
+    breaker = CircuitBreaker(threshold=2)
+    for kind in (TRANSIENT, STRUCTURE, TRANSIENT, PERMANENT, TRANSIENT):
+        breaker.record_failure(kind)
+    assert breaker.state == 'closed'
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure(TRANSIENT)
+    clock.now += 30
+    assert breaker.admit() == 0
+    assert breaker.state == 'half_open'
+    # Only one probe at a time
+    assert breaker.admit() == BREAKER_POLL
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.admit() == 0
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure(TRANSIENT)
+    clock.now += 30
+    assert breaker.admit() == 0
+    breaker.record_failure(TRANSIENT)
+    assert breaker.state == 'open' and breaker.stats['opened'] == 2
+    assert breaker.admit() == pytest.approx(30)
+
+
+def test_retry_attempts_by_kind():
+    policy = RetryPolicy(max_attempts=3, structure_attempts=2)
+    assert not policy.should_retry(PERMANENT, 1)
+    assert policy.should_retry(STRUCTURE, 1) and not policy.should_retry(STRUCTURE, 2)
+    assert policy.should_retry(TRANSIENT, 2) and not policy.should_retry(TRANSIENT, 3)
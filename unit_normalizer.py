@@ -0,0 +1,204 @@
+"""Vectorized normalization of formatted amounts to SI base units.
+
+    python unit_normalizer.py ord_formatted_data.json                  # rewrites the file in place
+    python unit_normalizer.py ord_formatted_data.jsonl --output ord_si.jsonl
+
+Every component amount and product measurement mass is gathered into one
+NumPy value array plus one unit-code array, scaled with a single factor-table
+lookup, and written back next to the original as 'si_value' / 'si_units':
+
+    {'value': 2.5, 'units': 'MILLIMOLE', 'si_value': 0.0025, 'si_units': 'MOLE'}
+
+Moles stay in MOLE, volumes go to CUBIC_METER and masses to KILOGRAM.
+Unspecified or unknown units give a null si_value.
+"""
+import argparse
+import json
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("SI unit normalization needs numpy: pip install numpy") from e
+
+from delta_sync import load_existing_output
+from reaction_formatter import UNIT_MAPPINGS, FLAVOURS
+
+# --- CONFIGURATION ---
+BATCH_SIZE = 1000   # reactions normalized per vectorized pass when streaming
+
+# --- SI FACTORS ---
+SI_UNITS = {'moles': 'MOLE', 'volume': 'CUBIC_METER', 'mass': 'KILOGRAM'}
+UNIT_FACTORS = {
+    'moles': {'MOLE': 1.0, 'MILLIMOLE': 1e-3, 'MICROMOLE': 1e-6, 'NANOMOLE': 1e-9},
+    'volume': {'LITER': 1e-3, 'MILLILITER': 1e-6, 'MICROLITER': 1e-9, 'NANOLITER': 1e-12},
+    'mass': {'KILOGRAM': 1.0, 'GRAM': 1e-3, 'MILLIGRAM': 1e-6, 'MICROGRAM': 1e-9},
+}
+
+# One code per (kind, label), plus the raw unit enums of each kind, share one factor table.
+# Code 0 is "no factor" (UNSPECIFIED / UNKNOWN / unseen labels) and scales to NaN.
+_codes = {}
+_factors = [np.nan]
+for _kind, _labels in UNIT_FACTORS.items():
+    for _label, _factor in _labels.items():
+        _codes[(_kind, _label)] = len(_factors)
+        _factors.append(_factor)
+FACTOR_TABLE = np.array(_factors, dtype=np.float64)
+LABEL_CODES = _codes
+# {kind: {unit enum: code}} for raw records, where the enum is the truth
+ENUM_CODES = {kind: {num: LABEL_CODES.get((kind, label), 0) for num, label in mapping.items()}
+              for kind, mapping in UNIT_MAPPINGS.items()}
+_KIND_OF_CODE = {code: kind for (kind, _), code in LABEL_CODES.items()}
+SI_UNIT_OF_CODE = [None] + [SI_UNITS[_KIND_OF_CODE[code]] for code in range(1, len(FACTOR_TABLE))]
+
+
+def to_si(values, codes):
+    """values * factor[codes] in one vectorized step (NaN where the unit has no factor)"""
+    return np.asarray(values, dtype=np.float64) * FACTOR_TABLE[np.asarray(codes, dtype=np.intp)]
+
+
+# --- GATHER / SCATTER ---
+
+def _quantities(formatted):
+    """Yield (kind, quantity dict) for every amount and measurement mass in one formatted reaction"""
+    for _, tab in formatted.get('inputsMap', ()):
+        for component in tab.get('components', ()):
+            for kind, quantity in (component.get('amount') or {}).items():
+                yield kind, quantity
+    for product in formatted.get('outcomes', ()):
+        for kind, quantity in (product.get('amount') or {}).items():
+            yield kind, quantity
+        for measurement in product.get('measurements', ()):
+            if 'mass' in measurement:
+                yield 'mass', measurement['mass']
+
+
+def _raw_codes(raw, spec):
+    """Unit codes from a raw record's enums, in the same order _quantities walks the formatted reaction.
+
+    Only needed when the formatted labels can't be trusted (the smiles flavour
+    labels every amount MOLE/LITER whatever the enum says). ``spec`` is the
+    formatter spec that produced the formatted reaction.
+    """
+    kinds = spec['amount_kinds']
+    for input_entry in raw.get('inputsMap', ()):
+        for component in input_entry[1].get('componentsList', ()):
+            amount = component.get('amount')
+            # The formatter keeps only the first amount kind present
+            for kind in (kinds if amount else ()):
+                if kind in amount:
+                    yield ENUM_CODES[kind].get(amount[kind].get('units', 0), 0)
+                    break
+    if not spec['measurements']:
+        return
+    for outcome in raw.get('outcomesList', ()):
+        for product in outcome.get('productsList', ()):
+            for measurement in product.get('measurementsList', ()):
+                amount = measurement.get('amount')
+                if amount is not None and 'mass' in amount:
+                    yield ENUM_CODES['mass'].get(amount['mass'].get('units', 0), 0)
+
+
+def gather_amounts(reactions, raw_records=None, spec='full'):
+    """(quantity dicts, values array, unit-code array) over every amount in ``reactions``.
+
+    With ``raw_records`` (aligned with ``reactions``) unit codes come from the
+    raw unit enums instead of the formatted labels; ``spec`` is the formatter
+    spec or flavour name the reactions were formatted with.
+    """
+    quantities, values, labels = [], [], []
+    for formatted in reactions:
+        for kind, quantity in _quantities(formatted):
+            quantities.append(quantity)
+            values.append(quantity.get('value'))
+            labels.append((kind, quantity.get('units')))
+    values = np.array(values, dtype=np.float64)   # None -> NaN
+    if raw_records is None:
+        codes_get = LABEL_CODES.get
+        codes = np.fromiter((codes_get(label, 0) for label in labels), dtype=np.intp, count=len(labels))
+    else:
+        if isinstance(spec, str):
+            spec = FLAVOURS[spec]
+        codes = np.fromiter((code for raw in raw_records for code in _raw_codes(raw, spec)), dtype=np.intp)
+        if len(codes) != len(quantities):
+            raise ValueError(f"Raw records hold {len(codes)} amounts but the formatted reactions hold {len(quantities)}")
+    return quantities, values, codes
+
+
+def normalize_reactions(reactions, raw_records=None, spec='full'):
+    """Attach si_value/si_units to every amount of every formatted reaction; returns the amount count"""
+    reactions = list(reactions)
+    quantities, values, codes = gather_amounts(reactions, raw_records, spec)
+    si_values = to_si(values, codes)
+    si_values = np.where(np.isnan(si_values), None, si_values).tolist() if len(si_values) else []
+    si_units = SI_UNIT_OF_CODE
+    for quantity, si_value, code in zip(quantities, si_values, codes.tolist()):
+        quantity['si_value'] = si_value
+        quantity['si_units'] = si_units[code]
+    return len(quantities)
+
+
+class NormalizingWriter:
+    """Batch formatted reactions through normalize_reactions on their way to other writers.
+
+    Takes the write(dataset_id, formatted) calls meant for ``streams`` (JSONLWriter,
+    ColumnarWriter, ...). Reactions are held until ``batch_size`` have arrived. Then
+    one vectorized pass normalizes them in place and they go on in arrival order.
+    flush() must run before the streams are closed.
+    """
+
+    def __init__(self, streams, batch_size=BATCH_SIZE):
+        self.streams = streams
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def write(self, dataset_id, formatted):
+        with self._lock:
+            self._pending.append((dataset_id, formatted))
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        normalize_reactions(formatted for _, formatted in batch)
+        for dataset_id, formatted in batch:
+            for stream in self.streams:
+                stream.write(dataset_id, formatted)
+
+
+def normalize_formatted_output(formatted_output):
+    """normalize_reactions over an ord_formatted_data.json-shaped dict, in place"""
+    return normalize_reactions(r for dataset in formatted_output.values() for r in dataset.get('reactions', []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add SI-normalized amounts to a formatted ORD output")
+    parser.add_argument('input', help="ord_formatted_data.json or a .jsonl output")
+    parser.add_argument('--output', default=None, help="Where to write (default: overwrite the input)")
+    args = parser.parse_args()
+
+    formatted_output = load_existing_output(args.input)
+    started = time.perf_counter()
+    count = normalize_formatted_output(formatted_output)
+    elapsed = time.perf_counter() - started
+    output_file = args.output or args.input
+    with open(output_file, 'w', encoding='utf-8') as f:
+        if output_file.endswith('.jsonl'):
+            for dataset_id, dataset in formatted_output.items():
+                for reaction in dataset['reactions']:
+                    f.write(json.dumps({'dataset_id': dataset_id, **reaction}, ensure_ascii=False) + '\n')
+        else:
+            json.dump(formatted_output, f, indent=2, ensure_ascii=False)
+    print(f"✓ Normalized {count} amounts in {elapsed * 1000:.1f} ms -> {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# --- CONFIGURATION ---
+POLL_FREQUENCY = 0.1   # seconds between condition checks
+SETTLE_TIMEOUT = 5     # upper bound for "did the table refresh?" waits (the old fixed sleep)
+
+
+class WaitStats:
+    """Thread-safe record of how long each named wait actually took"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits = {}
+
+    def record(self, name, seconds, timed_out=False):
+        with self._lock:
+            entry = self._waits.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'timeouts': 0})
+            entry['count'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            if timed_out:
+                entry['timeouts'] += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                name: dict(entry, avg=entry['total'] / entry['count'])
+                for name, entry in self._waits.items()
+            }
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\nWait timings (seconds):")
+        for name, entry in sorted(summary.items()):
+            print(f"  {name:<24} n={entry['count']:<6} avg={entry['avg']:.3f} max={entry['max']:.3f} timeouts={entry['timeouts']}")
+
+
+wait_stats = WaitStats()
+
+
+def timed_wait(driver, name, condition, timeout, poll=POLL_FREQUENCY, raise_on_timeout=True):
+    """WebDriverWait.until() that records its real duration under ``name``.
+
+    With raise_on_timeout=False a timeout returns None instead of raising, which
+    makes the wait behave like the fixed sleep it replaces in the worst case.
+    """
+    started = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        wait_stats.record(name, time.perf_counter() - started, timed_out=True)
+        if raise_on_timeout:
+            raise
+        return None
+    wait_stats.record(name, time.perf_counter() - started)
+    return result
+
+
+# --- CONDITIONS ---
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+def page_loaded(driver):
+    """document_ready that answers False instead of raising when the page can't be asked"""
+    try:
+        return document_ready(driver)
+    except Exception:
+        return False
+
+
+def json_in_element(locator):
+    """Condition: the located element holds parseable JSON; returns the parsed object"""
+    def condition(driver):
+        try:
+            text = driver.find_element(*locator).text
+        except StaleElementReferenceException:
+            return False
+        if not text or not text.strip().startswith('{'):
+            return False
+        try:
+            return json.loads(text)
+        except ValueError:
+            return False
+    return condition
+
+
+def element_count_changed(locator, old_count):
+    """Condition: the number of matching elements differs from old_count"""
+    def condition(driver):
+        count = len(driver.find_elements(*locator))
+        return count if count != old_count else False
+    return condition
+
+
+def first_href_changed(locator, old_href):
+    """Condition: the first matching link points somewhere new (page has turned)"""
+    def condition(driver):
+        try:
+            links = driver.find_elements(*locator)
+            href = links[0].get_attribute('href') if links else None
+        except StaleElementReferenceException:
+            return False
+        return href if href and href != old_href else False
+    return condition
+
+
+# --- HELPERS ---
+
+def select_and_wait_for_rows(driver, select, value, row_locator, name="rows_after_select"):
+    """Select a page-size option and return once the row count changes"""
+    old_count = len(driver.find_elements(*row_locator))
+    select.select_by_value(value)
+    return timed_wait(driver, name, element_count_changed(row_locator, old_count),
+                      SETTLE_TIMEOUT, raise_on_timeout=False)
+
+
+def click_and_wait_for_page_turn(driver, button, link_locator, name="page_turn"):
+    """Click a pagination control and return once the first row link changes"""
+    links = driver.find_elements(*link_locator)
+    old_href = links[0].get_attribute('href') if links else None
+    driver.execute_script("arguments[0].click();", button)
+    return timed_wait(driver, name, first_href_changed(link_locator, old_href),
+                      SETTLE_TIMEOUT, raise_on_timeout=False)
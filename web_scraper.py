@@ -4,21 +4,24 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.webdriver.support.ui import Select
+from selenium.common.exceptions import TimeoutException
+from waits import (timed_wait, document_ready, json_in_element, select_and_wait_for_rows,
+                   wait_stats, SETTLE_TIMEOUT)
+from reaction_formatter import formatter_for
+from page_state import page_state_reader
+from link_harvest import harvest_ids, DATASET_LINK_CSS, REACTION_LINK_CSS
+from retry_policy import retry_policy, classify_failure, failed_result, PermanentError, PageStructureError
+from log_setup import get_logger, setup_logging, stop_logging, progress
+import argparse
 import json
 import time
-REACTION_ROLE_MAPPING = {
-    0: "UNSPECIFIED",
-    1: "REACTANT",
-    2: "REAGENT", 
-    3: "SOLVENT",
-    4: "CATALYST",
-    5: "WORKUP",
-    6: "INTERNAL_STANDARD",
-    7: "AUTHENTIC_STANDARD",
-    8: "PRODUCT",
-    9: "BYPRODUCT",
-    10: "SIDE_PRODUCT"
-}
+
+POLITENESS_DELAY = 0  # optional pause between reactions, in seconds
+log = get_logger('scraper')
+
+# SMILES-only output with moles/volume amounts (see reaction_formatter.SMILES_ONLY)
+format_reaction_data = formatter_for('smiles')
+
 def get_all_dataset_ids():
     """First pass: Get all dataset IDs from the browse page"""
     driver = get_driver()
@@ -26,16 +29,9 @@ def get_all_dataset_ids():
         driver.get("https://open-reaction-database.org/browse")
         wait = WebDriverWait(driver, 10)
         
-        dataset_links = wait.until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/dataset/ord_dataset-']"))
-        )
-        print(f"Found {len(dataset_links)} dataset links.")
-        
-        dataset_ids = []
-        for link in dataset_links:
-            href = link.get_attribute('href')
-            dataset_id = href.split('/')[-1]
-            dataset_ids.append(dataset_id)
+        wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, DATASET_LINK_CSS)))
+        dataset_ids = harvest_ids(driver, DATASET_LINK_CSS)
+        log.info("Found %d dataset links.", len(dataset_ids))
         
         return dataset_ids
         
@@ -50,11 +46,11 @@ def get_all_reaction_ids_from_dataset(driver, dataset_id):
         
         # Wait for page to load completely
         wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        time.sleep(2)
+        timed_wait(driver, "document_ready", document_ready, 15)
         
         # SELECT THE 100 OPTION FROM THE DROPDOWN (more reliable method)
         try:
-            print(f"  Selecting 100 entries per page...")
+            log.debug("  Selecting 100 entries per page...")
             
             # Find the select element
             select_element = wait.until(
@@ -63,66 +59,48 @@ def get_all_reaction_ids_from_dataset(driver, dataset_id):
             
             # Use Select class to interact with dropdown
             select = Select(select_element)
-            select.select_by_value('100')
-            
-            print(f"  Selected 100 entries, waiting for page to refresh...")
-            time.sleep(3)  # Wait for page to reload with all 100 entries
+            log.debug("  Selected 100 entries, waiting for page to refresh...")
+            # Returns as soon as the row count changes after the selection
+            select_and_wait_for_rows(driver, select, '100', (By.CSS_SELECTOR, REACTION_LINK_CSS))
             
         except Exception as e:
-            print(f"  Warning: Could not select 100 entries: {e}")
-            print(f"  Continuing with default pagination...")
-        
-        # Find reaction links (now should get all 100)
-        selectors = [
-            "a[href*='/id/ord-']",
-            "//a[contains(@href, '/id/ord-')]",
-        ]
-        
-        reaction_links = []
-        for selector in selectors:
-            try:
-                if selector.startswith('//'):
-                    links = driver.find_elements(By.XPATH, selector)
-                else:
-                    links = driver.find_elements(By.CSS_SELECTOR, selector)
-                
-                if links:
-                    reaction_links = links
-                    print(f"Found {len(reaction_links)} reactions using: {selector}")
-                    break
-            except:
-                continue
+            log.warning("  Warning: Could not select 100 entries: %s", e)
+            log.warning("  Continuing with default pagination...")
         
-        reaction_ids = []
-        for link in reaction_links:
-            href = link.get_attribute('href')
-            if href:
-                reaction_id = href.split('/')[-1]
-                if reaction_id.startswith('ord-') and reaction_id not in reaction_ids:
-                    reaction_ids.append(reaction_id)
+        # Read every reaction link on the page in one round trip (now should get all 100)
+        reaction_ids = harvest_ids(driver, REACTION_LINK_CSS, prefix='ord-')
         
-        print(f"Found {len(reaction_ids)} reactions in dataset {dataset_id}")
+        log.info("Found %d reactions in dataset %s", len(reaction_ids), dataset_id)
         return reaction_ids
         
     except Exception as e:
-        print(f"Error getting reactions from {dataset_id}: {e}")
+        log.error("Error getting reactions from %s: %s", dataset_id, e)
         return []
     
 
-def scrape_reaction_data(driver, reaction_id, max_retries=3):
-    """Scrape the JSON data from a single reaction page with retries"""
-    for attempt in range(max_retries):
+def scrape_reaction_data(driver, reaction_id, max_retries=None):
+    """Scrape the JSON data from a single reaction page with retries (see retry_policy)"""
+    attempts = 0
+    while True:
+        retry_policy.breaker.wait()
         try:
-            print(f"  Loading {reaction_id}...")
+            log.debug("  Loading %s...", reaction_id)
             driver.get(f"https://open-reaction-database.org/id/{reaction_id}")
-            # Wait for page to be interactive
-            WebDriverWait(driver, 15).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-            # Wait a bit more for content to load
-            time.sleep(2)
+            # Wait for page to be interactive; the button waits below cover late content
+            timed_wait(driver, "document_ready", document_ready, 15)
+            # Read the already-loaded record out of page state; the modal is the fallback
+            record_button = (By.XPATH, "//div[contains(@class, 'full-record') or contains(text(), 'View Full Record')]")
+            reaction_data = page_state_reader.read(driver, reaction_id, record_button)
+            if reaction_data is not None:
+                log.debug("✓ Successfully scraped from page state: %s", reaction_id)
+                retry_policy.breaker.record_success()
+                return {
+                    'reaction_id': reaction_id,
+                    'data': reaction_data,
+                    'success': True
+                }
             # STEP 1: Find and click the "View Full Record" button
-            print(f"    Looking for 'View Full Record' button...")
+            log.debug("    Looking for 'View Full Record' button...")
             # Try multiple selectors for the button
             button_selectors = [
                 "div.full-record.button",
@@ -143,19 +121,18 @@ def scrape_reaction_data(driver, reaction_id, max_retries=3):
                         )
                     
                     if button:
-                        print(f"    Found button using: {selector}")
+                        log.debug("    Found button using: %s", selector)
                         break
                 except:
                     continue
             
             if not button:
-                raise Exception("Could not find 'View Full Record' button")
+                raise PageStructureError("Could not find 'View Full Record' button")
             # Click the button to open the modal
-            print("    Clicking 'View Full Record' button...")
+            log.debug("    Clicking 'View Full Record' button...")
             driver.execute_script("arguments[0].click();", button)
-            time.sleep(2)  # Wait for modal to open
             # STEP 2: Wait for the modal to appear and find the JSON data
-            print("    Looking for JSON data in modal...")
+            log.debug("    Looking for JSON data in modal...")
             # Wait for modal to be visible
             modal_selectors = [
                 "div.modal-container",
@@ -175,13 +152,13 @@ def scrape_reaction_data(driver, reaction_id, max_retries=3):
                         )
                     
                     if modal:
-                        print(f"    Modal found using: {selector}")
+                        log.debug("    Modal found using: %s", selector)
                         break
                 except:
                     continue
             
             if not modal:
-                raise Exception("Modal did not appear after clicking button")
+                raise PageStructureError("Modal did not appear after clicking button")
             # STEP 3: Find the JSON data inside the modal
             json_selectors = [
                 "div.data pre",
@@ -189,82 +166,63 @@ def scrape_reaction_data(driver, reaction_id, max_retries=3):
                 "pre",
                 "//pre[contains(text(), 'reactionId')]",
             ]
-            data_element = None
+            data_locator = None
             for selector in json_selectors:
+                locator = (By.XPATH, selector) if selector.startswith('//') else (By.CSS_SELECTOR, selector)
                 try:
-                    if selector.startswith('//'):
-                        data_element = WebDriverWait(driver, 8).until(
-                            EC.presence_of_element_located((By.XPATH, selector))
-                        )
-                    else:
-                        data_element = WebDriverWait(driver, 8).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                        )
-                    
-                    if data_element:
-                        print(f"    Found JSON data using: {selector}")
-                        break
+                    timed_wait(driver, "modal_pre_present", EC.presence_of_element_located(locator), 8)
+                    data_locator = locator
+                    log.debug("    Found JSON data using: %s", selector)
+                    break
                 except:
                     continue
             
-            if not data_element:
-                raise Exception("No JSON element found in modal")
-            # Get the text and validate
-            json_text = data_element.text
-            if not json_text or json_text.strip() == "":
-                raise Exception("Empty JSON data")
-            if not json_text.strip().startswith('{'):
-                raise Exception("Data doesn't look like JSON")
-            reaction_data = json.loads(json_text)
+            if not data_locator:
+                raise PageStructureError("No JSON element found in modal")
+            # Returns as soon as the <pre> holds parseable JSON
+            try:
+                reaction_data = timed_wait(driver, "modal_json_parseable", json_in_element(data_locator), SETTLE_TIMEOUT)
+            except TimeoutException:
+                raise PageStructureError("Data doesn't look like JSON")
             if reaction_data.get('reactionId') != reaction_id:
-                raise Exception(f"Reaction ID mismatch: expected {reaction_id}, got {reaction_data.get('reactionId')}")
+                raise PermanentError(f"Reaction ID mismatch: expected {reaction_id}, got {reaction_data.get('reactionId')}")
             try:
                 close_button = driver.find_element(By.CSS_SELECTOR, "div.close, .close, [class*='close']")
                 driver.execute_script("arguments[0].click();", close_button)
-                time.sleep(0.5)
             except:
                 pass
-            print(f"✓ Successfully scraped: {reaction_id}")
+            log.debug("✓ Successfully scraped: %s", reaction_id)
+            retry_policy.breaker.record_success()
             return {
                 'reaction_id': reaction_id,
                 'data': reaction_data,
                 'success': True
             }
             
-        except json.JSONDecodeError as e:
-            print(f"⚠ JSON parse error for {reaction_id} (attempt {attempt+1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(3)
-                continue
-                
         except Exception as e:
-            print(f"⚠ Error scraping {reaction_id} (attempt {attempt+1}/{max_retries}): {str(e)[:100]}")
-            if attempt < max_retries - 1:
-                time.sleep(3)
-                continue
+            attempts += 1
+            last_error, kind = e, classify_failure(e)
+            retry_policy.breaker.record_failure(kind)
+            log.warning("⚠ %s error scraping %s (attempt %d): %.100s", kind, reaction_id, attempts, e)
+            if not retry_policy.should_retry(kind, attempts, max_retries):
+                break
+            time.sleep(retry_policy.backoff(attempts))
     
     # All retries failed
-    print(f"✗ Failed to scrape {reaction_id} after {max_retries} attempts")
-    return {
-        'reaction_id': reaction_id,
-        'data': None,
-        'success': False,
-        'error': 'Max retries exceeded'
-    }
+    log.error("✗ Failed to scrape %s after %d attempts (%s)", reaction_id, attempts, kind)
+    return failed_result(reaction_id, last_error, kind, attempts)
 
 def scrape_single_dataset(dataset_id):
     """Scrape all reactions from a single dataset"""
     driver = get_driver()
     try:
-        print(f"\n{'='*60}")
-        print(f"Processing dataset: {dataset_id}")
-        print(f"{'='*60}")
+        log.info("Processing dataset: %s", dataset_id)
         
         # Step 1: Get all reaction IDs in this dataset
         reaction_ids = get_all_reaction_ids_from_dataset(driver, dataset_id)
         
         if not reaction_ids:
-            print(f"No reactions found in dataset {dataset_id}")
+            log.warning("No reactions found in dataset %s", dataset_id)
             return {
                 'dataset_id': dataset_id,
                 'reactions': [],
@@ -274,10 +232,13 @@ def scrape_single_dataset(dataset_id):
             }
         
         # Step 2: Scrape each reaction
+        progress.add_total(len(reaction_ids))
         reactions_data = []
         for i, reaction_id in enumerate(reaction_ids, 1):
-            print(f"  [{i}/{len(reaction_ids)}] Scraping {reaction_id}...")
+            progress.set_state(reaction_id)
+            log.debug("  [%d/%d] Scraping %s...", i, len(reaction_ids), reaction_id)
             result = scrape_reaction_data(driver, reaction_id)
+            progress.advance(result['success'])
             
             # Format the reaction data
             if result['success']:
@@ -285,10 +246,11 @@ def scrape_single_dataset(dataset_id):
                 result['formatted_data'] = formatted_data
             
             reactions_data.append(result)
-            time.sleep(1)  # Be polite to the server
+            if POLITENESS_DELAY:
+                time.sleep(POLITENESS_DELAY)  # Be polite to the server
         
         successful = sum(1 for r in reactions_data if r['success'])
-        print(f"\n✓ Dataset {dataset_id} complete: {successful}/{len(reactions_data)} reactions scraped")
+        log.info("✓ Dataset %s complete: %d/%d reactions scraped", dataset_id, successful, len(reactions_data))
         
         return {
             'dataset_id': dataset_id,
@@ -298,7 +260,7 @@ def scrape_single_dataset(dataset_id):
         }
         
     except Exception as e:
-        print(f"✗ Error with dataset {dataset_id}: {e}")
+        log.error("✗ Error with dataset %s: %s", dataset_id, e)
         return {
             'dataset_id': dataset_id,
             'reactions': [],
@@ -307,28 +269,27 @@ def scrape_single_dataset(dataset_id):
             'error': str(e)
         }
     finally:
+        progress.set_state('idle')
         driver.quit()
 def scrape_all_datasets_sequential():
     """Scrape all datasets sequentially for better reliability"""
     
-    print("="*60)
-    print("STARTING WEB SCRAPING")
-    print("="*60)
+    log.info("="*60 + "\nSTARTING WEB SCRAPING\n" + "="*60)
     
     # Step 1: Get all dataset IDs
-    print("\nStep 1: Getting all dataset IDs...")
+    log.info("Step 1: Getting all dataset IDs...")
     dataset_ids = get_all_dataset_ids()
-    print(f"Found {len(dataset_ids)} datasets to scrape\n")
+    log.info("Found %d datasets to scrape", len(dataset_ids))
     
     # Limit to first few datasets for testing
     dataset_ids = dataset_ids[:2]  # Start with just 1 datasets
     
     # Step 2: Scrape each dataset sequentially
-    print(f"Step 2: Scraping datasets sequentially...\n")
+    log.info("Step 2: Scraping datasets sequentially...")
     all_results = []
     
     for i, dataset_id in enumerate(dataset_ids, 1):
-        print(f"\nProcessing dataset {i}/{len(dataset_ids)}: {dataset_id}")
+        log.info("Processing dataset %d/%d: %s", i, len(dataset_ids), dataset_id)
         result = scrape_single_dataset(dataset_id)
         all_results.append(result)
     
@@ -336,40 +297,35 @@ def scrape_all_datasets_sequential():
     total_reactions = sum(r['total_reactions'] for r in all_results)
     total_successful = sum(r['successful_scrapes'] for r in all_results)
     
-    print(f"\n{'='*60}")
-    print(f"SCRAPING COMPLETE!")
-    print(f"{'='*60}")
-    print(f"Datasets processed: {len(all_results)}")
-    print(f"Total reactions found: {total_reactions}")
-    print(f"Successfully scraped: {total_successful}")
-    print(f"Failed: {total_reactions - total_successful}")
-    print(f"{'='*60}\n")
+    log.info("="*60 + "\nSCRAPING COMPLETE!\n" + "="*60)
+    log.info("Datasets processed: %d", len(all_results))
+    log.info("Total reactions found: %d", total_reactions)
+    log.info("Successfully scraped: %d", total_successful)
+    log.info("Failed: %d\n" + "="*60, total_reactions - total_successful)
     
     # Save results
     output_file = 'reaction_database_scrape.json'
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(all_results, f, indent=2, ensure_ascii=False)
-    print(f"✓ Results saved to {output_file}")
+    log.info("✓ Results saved to %s", output_file)
     
     return all_results
 
 def scrape_all_datasets_parallel(max_workers=3):
     """Scrape all datasets in parallel using threading"""
     
-    print("="*60)
-    print("STARTING WEB SCRAPING (PARALLEL)")
-    print("="*60)
+    log.info("="*60 + "\nSTARTING WEB SCRAPING (PARALLEL)\n" + "="*60)
     
     # Step 1: Get all dataset IDs
-    print("\nStep 1: Getting all dataset IDs...")
+    log.info("Step 1: Getting all dataset IDs...")
     dataset_ids = get_all_dataset_ids()
-    print(f"Found {len(dataset_ids)} datasets to scrape\n")
+    log.info("Found %d datasets to scrape", len(dataset_ids))
     
     # Limit to first few datasets for testing
     dataset_ids = dataset_ids[:1]  # Start with just 2 datasets
     
     # Step 2: Scrape datasets in parallel
-    print(f"Step 2: Scraping datasets in parallel (max_workers={max_workers})...\n")
+    log.info("Step 2: Scraping datasets in parallel (max_workers=%d)...", max_workers)
     all_results = []
     
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
@@ -385,9 +341,9 @@ def scrape_all_datasets_parallel(max_workers=3):
             try:
                 result = future.result()
                 all_results.append(result)
-                print(f"✓ Completed dataset {i}/{len(dataset_ids)}: {dataset_id}")
+                log.info("✓ Completed dataset %d/%d: %s", i, len(dataset_ids), dataset_id)
             except Exception as e:
-                print(f"✗ Failed dataset {dataset_id}: {e}")
+                log.error("✗ Failed dataset %s: %s", dataset_id, e)
                 all_results.append({
                     'dataset_id': dataset_id,
                     'error': str(e)
@@ -397,116 +353,32 @@ def scrape_all_datasets_parallel(max_workers=3):
     total_reactions = sum(r.get('total_reactions', 0) for r in all_results)
     total_successful = sum(r.get('successful_scrapes', 0) for r in all_results)
     
-    print(f"\n{'='*60}")
-    print(f"SCRAPING COMPLETE!")
-    print(f"{'='*60}")
-    print(f"Datasets processed: {len(all_results)}")
-    print(f"Total reactions found: {total_reactions}")
-    print(f"Successfully scraped: {total_successful}")
-    print(f"Failed: {total_reactions - total_successful}")
-    print(f"{'='*60}\n")
+    log.info("="*60 + "\nSCRAPING COMPLETE!\n" + "="*60)
+    log.info("Datasets processed: %d", len(all_results))
+    log.info("Total reactions found: %d", total_reactions)
+    log.info("Successfully scraped: %d", total_successful)
+    log.info("Failed: %d\n" + "="*60, total_reactions - total_successful)
     
     return all_results
-def format_reaction_data(reaction_data):
-    """Extract identifiers, amount, and reaction_role while preserving input map structure"""
-    if not reaction_data or 'data' not in reaction_data:
-        return None
-    
-    data = reaction_data['data']
-    formatted = {
-        'reaction_id': data.get('reactionId'),
-        'success': reaction_data['success'],
-        'inputsMap': []
-    }
-    
-    # Extract inputs while preserving the map structure
-    if 'inputsMap' in data:
-        for input_entry in data["inputsMap"]:
-            tab_name = input_entry[0]
-            input_data = input_entry[1]
-            
-            formatted_components = []
-            for component in input_data.get("componentsList", []):
-                # Get identifiers (SMILES)
-                identifiers = []
-                for identifier in component.get("identifiersList", []):
-                    if identifier.get("type") == 2:  # SMILES
-                        identifiers.append({
-                            "type": "SMILES",
-                            "value": identifier.get("value")
-                        })
-                
-                # Get amount (moles OR volume)
-                amount_data = {}
-                if 'amount' in component:
-                    if 'moles' in component['amount']:
-                        moles = component['amount']['moles']
-                        amount_data = {
-                            "moles": {
-                                "value": moles.get('value'),
-                                "units": "MOLE"
-                            }
-                        }
-                    elif 'volume' in component['amount']:
-                        volume = component['amount']['volume']
-                        amount_data = {
-                            "volume": {
-                                "value": volume.get('value'),
-                                "units": "LITER"
-                            }
-                        }
-                
-                # Get reaction role
-                reaction_role_value = component.get("reactionRole")
-                reaction_role = REACTION_ROLE_MAPPING.get(reaction_role_value, "UNKNOWN")
-                
-                component_info = {
-                    "identifiers": identifiers,
-                    "amount": amount_data,
-                    "reaction_role": reaction_role
-                }
-                formatted_components.append(component_info)
-            
-            # Preserve the tab name and its components
-            formatted_input = [
-                tab_name,
-                {
-                    "components": formatted_components
-                }
-            ]
-            formatted['inputsMap'].append(formatted_input)
-    
-    # Extract products from outcomes separately
-    formatted['outcomes'] = []
-    if 'outcomesList' in data:
-        for outcome in data['outcomesList']:
-            for product in outcome.get('productsList', []):
-                # Get identifiers (SMILES)
-                identifiers = []
-                for identifier in product.get('identifiersList', []):
-                    if identifier.get("type") == 2:  # SMILES
-                        identifiers.append({
-                            "type": "SMILES",
-                            "value": identifier.get("value")
-                        })
-                
-                # Products typically don't have amounts in the same way
-                amount_data = {}
-                
-                product_info = {
-                    "identifiers": identifiers,
-                    "amount": amount_data,
-                    "reaction_role": "PRODUCT",
-                    "is_desired_product": product.get('isDesiredProduct', False)
-                }
-                formatted['outcomes'].append(product_info)
-    
-    return formatted
-
+def parse_args():
+    parser = argparse.ArgumentParser(description="Open Reaction Database scraper (SMILES output)")
+    parser.add_argument('--si-units', action='store_true',
+                        help="Add si_value/si_units next to every amount in the output (needs numpy)")
+    return parser.parse_args()
 
 def main():
-    # results = scrape_all_datasets_sequential()
-    results = scrape_all_datasets_parallel(max_workers=3);
+    args = parse_args()
+    if args.si_units:
+        # numpy is only needed for --si-units
+        from unit_normalizer import normalize_reactions
+    setup_logging()
+    progress.start()
+    try:
+        # results = scrape_all_datasets_sequential()
+        results = scrape_all_datasets_parallel(max_workers=3);
+    finally:
+        progress.stop()
+        stop_logging()
     
     
     # Print some examples of the formatted data
@@ -561,6 +433,12 @@ def main():
             break
     output_file = 'ord_reaction_data.json'
     
+    if args.si_units:
+        # SI amounts come from the raw unit enums: the formatted labels are always MOLE/LITER
+        scraped = [r for dataset in results for r in dataset.get('reactions', [])
+                   if r.get('success') and r.get('formatted_data') and r.get('data')]
+        normalize_reactions([r['formatted_data'] for r in scraped], [r['data'] for r in scraped], 'smiles')
+    
     # Create the nested structure
     formatted_results = {}
     for dataset in results:
@@ -579,6 +457,8 @@ def main():
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(formatted_results, f, indent=2, ensure_ascii=False)
     print(f"✓ Formatted results saved to {output_file}")
+    wait_stats.print_summary()
+    print(f"Page state reads: {page_state_reader.stats}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,229 +2,83 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.webdriver.support.ui import Select
 from selenium.common.exceptions import TimeoutException
+from http_fetcher import HTTPRecordFetcher, DEFAULT_POOL_SIZE
+from driver_pool import DriverPool
+from scheduler import ReactionScheduler
+from async_crawler import run_async_crawl, DEFAULT_RATE, DEFAULT_BURST
+from checkpoint import ProgressStore, DEFAULT_CHECKPOINT_PATH
+from output_writer import JSONLWriter, DEFAULT_JSONL_PATH
+from raw_cache import RawRecordCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_MB
+from dataset_catalog import DatasetCatalog, DEFAULT_CATALOG_PATH, DEFAULT_MAX_AGE_HOURS, refresh_catalog
+from page_state import page_state_reader
+from metrics import metrics, DEFAULT_METRICS_PREFIX
+from log_setup import get_logger, setup_logging, stop_logging, progress
+from link_harvest import harvest_ids, DATASET_LINK_CSS, REACTION_LINK_CSS
+from retry_policy import (retry_policy, classify_failure, failed_result, PermanentError, PageStructureError,
+                          TRANSIENT, STRUCTURE)
+from concurrency import AIMDController, DEFAULT_MIN_WORKERS, DEFAULT_MAX_WORKERS
+from columnar_export import ColumnarWriter, COLUMNAR_FORMATS, DEFAULT_COLUMNAR_PREFIX
+from result_store import ResultStore, ResultWriter, DEFAULT_RESULT_STORE_PATH
+from compact_output import save_compact, DEFAULT_COMPACT_PATH
+from delta_sync import load_existing_output, known_reactions, datasets_to_sync, merge_results
+from reaction_formatter import formatter_for
+from waits import (timed_wait, document_ready, page_loaded, json_in_element, select_and_wait_for_rows,
+                   click_and_wait_for_page_turn, wait_stats, SETTLE_TIMEOUT)
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import json
+import os
 import time
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-
-def get_driver():
-    """Create a stable Chrome driver with optimized options"""
-    chrome_options = Options()
-    
-    # Optional: Run headless (no browser window)
-    # chrome_options.add_argument("--headless")
-    
-    # Stability and privacy options
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option('useAutomationExtension', False)
-    
-    # Disable cache for fresh data
-    chrome_options.add_argument("--disable-application-cache")
-    chrome_options.add_argument("--disk-cache-size=0")
-    
-    # Performance and stability settings
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-gpu")
-    
-    # Suppress logging
-    chrome_options.add_argument("--log-level=3")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    
-    # Download settings
-    chrome_options.add_experimental_option("prefs", {
-        "download.default_directory": "./downloads",
-        "download.prompt_for_download": False,
-        "download.directory_upgrade": True,
-        "safebrowsing.enabled": True
-    })
-    
-    # Create driver with webdriver-manager (auto-downloads chromedriver)
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=chrome_options
-    )
-    
-    # Set timeouts
-    driver.set_page_load_timeout(30)
-    driver.implicitly_wait(10)
-    
-    return driver
+import scraper_setup
+from scraper_setup import DRIVER_PROFILES
 
 # --- CONFIGURATION ---
 GLOBAL_TIMEOUT = 45 
+POLITENESS_DELAY = 0  # optional pause between reactions of one worker, in seconds
+BASE_URL = os.environ.get("ORD_BASE_URL", "https://open-reaction-database.org").rstrip('/')
+log = get_logger('scraper')
+DRIVER_PROFILE = scraper_setup.DEFAULT_PROFILE  # 'default' or 'lean', see scraper_setup.DRIVER_PROFILES
 
-REACTION_ROLE_MAPPING = {
-    0: "UNSPECIFIED", 1: "REACTANT", 2: "REAGENT", 3: "SOLVENT",
-    4: "CATALYST", 5: "WORKUP", 6: "INTERNAL_STANDARD",
-    7: "AUTHENTIC_STANDARD", 8: "PRODUCT", 9: "BYPRODUCT", 10: "SIDE_PRODUCT"
-}
-IDENTIFIER_TYPE_MAPPING = {
-    0: "UNSPECIFIED",
-    1: "CUSTOM",
-    2: "SMILES",
-    3: "INCHI",
-    4: "MOLBLOCK",
-    5: "FINGERPRINT",
-    6: "NAME",          
-    7: "IUPAC_NAME",    
-    8: "CAS_NUMBER"     
-}
-
-# --- FORMATTER FUNCTION (YOUR CODE) ---
-def format_reaction_data(reaction_data):
-    """Extract all identifiers types, amount, and reaction_role with CORRECT mappings."""
-    if not reaction_data or 'data' not in reaction_data:
-        return None
-    
-    data = reaction_data['data']
-    formatted = {
-        'reaction_id': data.get('reactionId'),
-        'success': reaction_data.get('success', True), # specific handle if success missing
-        'inputsMap': []
-    }
-
-    # --- MAPPINGS BASED ON ORD PROTOBUF DEFINITIONS ---
-    # Mass: 1=KG, 2=G, 3=MG, 4=UG
-    MASS_UNIT_MAPPING = { 0: "UNSPECIFIED", 1: "KILOGRAM", 2: "GRAM", 3: "MILLIGRAM", 4: "MICROGRAM" }
-    
-    # Volume: 1=L, 2=ML, 3=UL, 4=NL
-    VOLUME_UNIT_MAPPING = { 0: "UNSPECIFIED", 1: "LITER", 2: "MILLILITER", 3: "MICROLITER", 4: "NANOLITER" }
-    
-    # Moles: 1=MOL, 2=MMOL, 3=UMOL, 4=NMOL
-    MOLE_UNIT_MAPPING = { 0: "UNSPECIFIED", 1: "MOLE", 2: "MILLIMOLE", 3: "MICROMOLE", 4: "NANOMOLE" }
-
-    def extract_identifiers(item):
-        extracted_ids = []
-        for identifier in item.get("identifiersList", []):
-            type_int = identifier.get("type", 0)
-            type_str = IDENTIFIER_TYPE_MAPPING.get(type_int, "UNKNOWN")
-            extracted_ids.append({
-                "type": type_str,
-                "value": identifier.get("value")
-            })
-        return extracted_ids
-    if 'inputsMap' in data:
-        for input_entry in data["inputsMap"]:
-            tab_name = input_entry[0]
-            input_data = input_entry[1]
-            
-            formatted_components = []
-            for component in input_data.get("componentsList", []):
-                
-                identifiers = extract_identifiers(component)
-                
-                amount_data = {}
-                if 'amount' in component:
-                    amt = component['amount']
-                    
-                    if 'moles' in amt:
-                        val = amt['moles'].get('value')
-                        unit_id = amt['moles'].get('units', 0)
-                        amount_data = {
-                            "moles": { "value": val, "units": MOLE_UNIT_MAPPING.get(unit_id, "UNKNOWN") }
-                        }
-                    elif 'volume' in amt:
-                        val = amt['volume'].get('value')
-                        unit_id = amt['volume'].get('units', 0)
-                        amount_data = {
-                            "volume": { "value": val, "units": VOLUME_UNIT_MAPPING.get(unit_id, "UNKNOWN") }
-                        }
-                    elif 'mass' in amt:
-                        val = amt['mass'].get('value')
-                        unit_id = amt['mass'].get('units', 0)
-                        amount_data = {
-                            "mass": { "value": val, "units": MASS_UNIT_MAPPING.get(unit_id, "UNKNOWN") }
-                        }
-                
-                reaction_role_value = component.get("reactionRole")
-                reaction_role = REACTION_ROLE_MAPPING.get(reaction_role_value, "UNKNOWN")
-                
-                component_info = {
-                    "identifiers": identifiers,
-                    "amount": amount_data,
-                    "reaction_role": reaction_role
-                }
-                formatted_components.append(component_info)
-            
-            formatted_input = [ tab_name, { "components": formatted_components } ]
-            formatted['inputsMap'].append(formatted_input)
-    
-    formatted['outcomes'] = []
-    if 'outcomesList' in data:
-        for outcome in data['outcomesList']:
-            for product in outcome.get('productsList', []):
-                
-                identifiers = extract_identifiers(product)
-                
-                # --- FIXED MEASUREMENT LOGIC ---
-                # We need to map the measurements (Yield/Mass) similar to how we mapped inputs
-                formatted_measurements = []
-                for meas in product.get('measurementsList', []):
-                    # Check if it's a MASS measurement (Type 9 usually, but we check structure)
-                    meas_data = {"type": meas.get("type"), "details": meas.get("details")}
-                    
-                    # Extract amount if present in measurement
-                    if 'amount' in meas and 'mass' in meas['amount']:
-                         val = meas['amount']['mass'].get('value')
-                         unit_id = meas['amount']['mass'].get('units', 0)
-                         meas_data['mass'] = {
-                             "value": val,
-                             "units": MASS_UNIT_MAPPING.get(unit_id, "UNKNOWN")
-                         }
-                    formatted_measurements.append(meas_data)
-
-                product_info = {
-                    "identifiers": identifiers,
-                    "reaction_role": "PRODUCT",
-                    "is_desired_product": product.get('isDesiredProduct', False),
-                    "measurements": formatted_measurements
-                }
-                formatted['outcomes'].append(product_info)
-    
-    return formatted
+def get_driver():
+    """Chrome driver with the configured DRIVER_PROFILE"""
+    return scraper_setup.get_driver(DRIVER_PROFILE)
+
+# --- FORMATTER FUNCTION ---
+# All identifier types, amounts with their real unit labels, product measurements.
+# The extraction spec lives in reaction_formatter.
+format_reaction_data = formatter_for('full')
 
 # --- CORE SCRAPING FUNCTIONS ---
 
 def wait_for_page_load(driver, timeout=GLOBAL_TIMEOUT):
     """Robust wait for page to be fully loaded"""
     try:
-        WebDriverWait(driver, timeout).until(
-            lambda d: d.execute_script("return document.readyState") == "complete"
-        )
-        WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        time.sleep(1) 
+        timed_wait(driver, "document_ready", document_ready, timeout)
+        timed_wait(driver, "body_present", EC.presence_of_element_located((By.TAG_NAME, "body")), timeout)
     except TimeoutException:
-        print("  Warning: Page load timed out, but continuing...")
+        log.warning("  Warning: Page load timed out, but continuing...")
 
-def get_all_dataset_ids(start_index=None, end_index=None):
+def get_all_dataset_ids(start_index=None, end_index=None, pool=None):
     """Get dataset IDs with optimization to stop early"""
-    driver = get_driver()
+    driver = pool.acquire() if pool is not None else get_driver()
     try:
-        driver.get("https://open-reaction-database.org/browse")
+        driver.get(f"{BASE_URL}/browse")
         wait_for_page_load(driver)
         wait = WebDriverWait(driver, GLOBAL_TIMEOUT)
         
         try:
-            print(f"Selecting 100 datasets per page...")
+            log.debug("Selecting 100 datasets per page...")
             select_element = wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "select#pagination"))
             )
             select = Select(select_element)
-            select.select_by_value('100')
-            print(f"Waiting for table to refresh...")
-            time.sleep(5) 
+            log.debug("Waiting for table to refresh...")
+            select_and_wait_for_rows(driver, select, '100', (By.CSS_SELECTOR, DATASET_LINK_CSS))
         except Exception as e:
-            print(f"Warning: Could not select 100 entries: {e}")
+            log.warning("Warning: Could not select 100 entries: %s", e)
         
         # Calculate Total Pages
         total_pages = None
@@ -239,33 +93,28 @@ def get_all_dataset_ids(start_index=None, end_index=None):
                     end_index = total_entries
                 entries_per_page = 100
                 total_pages = (total_entries + entries_per_page - 1) // entries_per_page
-                print(f"Total entries available: {total_entries}")
+                log.info("Total entries available: %d", total_entries)
         except Exception as e:
-            print(f"Warning: Could not determine total pages: {e}")
+            log.warning("Warning: Could not determine total pages: %s", e)
         
-        all_dataset_ids = []
+        all_dataset_ids = {}  # ordered set
         page_num = 1
         stop_scraping = False 
         
         while True:
-            print(f"Scraping page {page_num}...")
+            log.debug("Scraping page %d...", page_num)
             try:
-                dataset_links = wait.until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, "a[href*='/dataset/ord_dataset-']"))
-                )
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, DATASET_LINK_CSS)))
+                page_ids = harvest_ids(driver, DATASET_LINK_CSS)
+                log.info("  Found %d dataset links on page %d", len(page_ids), page_num)
                 
-                print(f"  Found {len(dataset_links)} dataset links on page {page_num}")
-                
-                for link in dataset_links:
-                    href = link.get_attribute('href')
-                    dataset_id = href.split('/')[-1]
-                    if dataset_id not in all_dataset_ids:
-                        all_dataset_ids.append(dataset_id)
-                        if end_index is not None and len(all_dataset_ids) >= end_index:
-                            stop_scraping = True
-                            break
+                for dataset_id in page_ids:
+                    all_dataset_ids[dataset_id] = None
+                    if end_index is not None and len(all_dataset_ids) >= end_index:
+                        stop_scraping = True
+                        break
             except Exception as e:
-                print(f"  Error finding dataset links: {e}")
+                log.error("  Error finding dataset links: %s", e)
                 break
             
             if stop_scraping: break
@@ -274,19 +123,23 @@ def get_all_dataset_ids(start_index=None, end_index=None):
             try:
                 next_button = driver.find_element(By.CSS_SELECTOR, "div.next.paginav")
                 if "no-click" in next_button.get_attribute("class"): break
-                driver.execute_script("arguments[0].click();", next_button)
-                time.sleep(5) 
+                click_and_wait_for_page_turn(driver, next_button, (By.CSS_SELECTOR, DATASET_LINK_CSS))
                 page_num += 1
             except:
                 break
         
         start = (start_index - 1) if start_index is not None else 0
         if start < 0: start = 0
-        filtered_dataset_ids = all_dataset_ids[start:]
+        filtered_dataset_ids = list(all_dataset_ids)[start:]
+        if pool is not None:
+            pool.record_page(driver, page_num)
         return filtered_dataset_ids
         
     finally:
-        driver.quit()
+        if pool is not None:
+            pool.release(driver)
+        else:
+            driver.quit()
 
 def get_user_input():
     print("\n" + "="*60)
@@ -297,8 +150,10 @@ def get_user_input():
     print("3. Scrape UNIFORM range")
     print("4. Scrape CUSTOM ranges")
     print("5. Scrape SINGLE specific reaction (Target Mode)") 
+    print("6. ASYNC HTTP crawl (rate limited)")
+    print("7. SYNC new reactions into the existing output")
     
-    mode = input("\nEnter mode (1-5): ").strip()
+    mode = input("\nEnter mode (1-7): ").strip()
     
     if mode == "1":
         d_start = input("Start dataset index (1-based, Enter for 1): ").strip()
@@ -330,43 +185,88 @@ def get_user_input():
         if not d: return get_user_input()
         r = input("Enter Reaction Index (e.g., 1): ").strip() or "1"
         return {'mode': 'single_target', 'dataset_target': int(d), 'reaction_target': int(r), 'max_workers': 1}
+    elif mode == "6":
+        d_start = input("Start dataset index (1-based, Enter for 1): ").strip()
+        d_end = input("End dataset index (1-based, Enter for All): ").strip()
+        rate = input(f"Requests per second (Enter for {DEFAULT_RATE:g}): ").strip()
+        burst = input(f"Burst size (Enter for {DEFAULT_BURST}): ").strip()
+        rate = float(rate) if rate else DEFAULT_RATE
+        burst = int(burst) if burst else DEFAULT_BURST
+        if not rate > 0 or burst < 1:
+            print("Requests per second must be above 0 and burst size at least 1")
+            return get_user_input()
+        return {'mode': 'async', 'max_workers': 3, 'dataset_start': int(d_start) if d_start else None,
+                'dataset_end': int(d_end) if d_end else None, 'rate': rate, 'burst': burst}
+    elif mode == "7":
+        d_start = input("Start dataset index (1-based, Enter for 1): ").strip()
+        d_end = input("End dataset index (1-based, Enter for All): ").strip()
+        return {'mode': 'sync', 'max_workers': 3, 'dataset_start': int(d_start) if d_start else None,
+                'dataset_end': int(d_end) if d_end else None}
     else:
         return {'mode': 'all', 'max_workers': 3, 'dataset_start': None, 'dataset_end': None}
 
-def scrape_reaction_data(driver, reaction_id, max_retries=3):
-    """Scrape the JSON data from a single reaction page"""
-    for attempt in range(max_retries):
+def scrape_reaction_data(driver, reaction_id, max_retries=None, policy=retry_policy):
+    """Scrape the JSON data from a single reaction page.
+
+    Failures are classified (retry_policy.classify_failure) and retried with
+    jittered exponential backoff; permanent ones are not retried at all. The
+    result of a reaction that runs out of attempts carries 'failure' (its kind).
+    """
+    attempts = 0
+    while True:
+        metrics.count('attempts')
+        if attempts:
+            metrics.count('retries')
+        policy.breaker.wait()
         try:
-            print(f"  Loading {reaction_id}...")
-            driver.get(f"https://open-reaction-database.org/id/{reaction_id}")
-            wait_for_page_load(driver)
+            log.debug("  Loading %s...", reaction_id)
+            with metrics.stage('navigate'):
+                driver.get(f"{BASE_URL}/id/{reaction_id}")
+            with metrics.stage('ready'):
+                wait_for_page_load(driver)
             wait = WebDriverWait(driver, GLOBAL_TIMEOUT)
+            button_xpath = "//div[contains(text(), 'View Full Record')]"
+            
+            # Read the already-loaded record out of page state; the modal is the fallback
+            with metrics.stage('page_state'):
+                reaction_data = page_state_reader.read(driver, reaction_id, (By.XPATH, button_xpath))
+            if reaction_data is not None:
+                metrics.count('page_state_hits')
+                log.debug("✓ Scraped raw data from page state: %s", reaction_id)
+                policy.breaker.record_success()
+                return {'reaction_id': reaction_id, 'data': reaction_data, 'success': True}
             
             # Click Button
-            button_xpath = "//div[contains(text(), 'View Full Record')]"
             try:
-                button = wait.until(EC.element_to_be_clickable((By.XPATH, button_xpath)))
-                driver.execute_script("arguments[0].scrollIntoView(true);", button)
-                time.sleep(1) 
-                driver.execute_script("arguments[0].click();", button)
+                with metrics.stage('button'):
+                    button = wait.until(EC.element_to_be_clickable((By.XPATH, button_xpath)))
+                    driver.execute_script("arguments[0].scrollIntoView(true);", button)
+                    driver.execute_script("arguments[0].click();", button)
             except TimeoutException:
-                print(f"    Timeout waiting for button on {reaction_id}")
+                log.warning("    Timeout waiting for button on %s", reaction_id)
+                # A page that finished loading without the button has changed shape;
+                # one still loading is a slow site and stays transient
+                if page_loaded(driver):
+                    raise PageStructureError("Page loaded but has no 'View Full Record' button") from None
                 raise
 
             # Get JSON
-            print("    Waiting for JSON data...")
-            json_xpath = "//div[contains(@class, 'data')]//pre | //pre"
-            data_element = wait.until(EC.visibility_of_element_located((By.XPATH, json_xpath)))
-            
-            json_text = data_element.text
-            if not json_text or not json_text.strip().startswith('{'):
-                time.sleep(2)
-                json_text = data_element.text
-                
-            if not json_text.strip().startswith('{'):
-                raise Exception("Data element found but does not contain JSON")
-
-            reaction_data = json.loads(json_text)
+            log.debug("    Waiting for JSON data...")
+            json_locator = (By.XPATH, "//div[contains(@class, 'data')]//pre | //pre")
+            try:
+                with metrics.stage('modal'):
+                    timed_wait(driver, "modal_pre_visible", EC.visibility_of_element_located(json_locator), GLOBAL_TIMEOUT)
+            except TimeoutException:
+                if page_loaded(driver):
+                    raise PageStructureError("Record modal never showed its <pre> element") from None
+                raise
+            try:
+                with metrics.stage('json_read'):
+                    reaction_data = timed_wait(driver, "modal_json_parseable", json_in_element(json_locator), SETTLE_TIMEOUT)
+            except TimeoutException:
+                raise PageStructureError("Data element found but does not contain JSON")
+            if reaction_data.get('reactionId') != reaction_id:
+                raise PermanentError(f"Reaction ID mismatch: expected {reaction_id}, got {reaction_data.get('reactionId')}")
             
             # Close modal
             try:
@@ -374,178 +274,739 @@ def scrape_reaction_data(driver, reaction_id, max_retries=3):
                 driver.execute_script("arguments[0].click();", close_btn)
             except: pass
 
-            print(f"✓ Scraped raw data: {reaction_id}")
+            log.debug("✓ Scraped raw data: %s", reaction_id)
+            policy.breaker.record_success()
             return {'reaction_id': reaction_id, 'data': reaction_data, 'success': True}
             
         except Exception as e:
-            print(f"⚠ Error scraping {reaction_id} (attempt {attempt+1}): {str(e)[:100]}")
-            time.sleep(5)
-            continue
+            attempts += 1
+            last_error, kind = e, classify_failure(e)
+            metrics.count('errors')
+            metrics.count(f'{kind}_errors')
+            policy.breaker.record_failure(kind)
+            log.warning("⚠ %s error scraping %s (attempt %d): %.100s", kind, reaction_id, attempts, e)
+            if not policy.should_retry(kind, attempts, max_retries):
+                break
+            time.sleep(policy.backoff(attempts))
     
-    return {'reaction_id': reaction_id, 'data': None, 'success': False, 'error': 'Max retries exceeded'}
+    metrics.count('failures')
+    return failed_result(reaction_id, last_error, kind, attempts)
+
+REACTION_LINK_LOCATOR = (By.CSS_SELECTOR, REACTION_LINK_CSS)
 
-def get_all_reaction_ids_from_dataset(driver, dataset_id, start_index=None, end_index=None):
+def open_reaction_listing(driver, dataset_id, per_page='100'):
+    """Load a dataset page with ``per_page`` rows; returns the total reaction count (None if unknown)"""
+    driver.get(f"{BASE_URL}/dataset/{dataset_id}")
+    wait_for_page_load(driver)
+    wait = WebDriverWait(driver, GLOBAL_TIMEOUT)
+    
     try:
-        driver.get(f"https://open-reaction-database.org/dataset/{dataset_id}")
-        wait_for_page_load(driver)
-        wait = WebDriverWait(driver, GLOBAL_TIMEOUT)
-        
-        try:
-            target_value = '100'
-            if end_index is not None:
-                if end_index <= 10: target_value = '10'
-                elif end_index <= 25: target_value = '25'
-                elif end_index <= 50: target_value = '50'
-
-            if target_value != '10':
-                print(f"  Switching to {target_value} entries...")
-                select_element = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "select#pagination")))
-                from selenium.webdriver.support.ui import Select
-                select = Select(select_element)
-                if select.first_selected_option.get_attribute("value") != target_value:
-                    select.select_by_value(target_value)
-                    time.sleep(5) 
-        except Exception as e:
-            print(f"  Pagination warning: {e}")
+        if per_page != '10':
+            select = Select(wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "select#pagination"))))
+            if select.first_selected_option.get_attribute("value") != per_page:
+                select_and_wait_for_rows(driver, select, per_page, REACTION_LINK_LOCATOR)
+    except Exception as e:
+        log.warning("  Pagination warning: %s", e)
+    
+    try:
+        wait.until(EC.presence_of_element_located(REACTION_LINK_LOCATOR))
+    except TimeoutException:
+        return 0
+    
+    try:
+        import re
+        match = re.search(r'of (\d+) entries', driver.find_element(By.CSS_SELECTOR, "div.pagination div.select").text)
+        if match:
+            return int(match.group(1))
+    except Exception:
+        pass
+    return None
 
-        try:
-            wait.until(EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/id/ord-')]")))
-        except TimeoutException:
-            return []
+def read_reaction_links(driver):
+    """Reaction IDs linked from the current listing page, in order"""
+    return harvest_ids(driver, REACTION_LINK_CSS, prefix='ord-')
+
+def turn_reaction_page(driver):
+    """Click through to the next listing page; False on the last page"""
+    try:
+        next_button = driver.find_element(By.CSS_SELECTOR, "div.next.paginav")
+        if "no-click" in (next_button.get_attribute("class") or ""):
+            return False
+        click_and_wait_for_page_turn(driver, next_button, REACTION_LINK_LOCATOR)
+        return True
+    except Exception:
+        return False
+
+def read_reaction_pages(driver, first_page, last_page, current_page=1):
+    """Click from ``current_page`` to ``first_page`` without reading rows, then read through ``last_page``"""
+    page = current_page
+    while page < first_page:
+        if not turn_reaction_page(driver):
+            # Returning nothing here would mark the dataset complete with 0 reactions
+            raise RuntimeError(f"Could not turn to listing page {page + 1} on the way to page {first_page}")
+        page += 1
+    
+    reaction_ids = []
+    while True:
+        reaction_ids.extend(read_reaction_links(driver))
+        if last_page is not None and page >= last_page:
+            break
+        if not turn_reaction_page(driver):
+            break
+        page += 1
+    return reaction_ids
 
-        links = driver.find_elements(By.XPATH, "//a[contains(@href, '/id/ord-')]")
-        all_reaction_ids = []
-        for link in links:
-            href = link.get_attribute('href')
-            if href:
-                rid = href.split('/')[-1]
-                if rid.startswith('ord-') and rid not in all_reaction_ids:
-                    all_reaction_ids.append(rid)
+def get_all_reaction_ids_from_dataset(driver, dataset_id, start_index=None, end_index=None, pool=None,
+                                      controller=None):
+    """Reaction IDs start_index..end_index (1-based, inclusive) of a dataset, across every listing page.
+    
+    Pages before the one holding start_index are clicked past without being read. When
+    the page count is known and the pool has spare drivers, the page range is split into
+    contiguous blocks read concurrently, one driver per block. With an AIMDController
+    every extra driver also needs a free controller slot.
+    """
+    try:
+        per_page = '100'
+        if end_index is not None:
+            if end_index <= 10: per_page = '10'
+            elif end_index <= 25: per_page = '25'
+            elif end_index <= 50: per_page = '50'
+        page_size = int(per_page)
         
-        start = (start_index - 1) if start_index is not None else 0
-        end = end_index if end_index is not None else len(all_reaction_ids)
-        if start < 0: start = 0
-        if end > len(all_reaction_ids): end = len(all_reaction_ids)
+        total = open_reaction_listing(driver, dataset_id, per_page)
+        if total == 0:
+            return []
+        
+        start = max((start_index or 1) - 1, 0)
+        end = end_index
+        if total is not None:
+            end = total if end is None else min(end, total)
+        first_page = start // page_size + 1
+        last_page = (end + page_size - 1) // page_size if end is not None else None
+        
+        # Spare drivers for the pages past this driver's block
+        helpers = []
+        if pool is not None and last_page is not None:
+            while len(helpers) < last_page - first_page:
+                if controller is not None and not controller.try_acquire():
+                    break
+                helper = pool.try_acquire()
+                if helper is None:
+                    if controller is not None:
+                        controller.release()
+                    break
+                helpers.append(helper)
         
-        return all_reaction_ids[start:end]
+        if not helpers:
+            reaction_ids = read_reaction_pages(driver, first_page, last_page)
+        else:
+            pages = list(range(first_page, last_page + 1))
+            block = (len(pages) + len(helpers)) // (len(helpers) + 1)
+            blocks = [pages[k:k + block] for k in range(0, len(pages), block)]
+            log.info("  Reading %d listing pages of %s with %d drivers...", len(pages), dataset_id, len(blocks))
+            
+            def read_block(helper, pages_in_block):
+                try:
+                    open_reaction_listing(helper, dataset_id, per_page)
+                    return read_reaction_pages(helper, pages_in_block[0], pages_in_block[-1])
+                finally:
+                    pool.record_page(helper, pages_in_block[-1])
+            
+            try:
+                with ThreadPoolExecutor(max_workers=len(helpers)) as executor:
+                    futures = [executor.submit(read_block, helper, b) for helper, b in zip(helpers, blocks[1:])]
+                    reaction_ids = read_reaction_pages(driver, blocks[0][0], blocks[0][-1])
+                    for future in futures:
+                        reaction_ids.extend(future.result())
+            finally:
+                for helper in helpers:
+                    pool.release(helper)
+                    if controller is not None:
+                        controller.release()
+        
+        offset = start - (first_page - 1) * page_size
+        reaction_ids = list(dict.fromkeys(reaction_ids))
+        if end is None:
+            return reaction_ids[offset:]
+        return reaction_ids[offset:end - (first_page - 1) * page_size]
     except Exception as e:
-        print(f"Error getting reactions from {dataset_id}: {e}")
-        return []
+        log.error("Error getting reactions from %s: %s", dataset_id, e)
+        raise
 
-def scrape_single_dataset(dataset_id, start_index=None, end_index=None):
-    driver = get_driver()
+def scrape_single_dataset(dataset_id, start_index=None, end_index=None, fetcher=None, pool=None, cache=None):
+    """Scrape one dataset; with an HTTPRecordFetcher the reactions are fetched without the browser.
+    With a DriverPool the driver is borrowed from the pool instead of launched and quit here.
+    With a RawRecordCache, cached reactions are not fetched at all."""
+    driver = pool.acquire() if pool is not None else get_driver()
     try:
-        print(f"\n{'='*60}\nProcessing dataset: {dataset_id}\n{'='*60}")
-        reaction_ids = get_all_reaction_ids_from_dataset(driver, dataset_id, start_index, end_index)
+        log.info("Processing dataset: %s", dataset_id)
+        reaction_ids = get_all_reaction_ids_from_dataset(driver, dataset_id, start_index, end_index, pool)
+        if pool is not None:
+            pool.record_page(driver)
         
         if not reaction_ids:
             return {'dataset_id': dataset_id, 'reactions': [], 'total_reactions': 0, 'successful_scrapes': 0}
         
+        if fetcher is not None:
+            log.info("  Fetching %d reactions over HTTP...", len(reaction_ids))
+            raw_results = fetcher.scrape_many(reaction_ids, cache=cache, dataset_id=dataset_id)
+        
         reactions_data = []
         for i, reaction_id in enumerate(reaction_ids, 1):
-            print(f"  [{i}/{len(reaction_ids)}] Scraping {reaction_id}...")
-            result = scrape_reaction_data(driver, reaction_id)
+            if fetcher is not None:
+                result = raw_results[i - 1]
+            else:
+                log.debug("  [%d/%d] Scraping %s...", i, len(reaction_ids), reaction_id)
+                if cache is not None:
+                    result = cache.fetch(reaction_id, lambda: scrape_reaction_data(driver, reaction_id), dataset_id)
+                else:
+                    result = scrape_reaction_data(driver, reaction_id)
+                if pool is not None and not result.get('cached'):
+                    pool.record_page(driver)
             
             # --- APPLY FORMATTING HERE ---
             if result['success']:
                 try:
                     formatted = format_reaction_data(result)
                     result['formatted_data'] = formatted
-                    print(f"    ✓ Formatted {reaction_id}")
+                    log.debug("    ✓ Formatted %s", reaction_id)
                 except Exception as e:
-                    print(f"    ⚠ Error formatting {reaction_id}: {e}")
+                    log.warning("    ⚠ Error formatting %s: %s", reaction_id, e)
             
             reactions_data.append(result)
-            time.sleep(1) 
+            if fetcher is None and POLITENESS_DELAY and not result.get('cached'):
+                time.sleep(POLITENESS_DELAY)
         
         successful = sum(1 for r in reactions_data if r['success'])
         return {'dataset_id': dataset_id, 'reactions': reactions_data, 'total_reactions': len(reactions_data), 'successful_scrapes': successful}
         
     except Exception as e:
-        print(f"✗ Error with dataset {dataset_id}: {e}")
+        log.error("✗ Error with dataset %s: %s", dataset_id, e)
         return {'dataset_id': dataset_id, 'reactions': [], 'total_reactions': 0, 'successful_scrapes': 0, 'error': str(e)}
     finally:
-        driver.quit()
+        if pool is not None:
+            pool.release(driver)
+        else:
+            driver.quit()
 
-def scrape_all_datasets_parallel(max_workers=3, dataset_ranges=None, specific_datasets=None, 
-                                 dataset_start=None, dataset_end=None, 
-                                 reaction_start=None, reaction_end=None):
-    print("="*60 + "\nSTARTING WEB SCRAPING (PARALLEL)\n" + "="*60)
+def enumerate_reactions(pool, dataset_id, start_index=None, end_index=None, controller=None):
+    """Reaction IDs of one dataset, read with a driver borrowed from the pool"""
+    with pool.driver() as driver:
+        reaction_ids = get_all_reaction_ids_from_dataset(driver, dataset_id, start_index, end_index, pool, controller)
+        pool.record_page(driver)
+    return reaction_ids
+
+def scrape_and_format_reaction(reaction_id, pool=None, fetcher=None, cache=None, dataset_id=None):
+    """Fetch one reaction (raw cache first, then the HTTP fetcher or a pooled driver) and attach its formatted data"""
+    def fetch():
+        if fetcher is not None:
+            return fetcher.scrape_reaction_data(reaction_id)
+        with pool.driver() as driver:
+            fetched = scrape_reaction_data(driver, reaction_id)
+            pool.record_page(driver)
+        return fetched
     
-    if specific_datasets:
-        dataset_ids = specific_datasets
+    with metrics.labels(dataset_id=dataset_id):
+        result = cache.fetch(reaction_id, fetch, dataset_id) if cache is not None else fetch()
+        if result.get('cached'):
+            metrics.count('cache_hits')
+        
+        if result['success']:
+            try:
+                with metrics.stage('format'):
+                    result['formatted_data'] = format_reaction_data(result)
+                # Only the formatted copy is kept; the raw record is already in the cache
+                result['data'] = None
+                log.debug("    ✓ Formatted %s", reaction_id)
+            except Exception as e:
+                metrics.count('format_errors')
+                log.warning("    ⚠ Error formatting %s: %s", reaction_id, e)
+    if fetcher is None and POLITENESS_DELAY and not result.get('cached'):
+        time.sleep(POLITENESS_DELAY)
+    return result
+
+def get_dataset_ids_checkpointed(dataset_start, dataset_end, pool, store=None, catalog=None):
+    """get_all_dataset_ids, reusing the checkpointed listing or slicing the dataset catalog"""
+    key = f"{dataset_start}:{dataset_end}"
+    if store is not None:
+        dataset_ids = store.load_dataset_list(key)
+        if dataset_ids is not None:
+            log.info("Resuming with %d dataset IDs from checkpoint", len(dataset_ids))
+            return dataset_ids
+    if catalog is not None:
+        if not len(catalog):
+            log.info("Dataset catalog is empty, building it...")
+            with pool.driver() as driver:
+                pool.record_page(driver, refresh_catalog(driver, catalog, BASE_URL, timeout=GLOBAL_TIMEOUT))
+        dataset_ids = catalog.slice(dataset_start, dataset_end)
+        log.info("Selected %d datasets from the catalog", len(dataset_ids))
     else:
-        dataset_ids = get_all_dataset_ids(dataset_start, dataset_end)
+        dataset_ids = get_all_dataset_ids(dataset_start, dataset_end, pool=pool)
+    if store is not None and dataset_ids:
+        store.save_dataset_list(key, dataset_ids)
+    return dataset_ids
+
+def retry_dead_letters(store, results, scrape_fn, max_workers=3, sink=None, keep_results=True):
+    """Second pass over this run's dead-lettered reactions (transient and page-structure failures).
+
+    Permanent failures stay in the checkpoint untouched. Recovered reactions
+    replace their failed entries in ``results``; returns how many were recovered.
+    """
+    if store is None:
+        return 0
+    by_dataset = {d['dataset_id']: d for d in results}
+    dead = [item for item in store.dead_letters(kinds=(TRANSIENT, STRUCTURE)) if item[0] in by_dataset]
+    if not dead:
+        return 0
+    log.info("Second pass over %d dead-lettered reactions...", len(dead))
     
-    if not dataset_ids:
-        print("✗ No valid datasets to scrape!")
-        return []
+    def retry(item):
+        dataset_id, reaction_id, _ = item
+        try:
+            result = scrape_fn(dataset_id, reaction_id)
+        except Exception as e:
+            result = failed_result(reaction_id, e, classify_failure(e), 1)
+        store.save_reaction(dataset_id, result)
+        if sink is not None:
+            sink(dataset_id, result)
+        return dataset_id, result
     
-    all_results = []
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_dataset = {}
+        outcomes = list(executor.map(retry, dead))
+    
+    recovered = 0
+    for dataset_id, result in outcomes:
+        if not result['success']:
+            continue
+        recovered += 1
+        if not keep_results:
+            result = {'reaction_id': result['reaction_id'], 'success': True}
+        dataset = by_dataset[dataset_id]
+        dataset['reactions'] = [result if r['reaction_id'] == result['reaction_id'] else r for r in dataset['reactions']]
+        dataset['successful_scrapes'] = sum(1 for r in dataset['reactions'] if r['success'])
+    log.info("✓ Second pass recovered %d of %d reactions", recovered, len(dead))
+    return recovered
+
+def scrape_all_datasets_parallel(max_workers=3, dataset_ranges=None, specific_datasets=None, 
+                                 dataset_start=None, dataset_end=None, 
+                                 reaction_start=None, reaction_end=None, backend='browser', store=None,
+                                 sink=None, keep_results=True, cache=None, catalog=None, controller=None,
+                                 http_pool_size=DEFAULT_POOL_SIZE):
+    """Scrape datasets with every worker pulling individual reactions from one shared queue.
+
+    With an AIMD ``controller`` max_workers is its upper bound and the number
+    of reactions scraped at once follows controller.limit. The HTTP backend
+    runs at least ``http_pool_size`` workers, one per pooled connection.
+    """
+    if controller is not None:
+        max_workers = controller.max_workers
+    log.info("="*60 + "\nSTARTING WEB SCRAPING (PARALLEL)\n" + "="*60)
+    
+    # One pool for the whole crawl: enumeration and every worker share its drivers
+    pool = DriverPool(get_driver, max_size=max_workers)
+    fetcher = HTTPRecordFetcher(BASE_URL, pool_size=http_pool_size, timeout=GLOBAL_TIMEOUT) if backend == 'http' else None
+    try:
+        if specific_datasets:
+            dataset_ids = specific_datasets
+        else:
+            dataset_ids = get_dataset_ids_checkpointed(dataset_start, dataset_end, pool, store, catalog)
+        
+        if not dataset_ids:
+            log.error("✗ No valid datasets to scrape!")
+            return []
+        
+        jobs = []
         for dataset_id in dataset_ids:
             if dataset_ranges and dataset_id in dataset_ranges:
                 start, end = dataset_ranges[dataset_id]
-                future = executor.submit(scrape_single_dataset, dataset_id, start, end)
-            elif reaction_start is not None or reaction_end is not None:
-                future = executor.submit(scrape_single_dataset, dataset_id, reaction_start, reaction_end)
+                jobs.append((dataset_id, start, end))
             else:
-                future = executor.submit(scrape_single_dataset, dataset_id)
-            future_to_dataset[future] = dataset_id
+                jobs.append((dataset_id, reaction_start, reaction_end))
         
-        for i, future in enumerate(as_completed(future_to_dataset), 1):
-            dataset_id = future_to_dataset[future]
-            try:
-                result = future.result()
-                all_results.append(result)
-                print(f"✓ Completed dataset {i}/{len(dataset_ids)}: {dataset_id}")
-            except Exception as e:
-                print(f"✗ Failed dataset {dataset_id}: {e}")
-                all_results.append({'dataset_id': dataset_id, 'error': str(e)})
+        # HTTP fetches are cheap to overlap, so run as many workers as the connection pool allows
+        workers = max(max_workers, fetcher.pool_size) if fetcher is not None else max_workers
+        scrape_fn = lambda dataset_id, reaction_id: scrape_and_format_reaction(reaction_id, pool, fetcher, cache, dataset_id)
+        scheduler = ReactionScheduler(
+            enumerate_fn=lambda dataset_id, start, end: enumerate_reactions(pool, dataset_id, start, end, controller),
+            scrape_fn=scrape_fn,
+            max_workers=workers,
+            store=store,
+            sink=sink,
+            keep_results=keep_results,
+            controller=controller,
+        )
+        results = scheduler.run(jobs)
+        retry_dead_letters(store, results, scrape_fn, workers, sink, keep_results)
+        return results
+    finally:
+        pool.close()
+        log.info("Driver pool stats: %s", pool.get_stats())
+        if controller is not None:
+            log.info("Concurrency controller: %s", controller.get_stats())
+        if fetcher is not None:
+            log.info("HTTP backend stats: %s", fetcher.stats)
+            fetcher.close()
+
+def scrape_all_datasets_async(max_workers=3, dataset_start=None, dataset_end=None,
+                              rate=DEFAULT_RATE, burst=DEFAULT_BURST, store=None,
+                              sink=None, keep_results=True, cache=None, catalog=None):
+    """Enumerate with pooled browsers, then fetch every reaction over HTTP on one event loop"""
+    log.info("="*60 + "\nSTARTING WEB SCRAPING (ASYNC)\n" + "="*60)
+    
+    pool = DriverPool(get_driver, max_size=max_workers)
+    try:
+        dataset_ids = get_dataset_ids_checkpointed(dataset_start, dataset_end, pool, store, catalog)
+        if not dataset_ids:
+            log.error("✗ No valid datasets to scrape!")
+            return []
+        
+        def enumerate_checkpointed(dataset_id):
+            reaction_ids = store.load_enumeration(dataset_id, None, None) if store is not None else None
+            if reaction_ids is None:
+                try:
+                    reaction_ids = enumerate_reactions(pool, dataset_id)
+                except Exception as e:
+                    # Not checkpointed, so the next --resume enumerates it again
+                    log.error("✗ Error enumerating dataset %s: %s", dataset_id, e)
+                    return []
+                if store is not None and reaction_ids:
+                    store.save_enumeration(dataset_id, None, None, reaction_ids)
+            return reaction_ids
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            reaction_lists = list(executor.map(enumerate_checkpointed, dataset_ids))
+    finally:
+        pool.close()
     
-    return all_results
+    dataset_reactions = dict(zip(dataset_ids, reaction_lists))
+    total = sum(len(ids) for ids in reaction_lists)
+    log.info("Fetching %d reactions at %g req/s (burst %d)...", total, rate, burst)
+    results = run_async_crawl(dataset_reactions, format_reaction_data, base_url=BASE_URL,
+                              rate=rate, burst=burst, task_timeout=GLOBAL_TIMEOUT, store=store,
+                              sink=sink, keep_results=keep_results, cache=cache)
+    with HTTPRecordFetcher(BASE_URL, timeout=GLOBAL_TIMEOUT) as fetcher:
+        retry_dead_letters(store, results,
+                           lambda dataset_id, reaction_id: scrape_and_format_reaction(reaction_id, None, fetcher, cache, dataset_id),
+                           max_workers, sink, keep_results)
+    return results
+
+def sync_datasets(known, max_workers=3, dataset_start=None, dataset_end=None, backend='browser',
+                  store=None, sink=None, keep_results=True, cache=None, catalog=None, controller=None):
+    """Scrape only reactions missing from ``known`` ({dataset_id: reaction IDs}), in datasets whose count changed"""
+    if controller is not None:
+        max_workers = controller.max_workers
+    log.info("="*60 + "\nSTARTING DELTA SYNC\n" + "="*60)
+    
+    pool = DriverPool(get_driver, max_size=max_workers)
+    fetcher = HTTPRecordFetcher(BASE_URL, timeout=GLOBAL_TIMEOUT) if backend == 'http' else None
+    try:
+        # main() has refreshed the catalog for this sync, so its counts are current
+        reaction_counts = catalog.reaction_counts() if catalog is not None else {}
+        dataset_ids = get_dataset_ids_checkpointed(dataset_start, dataset_end, pool, store, catalog)
+        changed = datasets_to_sync(dataset_ids, known, reaction_counts)
+        log.info("%d of %d datasets are new or changed", len(changed), len(dataset_ids))
+        if not changed:
+            return []
+        
+        def enumerate_new(dataset_id, start, end):
+            reaction_ids = enumerate_reactions(pool, dataset_id, start, end, controller)
+            have = known.get(dataset_id, ())
+            new_ids = [rid for rid in reaction_ids if rid not in have]
+            log.info("  %s: %d new of %d reactions", dataset_id, len(new_ids), len(reaction_ids))
+            return new_ids
+        
+        workers = max(max_workers, fetcher.pool_size) if fetcher is not None else max_workers
+        scrape_fn = lambda dataset_id, reaction_id: scrape_and_format_reaction(reaction_id, pool, fetcher, cache, dataset_id)
+        scheduler = ReactionScheduler(
+            enumerate_fn=enumerate_new,
+            scrape_fn=scrape_fn,
+            max_workers=workers,
+            store=store,
+            sink=sink,
+            keep_results=keep_results,
+            controller=controller,
+        )
+        results = scheduler.run([(dataset_id, None, None) for dataset_id in changed])
+        retry_dead_letters(store, results, scrape_fn, workers, sink, keep_results)
+        return results
+    finally:
+        pool.close()
+        log.info("Driver pool stats: %s", pool.get_stats())
+        if controller is not None:
+            log.info("Concurrency controller: %s", controller.get_stats())
+        if fetcher is not None:
+            log.info("HTTP backend stats: %s", fetcher.stats)
+            fetcher.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Open Reaction Database scraper")
+    parser.add_argument('--backend', choices=['browser', 'http'], default='browser',
+                        help="How reaction records are fetched: full Chrome page load, or plain HTTP (no WebDriver)")
+    parser.add_argument('--driver-profile', choices=DRIVER_PROFILES, default=DRIVER_PROFILE,
+                        help="lean: headless, eager page loads, no images/fonts/analytics (default: %(default)s)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue the previous run, skipping datasets and reactions already in the checkpoint")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Discard the progress of the previous run and start a new one")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH,
+                        help=f"SQLite progress file (default: {DEFAULT_CHECKPOINT_PATH})")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Raw record cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_MB,
+                        help=f"Evict least recently used raw records beyond this size (default: {DEFAULT_MAX_MB})")
+    parser.add_argument('--cache-ttl-hours', type=float, default=None,
+                        help="Refetch cached raw records older than this (default: never expire)")
+    parser.add_argument('--no-cache', action='store_true', help="Always fetch from the network")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG_PATH,
+                        help=f"SQLite dataset catalog used instead of crawling /browse (default: {DEFAULT_CATALOG_PATH})")
+    parser.add_argument('--refresh-catalog', action='store_true',
+                        help="Update the dataset catalog from /browse before scraping (only changed pages are re-read)")
+    parser.add_argument('--catalog-max-age-hours', type=float, default=DEFAULT_MAX_AGE_HOURS,
+                        help="Refresh the catalog automatically once its last refresh is older than this "
+                             "(default: %(default)s)")
+    parser.add_argument('--no-catalog', action='store_true', help="Crawl /browse on every run instead of using the catalog")
+    parser.add_argument('--metrics-prefix', default=DEFAULT_METRICS_PREFIX,
+                        help=f"Write per-stage timings to <prefix>.prom and <prefix>.json (default: {DEFAULT_METRICS_PREFIX})")
+    parser.add_argument('--output-format', choices=['json', 'jsonl', 'compact'], default='json',
+                        help="json: one nested file written at the end; jsonl: one reaction per line, streamed during the crawl; "
+                             "compact: like json, with each distinct compound stored once and referenced by ID")
+    parser.add_argument('--output', default=None,
+                        help="Output path (default: ord_formatted_data.json / ord_formatted_data.jsonl / "
+                             f"{DEFAULT_COMPACT_PATH})")
+    parser.add_argument('--columnar', choices=COLUMNAR_FORMATS, default=None,
+                        help="Also stream component/outcome rows to Parquet or Arrow tables during the crawl (needs pyarrow)")
+    parser.add_argument('--columnar-prefix', default=DEFAULT_COLUMNAR_PREFIX,
+                        help="Columnar output path prefix (default: %(default)s -> <prefix>_components / <prefix>_outcomes)")
+    parser.add_argument('--result-store', nargs='?', const=DEFAULT_RESULT_STORE_PATH, default=None, metavar='PATH',
+                        help=f"Also insert results into an indexed SQLite store (default path: {DEFAULT_RESULT_STORE_PATH}); "
+                             "sync mode then skips every reaction already in it")
+    parser.add_argument('--si-units', action='store_true',
+                        help="Add si_value/si_units (MOLE, CUBIC_METER, KILOGRAM) next to every amount in the output "
+                             "(needs numpy)")
+    parser.add_argument('--min-workers', type=int, default=DEFAULT_MIN_WORKERS,
+                        help="Fewest reactions scraped at once when the site slows down (default: %(default)s)")
+    parser.add_argument('--max-workers', type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Most reactions scraped at once while the site keeps up (default: %(default)s)")
+    parser.add_argument('--fixed-workers', action='store_true',
+                        help="Keep the mode's worker count instead of adapting it to latency and errors")
+    parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING'], default='INFO',
+                        help="DEBUG shows every reaction step; WARNING shows only problems (default: %(default)s)")
+    parser.add_argument('--log-file', default=None, help="Also write timestamped log records to this file")
+    parser.add_argument('--no-progress', action='store_true', help="Don't draw the live progress line")
+    return parser.parse_args()
+
+def save_output(formatted_output, output_file, output_format):
+    """Write the nested formatted output as indented JSON or in the compact form"""
+    if output_format == 'compact':
+        compounds = save_compact(formatted_output, output_file)
+        print(f"  {compounds} distinct compounds in the compound table")
+        return
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(formatted_output, f, indent=2, ensure_ascii=False)
 
 def main():
+    global DRIVER_PROFILE, format_reaction_data
+    args = parse_args()
+    DRIVER_PROFILE = args.driver_profile
+    if args.si_units:
+        # numpy is only needed for --si-units
+        from unit_normalizer import normalize_reactions, NormalizingWriter
+    setup_logging(args.log_level, args.log_file)
     print(f"\n{'='*60}")
     print(f"                      ORD SCRAPER ")
     print(f"Developed by: LAROCO, Jan Lorenz & BARRAL, Jacinth Cedric")
     print(f"{'='*60}")
-    config = get_user_input()
-    print(f"\nMode: {config['mode']}\n")
+    store = ProgressStore(args.checkpoint)
+    config = store.load_meta('config') if args.resume else None
+    if config is not None:
+        print(f"Resuming from {args.checkpoint}: {store.counts()}")
+        if config.get('dataset_ranges'):
+            config['dataset_ranges'] = {d: tuple(r) for d, r in config['dataset_ranges'].items()}
+    else:
+        if args.resume:
+            print(f"Nothing to resume in {args.checkpoint}, starting a new run")
+        elif not args.fresh and not store.is_empty():
+            # Never throw away an earlier run's progress just because --resume was forgotten
+            print(f"{args.checkpoint} holds progress from an earlier run: {store.counts()}")
+            print("Pass --resume to continue it, or --fresh to discard it and start over")
+            store.close()
+            stop_logging()
+            return
+        store.reset()
+        config = get_user_input()
+        config['backend'] = args.backend
+        store.save_meta('config', config)
+    print(f"\nMode: {config['mode']} (backend: {config['backend']})\n")
     
-    results = []
-    if config['mode'] == 'all':
-        results = scrape_all_datasets_parallel(max_workers=config['max_workers'], dataset_start=config.get('dataset_start'), dataset_end=config.get('dataset_end'))
-    elif config['mode'] == 'specific_datasets':
-        results = scrape_all_datasets_parallel(max_workers=config['max_workers'], specific_datasets=config['dataset_ids'])
-    elif config['mode'] == 'uniform_range':
-        results = scrape_all_datasets_parallel(max_workers=config['max_workers'], dataset_start=config.get('dataset_start'), dataset_end=config.get('dataset_end'), reaction_start=config.get('reaction_start'), reaction_end=config.get('reaction_end'))
-    elif config['mode'] == 'custom_ranges':
-        results = scrape_all_datasets_parallel(max_workers=config['max_workers'], dataset_ranges=config['dataset_ranges'])
-    elif config['mode'] == 'single_target':
-        results = scrape_all_datasets_parallel(max_workers=1, dataset_start=config['dataset_target'], dataset_end=config['dataset_target'], reaction_start=config['reaction_target'], reaction_end=config['reaction_target'])
-
-    # --- SAVE ONLY FORMATTED DATA ---
-    formatted_output = {}
+    default_outputs = {'json': 'ord_formatted_data.json', 'jsonl': DEFAULT_JSONL_PATH, 'compact': DEFAULT_COMPACT_PATH}
+    output_file = args.output or default_outputs[args.output_format]
+    # Sync merges into the existing output instead of replacing it
+    existing_output = load_existing_output(output_file) if config['mode'] == 'sync' else None
+    known = known_reactions(existing_output) if existing_output is not None else None
+    if known is not None:
+        print(f"Existing output {output_file}: {sum(len(ids) for ids in known.values())} reactions in {len(known)} datasets")
+    sync_known = known
+    if known is not None and args.result_store:
+        # The result store answers "do we have it" without the output file being complete
+        sync_known = {d: set(ids) for d, ids in known.items()}
+        store_known = ResultStore(args.result_store)
+        for dataset_id, reaction_ids in store_known.known_reactions().items():
+            sync_known.setdefault(dataset_id, set()).update(reaction_ids)
+        store_known.close()
+        print(f"Result store {args.result_store}: {sum(len(ids) for ids in sync_known.values())} known reactions")
     
-    for dataset in results:
-        d_id = dataset.get('dataset_id')
-        if d_id:
-            formatted_output[d_id] = {
-                'dataset_id': d_id,
-                'total_reactions_scraped': dataset.get('total_reactions', 0),
-                'reactions': []
-            }
-            # Only save the 'formatted_data' part
-            for reaction in dataset.get('reactions', []):
-                if reaction.get('success') and 'formatted_data' in reaction:
-                    formatted_output[d_id]['reactions'].append(reaction['formatted_data'])
-
-    output_file = 'ord_formatted_data.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(formatted_output, f, indent=2, ensure_ascii=False)
-    print(f"\n✓ Saved formatted results to {output_file}")
+    # --- OUTPUT SINK ---
+    writer = None
+    sink = None
+    streams = []
+    if args.output_format == 'jsonl':
+        writer = JSONLWriter(output_file, append=known is not None)
+        streams.append(writer)
+    columnar = ColumnarWriter(args.columnar_prefix, args.columnar) if args.columnar else None
+    if columnar is not None:
+        streams.append(columnar)
+        if existing_output is not None:
+            # The columnar files are rewritten from scratch, so under sync they
+            # start with everything the merged output already holds
+            for dataset_id, dataset in existing_output.items():
+                for formatted in dataset.get('reactions', ()):
+                    columnar.write(dataset_id, formatted)
+    result_writer = ResultWriter(args.result_store) if args.result_store else None
+    if result_writer is not None:
+        streams.append(result_writer)
+    normalizer = None
+    if streams:
+        if args.si_units:
+            # Reactions reach the streams in batches, normalized in one vectorized pass each
+            normalizer = NormalizingWriter(streams)
+            streams = [normalizer]
+        # Re-emit what the checkpoint already holds; lines still buffered when
+        # the previous run died would otherwise be missing from the file
+        for dataset_id, formatted in store.iter_formatted():
+            if known is None or formatted.get('reaction_id') not in known.get(dataset_id, ()):
+                for stream in streams:
+                    stream.write(dataset_id, formatted)
+        
+        def sink(dataset_id, result):
+            if result.get('success') and result.get('formatted_data') is not None:
+                for stream in streams:
+                    stream.write(dataset_id, result['formatted_data'])
+    # The JSONL writer owns the output, so results don't need to be held in memory
+    cache = None
+    if not args.no_cache:
+        ttl = args.cache_ttl_hours * 3600 if args.cache_ttl_hours is not None else None
+        cache = RawRecordCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024, ttl=ttl)
+    catalog = None
+    if not args.no_catalog:
+        catalog = DatasetCatalog(args.catalog)
+        age = catalog.age()
+        if age is not None:
+            print(f"Dataset catalog {args.catalog}: {len(catalog)} datasets, refreshed {age / 3600:.1f} h ago")
+        stale = age is not None and age > args.catalog_max_age_hours * 3600
+        if stale and not args.refresh_catalog:
+            print(f"  Older than {args.catalog_max_age_hours:g} h, refreshing it from /browse")
+        # Sync compares live reaction counts on every page, so it always starts from a full refresh
+        if args.refresh_catalog or stale or config['mode'] == 'sync':
+            driver = get_driver()
+            try:
+                refresh_catalog(driver, catalog, BASE_URL, timeout=GLOBAL_TIMEOUT, force=config['mode'] == 'sync')
+            finally:
+                driver.quit()
+    # The mode's worker count is the starting point; the controller moves it within the bounds
+    controller = None
+    if not args.fixed_workers and config['mode'] not in ('single_target', 'async'):
+        controller = AIMDController(args.min_workers, max(args.max_workers, args.min_workers),
+                                    initial=config['max_workers'])
+    run_kwargs = {'store': store, 'sink': sink, 'keep_results': writer is None, 'cache': cache, 'catalog': catalog}
+    # Results held until the end share one string per distinct SMILES; the pool lives for this run only
+    string_pool = None
+    if writer is None:
+        string_pool = {}
+        format_reaction_data = formatter_for('full', string_pool)
+    
+    results = []
+    if not args.no_progress:
+        progress.start()
+    try:
+        if config['mode'] == 'all':
+            results = scrape_all_datasets_parallel(max_workers=config['max_workers'], dataset_start=config.get('dataset_start'), dataset_end=config.get('dataset_end'), backend=config['backend'], controller=controller, **run_kwargs)
+        elif config['mode'] == 'specific_datasets':
+            results = scrape_all_datasets_parallel(max_workers=config['max_workers'], specific_datasets=config['dataset_ids'], backend=config['backend'], controller=controller, **run_kwargs)
+        elif config['mode'] == 'uniform_range':
+            results = scrape_all_datasets_parallel(max_workers=config['max_workers'], dataset_start=config.get('dataset_start'), dataset_end=config.get('dataset_end'), reaction_start=config.get('reaction_start'), reaction_end=config.get('reaction_end'), backend=config['backend'], controller=controller, **run_kwargs)
+        elif config['mode'] == 'custom_ranges':
+            results = scrape_all_datasets_parallel(max_workers=config['max_workers'], dataset_ranges=config['dataset_ranges'], backend=config['backend'], controller=controller, **run_kwargs)
+        elif config['mode'] == 'single_target':
+            results = scrape_all_datasets_parallel(max_workers=1, dataset_start=config['dataset_target'], dataset_end=config['dataset_target'], reaction_start=config['reaction_target'], reaction_end=config['reaction_target'], backend=config['backend'], controller=controller, **run_kwargs)
+        elif config['mode'] == 'async':
+            results = scrape_all_datasets_async(max_workers=config['max_workers'], dataset_start=config.get('dataset_start'), dataset_end=config.get('dataset_end'), rate=config['rate'], burst=config['burst'], **run_kwargs)
+        elif config['mode'] == 'sync':
+            results = sync_datasets(sync_known, max_workers=config['max_workers'], dataset_start=config.get('dataset_start'), dataset_end=config.get('dataset_end'), backend=config['backend'], controller=controller, **run_kwargs)
+    finally:
+        progress.stop()
+        stop_logging()
+        if normalizer is not None:
+            normalizer.flush()
+        if writer is not None:
+            writer.close()
+            print(f"\n✓ Streamed {writer.lines_written} formatted reactions to {writer.path}")
+        if columnar is not None:
+            columnar.close()
+            print(f"✓ Wrote {columnar.reactions_written} reactions to {columnar.components.path} "
+                  f"({columnar.components.rows} rows) and {columnar.outcomes.path} ({columnar.outcomes.rows} rows)")
+        if result_writer is not None:
+            result_writer.close()
+            print(f"✓ Stored {result_writer.reactions_written} reactions in {result_writer.path}")
+
+    if writer is None and args.si_units:
+        # One vectorized pass over every amount not yet normalized: with a
+        # sink that is only what was resumed from the checkpoint
+        normalize_reactions(r['formatted_data'] for dataset in results for r in dataset.get('reactions', [])
+                            if r.get('success') and r.get('formatted_data')
+                            and (normalizer is None or r.get('resumed')))
+    if writer is None and existing_output is not None:
+        added = merge_results(existing_output, results)
+        save_output(existing_output, output_file, args.output_format)
+        print(f"\n✓ Merged {added} new reactions into {output_file}")
+    elif writer is None:
+        # --- SAVE ONLY FORMATTED DATA ---
+        formatted_output = {}
+        
+        for dataset in results:
+            d_id = dataset.get('dataset_id')
+            if d_id:
+                formatted_output[d_id] = {
+                    'dataset_id': d_id,
+                    'total_reactions_scraped': dataset.get('total_reactions', 0),
+                    'reactions': []
+                }
+                # Only save the 'formatted_data' part
+                for reaction in dataset.get('reactions', []):
+                    if reaction.get('success') and 'formatted_data' in reaction:
+                        formatted_output[d_id]['reactions'].append(reaction['formatted_data'])
+
+        save_output(formatted_output, output_file, args.output_format)
+        print(f"\n✓ Saved formatted results to {output_file}")
+    if string_pool is not None:
+        string_pool.clear()
+    wait_stats.print_summary()
+    print(f"Page state reads: {page_state_reader.stats}")
+    print(f"Circuit breaker: {retry_policy.breaker.stats}")
+    dead = store.dead_letters()
+    if dead:
+        kinds = {}
+        for _, _, kind in dead:
+            kinds[kind] = kinds.get(kind, 0) + 1
+        print(f"Dead letters left in {args.checkpoint}: {kinds}")
+    metrics.print_summary()
+    prom_path, json_path = metrics.export(args.metrics_prefix)
+    print(f"Metrics written to {prom_path} and {json_path}")
+    if cache is not None:
+        print(f"Raw cache: {cache.get_stats()}")
+    print(f"Checkpoint: {store.counts()}")
+    store.close()
+    if catalog is not None:
+        catalog.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file